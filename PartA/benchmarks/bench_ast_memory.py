@@ -0,0 +1,65 @@
+"""Resident memory of parsed programs: as an AST of objects, with interned subtrees, and as a flat NodeTable.
+
+Usage:
+    python3 benchmarks/bench_ast_memory.py
+"""
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from interpreter import Lexer, Parser
+from interpreter.node_table import NodeTable
+
+EXAMPLES_DIR = Path(__file__).parent.parent / 'examples'
+
+def program(functions: int) -> str:
+    """A program of many small functions, lambdas and calls."""
+    return '\n'.join(
+        f"Defun {{'name': 'f{i}', 'arguments': (x, y)}} (x * {i} + y) % 7 == 0 || not (x > y)\n"
+        f"f{i}({i}, 2 + {i})\n"
+        f"(Lambd z.(z + {i}))({i})"
+        for i in range(functions)
+    )
+
+def measure(build) -> tuple[object, int]:
+    """Returns the result of `build()` and the memory it holds on to."""
+    tracemalloc.start()
+    result = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return result, size
+
+def main() -> None:
+    for functions in (100, 1000, 10000):
+        text = program(functions)
+
+        tree, tree_bytes = measure(lambda: Parser(Lexer(text)).parse())
+
+        # Flattening resolves the (lazy) token positions, which would otherwise be measured as well
+        NodeTable.from_tree(tree)
+        table, table_bytes = measure(lambda: NodeTable.from_tree(tree))
+
+        # The parser (and its interning table) is released once parsing is done
+        sharing_ratios = []
+        def parse_interned():
+            parser = Parser(Lexer(text), intern=True)
+            tree = parser.parse()
+            sharing_ratios.append(parser.interner.sharing_ratio)
+            return tree
+
+        _, interned_bytes = measure(parse_interned)
+
+        print(
+            f'{functions:>6} functions: {len(table):>8} nodes, '
+            f'tree {tree_bytes / len(table):6.1f} B/node, '
+            f'interned {interned_bytes / len(table):6.1f} B/node '
+            f'({sharing_ratios[0]:.0%} shared), '
+            f'table {table_bytes / len(table):6.1f} B/node '
+            f'({tree_bytes / table_bytes:.1f}x smaller)'
+        )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Call overhead: `sumRecursive(900)` in a program declaring many top-level functions.
+
+Usage:
+    python3 benchmarks/bench_calls.py [functions] [repeats]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from interpreter import Lexer, Parser, SemanticAnalyzer, Interpreter
+
+def program(functions: int) -> str:
+    """`functions` unrelated declarations, followed by `sumRecursive` and a call of it."""
+    declarations = '\n'.join(
+        f"Defun {{'name': 'f{i}', 'arguments': (x)}} x + {i}"
+        for i in range(functions)
+    )
+
+    return declarations + """
+    Defun {'arguments': (n), 'name': 'sumRecursive'}
+    (n == 1) or (n + sumRecursive(n - 1))
+
+    sumRecursive(900)
+    """
+
+def main() -> None:
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    tree = Parser(Lexer(program(functions))).parse()
+    SemanticAnalyzer().visit(tree)
+
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        assert list(Interpreter().interpret(tree)) == [900 * 901 // 2]
+        best = min(best, time.perf_counter() - start)
+
+    print(f'{functions} functions: sumRecursive(900) in {best * 1e3:.2f}ms ({best / 900 * 1e6:.2f}us per call)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Front-end (lexing + parsing) wall time of a large generated program, by number of jobs.
+
+One job parses sequentially. For more jobs, the time `ParallelParser` spends
+adopting the partial programs in the calling process (the serial merge) is
+printed too: the sequential time over it bounds the speedup, however many
+cores parse the slices. Job counts above the number of CPUs share cores.
+
+Usage:
+    python3 benchmarks/bench_frontend.py [statements] [jobs ...]
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from interpreter import Lexer, Parser, ParallelParser
+
+def program(statements: int) -> str:
+    """A program of `statements` top-level statements (half declarations, half calls)."""
+    return '\n'.join(
+        f"Defun {{'name': 'f{i}', 'arguments': (x, y)}} (x * {i} + y) % 7 == 0 || not (x > y)\n"
+        f"f{i}({i}, 2 + {i})"
+        for i in range(statements // 2)
+    )
+
+def default_jobs() -> list[int]:
+    """1, 2, 4, ... up to the number of CPUs (and at least 2)."""
+    jobs = [1]
+
+    while jobs[-1] < max(os.cpu_count() or 1, 2):
+        jobs.append(jobs[-1] * 2)
+
+    return jobs
+
+def main() -> None:
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    jobs = [int(arg) for arg in sys.argv[2:]] or default_jobs()
+    text = program(statements)
+
+    start = time.perf_counter()
+    Parser(Lexer(text)).parse()
+    sequential = time.perf_counter() - start
+    print(f'{statements} statements, {len(text) / 1e6:.1f} MB, {os.cpu_count()} CPUs')
+    print(f'{"jobs":>4} {"chunks":>6} {"wall":>8} {"speedup":>7} {"merge":>8} {"bound":>6}')
+
+    for workers in jobs:
+        if workers == 1:
+            print(f'{1:>4} {1:>6} {sequential:>7.2f}s {1:>6.1f}x {"-":>8} {"-":>6}')
+            continue
+
+        parser = ParallelParser(text, workers)
+
+        start = time.perf_counter()
+        parser.parse()
+        elapsed = time.perf_counter() - start
+
+        print(
+            f'{workers:>4} {parser.chunks:>6} {elapsed:>7.2f}s {sequential / elapsed:>6.1f}x '
+            f'{parser.merge_time:>7.2f}s {sequential / parser.merge_time:>5.1f}x'
+        )
+
+if __name__ == '__main__':
+    main()
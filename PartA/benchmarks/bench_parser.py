@@ -0,0 +1,51 @@
+"""Parser throughput on long operator chains.
+
+Usage:
+    python3 benchmarks/bench_parser.py
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from interpreter import Lexer, Parser
+from interpreter.token import TokenCode
+
+OPERATORS = ['+', '-', '*', '/', '%', '==', '&&', '||']
+
+def arithmetic_chain(terms: int) -> str:
+    return ' + '.join(f'{i} * {i}' for i in range(terms))
+
+def mixed_chain(terms: int) -> str:
+    return ' '.join(f'{i} {OPERATORS[i % len(OPERATORS)]}' for i in range(terms)) + ' 1'
+
+class TokenList:
+    """Replays pre-scanned tokens, so only the parser itself is measured"""
+    def __init__(self, tokens: list) -> None:
+        self.get_next_token = iter(tokens).__next__
+
+def scan(text: str) -> list:
+    lexer = Lexer(text)
+    tokens = [lexer.get_next_token()]
+
+    while tokens[-1].code != TokenCode.EOF:
+        tokens.append(lexer.get_next_token())
+
+    return tokens
+
+def bench(name: str, text: str, repeat: int = 5) -> None:
+    tokens = scan(text)
+    best = float('inf')
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Parser(TokenList(tokens)).parse()
+        best = min(best, time.perf_counter() - start)
+
+    print(f'{name:<28} {len(tokens):>9} tokens {best * 1000:>10.2f} ms {len(tokens) / best:>14,.0f} tokens/s')
+
+if __name__ == '__main__':
+    for terms in (1_000, 10_000, 100_000):
+        bench(f'arithmetic chain ({terms})', arithmetic_chain(terms))
+        bench(f'mixed chain ({terms})', mixed_chain(terms))
@@ -0,0 +1,71 @@
+"""Node visits per second of the semantic analyzer and the interpreter over a generated program.
+
+Every node of the program is visited exactly once by each visitor (there are
+no calls of declared functions), so the rate measures the cost of dispatching
+and traversing visits rather than the program's own work.
+
+Usage:
+    python3 benchmarks/bench_visitors.py [statements] [repeats]
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from interpreter import Lexer, Parser, SemanticAnalyzer, Interpreter
+from interpreter.node_table import NODE_FIELDS, NODE, NODES
+
+def program(statements: int) -> str:
+    """`statements` expression statements, half of them applying a lambda."""
+    return '\n'.join(
+        f"({i} * 3 + 7) % 5 == 2 || not ({i} > 3 && -{i} < 2)\n"
+        f"0 + (Lambd x, y. x * y + (x - y))({i}, 3)"
+        for i in range(statements // 2)
+    )
+
+def count_nodes(tree) -> int:
+    """The number of nodes in the tree, without recursion."""
+    count = 0
+    nodes = [tree]
+
+    while nodes:
+        node = nodes.pop()
+        count += 1
+
+        for name, kind in NODE_FIELDS[type(node)]:
+            if kind == NODE:
+                child = getattr(node, name)
+                if child is not None:
+                    nodes.append(child)
+            elif kind == NODES:
+                nodes.extend(getattr(node, name))
+
+    return count
+
+def best_time(run, repeats: int) -> float:
+    best = float('inf')
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    return best
+
+def main() -> None:
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    tree = Parser(Lexer(program(statements))).parse()
+    nodes = count_nodes(tree)
+
+    analysis = best_time(lambda: SemanticAnalyzer().visit(tree), repeats)
+    execution = best_time(lambda: list(Interpreter().interpret(tree)), repeats)
+
+    print(f'{statements} statements, {nodes} nodes')
+    print(f'SemanticAnalyzer: {nodes / analysis / 1e6:.2f}M nodes/s')
+    print(f'Interpreter:      {nodes / execution / 1e6:.2f}M nodes/s')
+
+if __name__ == '__main__':
+    main()
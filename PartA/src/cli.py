@@ -1,76 +1,238 @@
 import argparse
+import mmap
+import sys
+from contextlib import ExitStack
 from pathlib import Path
-from os.path import exists,isfile
+from os.path import exists,isfile,getsize
 import interpreter as intrprt
 
 def prompt(semantic_analyzer: intrprt.SemanticAnalyzer, interpreter: intrprt.Interpreter):
-    root = intrprt.Program([])
+    repl = intrprt.Repl(semantic_analyzer, interpreter, args.legacy_lexer)
 
     while True:
         try:
-            user_input = ''
-            while True:
-                line = input('>>> ' if not user_input else '... ')
+            line = input('>>> ' if not repl.pending else '... ')
 
-                if line.strip().lower()  == 'exit':
-                    raise KeyboardInterrupt
-                
-                if line.lower().startswith('defun') or line.strip().endswith(('{','(')):
-                    user_input += line + '\n'
-                    continue
+            if line.strip().lower() == 'exit':
+                raise KeyboardInterrupt
 
-                if line.strip() == '':
-                    user_input = ''
-                    continue
+            # An empty line discards an incomplete statement
+            if line.strip() == '' and repl.pending:
+                repl.reset()
+                continue
 
-                elif  not line.strip().endswith(('{','(')):
-                    user_input += line
-                    break
-
-
-            lexer = intrprt.Lexer(user_input)
-            parser = intrprt.Parser(lexer)
-            ast = parser.parse()
-
-            root.statements = ast.statements
-            semantic_analyzer.visit(root)
-
-            for output in interpreter.interpret(root):
+            for output in repl.feed(line):
                 print(output)
 
-        except KeyboardInterrupt:
+        except (KeyboardInterrupt, EOFError):
             return
         except (intrprt.LexerError,intrprt.SemanticError, intrprt.ParserError,intrprt.InterpreterError) as e:
             print(e.message)
         except Exception as e:
             print(f"Error: {e}")
 
-def parse(semantic_analyzer: intrprt.SemanticAnalyzer, interpreter: intrprt.Interpreter):
+SOURCE_SUFFIX = '.lambda'
+COMPILED_SUFFIX = '.lambdac'
+STDIN_PATH = Path('-')
+
+def open_lexer(resources: ExitStack) -> intrprt.Lexer:
+    """Create a lexer over the input file, streaming it in chunks if requested"""
+    if args.input_file == STDIN_PATH:
+        # Unbuffered, so whatever was written to the pipe so far is lexed without waiting for a full chunk
+        stdin = resources.enter_context(open(sys.stdin.fileno(), 'rb', buffering=0, closefd=False))
+        return intrprt.StreamLexer(stdin, args.chunk_size)
+
+    if args.mmap and getsize(args.input_file) > 0:
+        file = resources.enter_context(open(args.input_file,'rb'))
+        stream = resources.enter_context(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+        return intrprt.StreamLexer(stream, args.chunk_size)
+
+    if args.stream or args.mmap:
+        return intrprt.StreamLexer(resources.enter_context(open(args.input_file,'r')), args.chunk_size)
+
+    content = open(args.input_file,'r').read()
+    return intrprt.create_lexer(content, args.legacy_lexer)
+
+def open_parser(resources: ExitStack) -> intrprt.Parser | intrprt.ParallelParser:
+    """Create a parser over the input file, parsing it in multiple processes if requested"""
+    if args.jobs != 1:
+        content = open(args.input_file,'r').read()
+        return intrprt.ParallelParser(content, args.jobs or None, intern=args.intern)
+
+    return intrprt.Parser(open_lexer(resources), args.intern)
+
+def validate_input_file(suffixes: tuple[str, ...]):
     if not exists(args.input_file) or not isfile(args.input_file):
         print(f"Path '{args.input_file}' doesn't exist or is not a file")
         exit(-1)
 
-    if args.input_file.suffix != '.lambda':
+    if args.input_file.suffix not in suffixes:
         print(f"Error: File '{args.input_file}' is not a lambda file. Aborting...")
         exit(-1)
 
-    content = open(args.input_file,'r').read()
+def analyze_source(semantic_analyzer: intrprt.SemanticAnalyzer) -> intrprt.Program:
+    """Parse the input file and run the semantic analysis over it"""
+    with ExitStack() as resources:
+        parser = open_parser(resources)
+        tree = parser.parse()
+
+    if isinstance(parser, intrprt.ParallelParser):
+        if args.token_stats:
+            print(parser)
+    else:
+        if args.token_stats:
+            print(parser.tokens)
+
+        if args.intern_stats and parser.interner is not None:
+            print(parser.interner)
+
+    semantic_analyzer.visit(tree)
+
+    return tree
+
+def load_program(semantic_analyzer: intrprt.SemanticAnalyzer) -> intrprt.Program:
+    """Load an analyzed program from a compiled file, the program cache, or the source"""
+    if args.input_file.suffix == COMPILED_SUFFIX:
+        return intrprt.loads(args.input_file.read_bytes())
+
+    # Scope logs are printed during the analysis, which is skipped for cached programs
+    if args.no_cache or args.log_scope:
+        return analyze_source(semantic_analyzer)
+
+    cache = intrprt.ProgramCache(args.cache_dir)
+    # Shared nodes report errors at their first occurrence, so interned programs are cached separately
+    key = intrprt.source_hash(args.input_file) + ('-interned' if args.intern else '')
+    tree = cache.get(key)
+
+    if tree is None:
+        tree = analyze_source(semantic_analyzer)
+        cache.put(key, tree)
+
+    return tree
+
+def run_pipeline(semantic_analyzer: intrprt.SemanticAnalyzer, interpreter: intrprt.Interpreter):
+    """Parse, analyze and execute the input one top-level statement at a time"""
+    if args.input_file != STDIN_PATH:
+        validate_input_file((SOURCE_SUFFIX,))
+        # The source is streamed, rather than read to memory, unless the legacy lexer is used
+        args.stream = args.stream or not args.legacy_lexer
+
+    with ExitStack() as resources:
+        parser = intrprt.Parser(open_lexer(resources), args.intern)
+        pipeline = intrprt.Pipeline(parser, semantic_analyzer, interpreter)
+
+        try:
+            for output in pipeline.run():
+                print(output, flush=True)
+        except (intrprt.LexerError,intrprt.SemanticError, intrprt.ParserError,intrprt.InterpreterError) as e:
+            print(e.message)
+            exit(1)
+        except Exception as e:
+            print(e)
+            exit(1)
+
+    if args.token_stats:
+        print(parser.tokens)
+
+    print_engine_details(interpreter)
+
+def print_engine_details(interpreter):
+    if args.frame_stats:
+        print(interpreter.call_stack.pool)
+
+    if args.memo_stats:
+        for symbol, cache in interpreter.memo_caches.items():
+            if cache is not None:
+                print(f'{symbol.name}: {cache}')
+
+    if args.disassemble:
+        for code in interpreter.statements:
+            print(intrprt.disassemble(code))
+
+def parse(semantic_analyzer: intrprt.SemanticAnalyzer, interpreter: intrprt.Interpreter):
+    if args.engine == 'closure':
+        interpreter = intrprt.ClosureCompiler()
+    elif args.engine == 'python':
+        interpreter = intrprt.PythonCompiler()
+    elif args.engine == 'vm':
+        interpreter = intrprt.VirtualMachine(args.memory_budget)
+
+    if args.pipeline or args.input_file == STDIN_PATH:
+        return run_pipeline(semantic_analyzer, interpreter)
+
+    validate_input_file((SOURCE_SUFFIX, COMPILED_SUFFIX))
 
     try:
-        lexer = intrprt.Lexer(content)
-        parser = intrprt.Parser(lexer)
-        tree = parser.parse()
-        semantic_analyzer.visit(tree)
+        tree = load_program(semantic_analyzer)
 
         for output in interpreter.interpret(tree):
             print(output)
-    except (intrprt.LexerError,intrprt.SemanticError, intrprt.ParserError,intrprt.InterpreterError) as e:
+    except (intrprt.LexerError,intrprt.SemanticError, intrprt.ParserError,intrprt.InterpreterError,intrprt.SerializationError) as e:
         print(e.message)
         exit(1)
     except Exception as e:
         print(e)
         exit(1)
 
+    print_engine_details(interpreter)
+
+def compile_source(semantic_analyzer: intrprt.SemanticAnalyzer, interpreter: intrprt.Interpreter):
+    validate_input_file((SOURCE_SUFFIX,))
+
+    output_file = args.output_file or args.input_file.with_suffix(COMPILED_SUFFIX)
+
+    try:
+        tree = analyze_source(semantic_analyzer)
+        output_file.write_bytes(intrprt.dumps(tree))
+    except (intrprt.LexerError,intrprt.SemanticError, intrprt.ParserError,intrprt.SerializationError) as e:
+        print(e.message)
+        exit(1)
+    except Exception as e:
+        print(e)
+        exit(1)
+
+def cache(semantic_analyzer: intrprt.SemanticAnalyzer, interpreter: intrprt.Interpreter):
+    result_cache = intrprt.ResultCache(args.cache_dir)
+
+    try:
+        if args.action == 'clear':
+            result_cache.clear()
+            print(f'Cleared {result_cache.path}')
+        else:
+            print(f'path: {result_cache.path}')
+
+            for name, value in result_cache.stats().items():
+                print(f'{name}: {value}')
+    finally:
+        result_cache.close()
+
+# The options only some engines of parse support: their destination, and those engines
+ENGINE_OPTIONS = {
+    '--show-stack': ('log_stack', ('tree',)),
+    '--show-frame-stats': ('frame_stats', ('tree',)),
+    '--memo': ('memo', ('tree',)),
+    '--memo-size': ('memo_size', ('tree',)),
+    '--show-memo-stats': ('memo_stats', ('tree',)),
+    '--result-cache': ('result_cache', ('tree',)),
+    '--result-cache-size': ('result_cache_size', ('tree',)),
+    '--memory-budget': ('memory_budget', ('tree', 'vm')),
+    '--disassemble': ('disassemble', ('vm',)),
+}
+
+def parse_size(text: str) -> int:
+    units = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+    unit = units.get(text[-1:].upper(), 1)
+
+    try:
+        size = int(text[:-1] if unit > 1 else text) * unit
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'invalid size: {text!r}')
+
+    if size <= 0:
+        raise argparse.ArgumentTypeError(f'invalid size: {text!r}')
+
+    return size
+
 def configure_parameters() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description='Functional Language Parser'
@@ -88,29 +250,236 @@ def configure_parameters() -> argparse.Namespace:
         action='store_true',
         dest='log_stack'
     )
+    parser.add_argument(
+        '--legacy-lexer',
+        help='Tokenize with the original character-by-character lexer',
+        action='store_true',
+        dest='legacy_lexer'
+    )
+    parser.add_argument(
+        '--show-token-stats',
+        help='Print how many tokens were scanned and consumed while parsing',
+        action='store_true',
+        dest='token_stats'
+    )
+    parser.add_argument(
+        '--show-intern-stats',
+        help='Print the sharing ratio and memory saved by --intern',
+        action='store_true',
+        dest='intern_stats'
+    )
+    parser.add_argument(
+        '--show-frame-stats',
+        help='Print how many activation records were reused from the frame pool, by arity',
+        action='store_true',
+        dest='frame_stats'
+    )
+    parser.add_argument(
+        '--memo',
+        help='Cache the results of function calls: of the functions classified as memoizable (auto), or of all functions (default: off)',
+        choices=[mode.value for mode in intrprt.MemoMode],
+        default=intrprt.MemoMode.OFF.value
+    )
+    parser.add_argument(
+        '--memo-size',
+        help=f'Maximum number of results cached per function, the least recently used are evicted (default: {intrprt.DEFAULT_MEMO_SIZE})',
+        type=int,
+        default=intrprt.DEFAULT_MEMO_SIZE,
+        dest='memo_size'
+    )
+    parser.add_argument(
+        '--show-memo-stats',
+        help='Print the hits and misses of the result cache of every memoized function',
+        action='store_true',
+        dest='memo_stats'
+    )
+    parser.add_argument(
+        '--result-cache',
+        help='Store the results of memoizable functions on disk (in the --cache-dir of parse), and reuse them in later runs (implies --memo=auto)',
+        action='store_true',
+        dest='result_cache'
+    )
+    parser.add_argument(
+        '--result-cache-size',
+        help=f'Maximum number of results stored on disk, the least recently used are evicted (default: {intrprt.DEFAULT_RESULT_CACHE_SIZE})',
+        type=int,
+        default=intrprt.DEFAULT_RESULT_CACHE_SIZE,
+        dest='result_cache_size'
+    )
+    parser.add_argument(
+        '--memory-budget',
+        help='Memory available for recursion, in bytes, or with a K, M or G suffix (default: 1G)',
+        type=parse_size,
+        default=intrprt.DEFAULT_MEMORY_BUDGET,
+        dest='memory_budget'
+    )
 
     subparsers = parser.add_subparsers(required=True, dest="mode")
 
-    parser_parse = subparsers.add_parser('parse', description="parse a source file and print the output to screen")
-    parser_parse.add_argument(
+    source_parser = argparse.ArgumentParser(add_help=False)
+    source_parser.add_argument(
         '-f',
         '--input-file',
-        help='Source file path',
+        help='Source file path (parse: "-" reads the source from stdin, see --pipeline)',
         type=Path,
         required=True
     )
+    source_parser.add_argument(
+        '--stream',
+        help='Read the source file in fixed-size chunks instead of loading it to memory',
+        action='store_true'
+    )
+    source_parser.add_argument(
+        '--mmap',
+        help='Memory-map the source file and read it in fixed-size chunks',
+        action='store_true'
+    )
+    source_parser.add_argument(
+        '--chunk-size',
+        help='Chunk size used by --stream and --mmap',
+        type=int,
+        default=intrprt.lexer.DEFAULT_CHUNK_SIZE,
+        dest='chunk_size'
+    )
+    source_parser.add_argument(
+        '-j',
+        '--jobs',
+        help='Lex and parse large source files in this many processes (0: one per CPU)',
+        type=int,
+        default=1
+    )
+    source_parser.add_argument(
+        '--intern',
+        help='Share structurally identical side-effect-free subtrees of the AST',
+        action='store_true'
+    )
+
+    parser_parse = subparsers.add_parser(
+        'parse',
+        parents=[source_parser],
+        description="parse a source (or compiled) file and print the output to screen"
+    )
+    parser_parse.add_argument(
+        '--no-cache',
+        help='Always parse and analyze the source file, without using the program cache',
+        action='store_true',
+        dest='no_cache'
+    )
+    parser_parse.add_argument(
+        '--cache-dir',
+        help='Directory of the program cache (default: ~/.cache/lambda)',
+        type=Path,
+        dest='cache_dir'
+    )
+    parser_parse.add_argument(
+        '--pipeline',
+        help='Parse, analyze and execute one top-level statement at a time, printing each output right away',
+        action='store_true'
+    )
+    parser_parse.add_argument(
+        '--engine',
+        help='Execute with the tree-walking interpreter, or compile the program into Python closures / Python source / bytecode first',
+        choices=('tree', 'closure', 'python', 'vm'),
+        default='tree'
+    )
+    parser_parse.add_argument(
+        '--disassemble',
+        help='Print the bytecode of every executed statement (with --engine=vm)',
+        action='store_true'
+    )
     parser_parse.set_defaults(func=parse)
 
+    parser_compile = subparsers.add_parser(
+        'compile',
+        parents=[source_parser],
+        description="parse and analyze a source file, and save it as a compiled (.lambdac) file"
+    )
+    parser_compile.add_argument(
+        '-o',
+        '--output-file',
+        help='Compiled file path (default: the source file path with a .lambdac suffix)',
+        type=Path,
+        dest='output_file'
+    )
+    parser_compile.set_defaults(func=compile_source)
+
+    parser_cache = subparsers.add_parser(
+        'cache',
+        description="show the statistics of the on-disk result cache (see --result-cache), or clear it"
+    )
+    parser_cache.add_argument(
+        'action',
+        choices=('stats', 'clear')
+    )
+    parser_cache.add_argument(
+        '--cache-dir',
+        help='Directory of the result cache (default: ~/.cache/lambda)',
+        type=Path,
+        dest='cache_dir'
+    )
+    parser_cache.set_defaults(func=cache)
+
     parser_prompt = subparsers.add_parser('prompt')    
     parser_prompt.set_defaults(func=prompt)
     
     
     args = parser.parse_args()
+
+    if args.mode in ('parse', 'compile'):
+        check_source_options(parser_parse if args.mode == 'parse' else parser_compile, args)
+
+    if args.mode == 'parse':
+        check_engine_options(parser, parser_parse, args)
+
     return args
 
+def check_source_options(parser_mode: argparse.ArgumentParser, args: argparse.Namespace):
+    """Exits with a usage error if source options are combined which exclude each other, rather than ignoring one of them."""
+    streamed = args.stream or args.mmap
+    # parse --pipeline, and parse -f -, read the source through their own (streaming) lexer
+    pipelined = args.mode == 'parse' and (args.pipeline or args.input_file == STDIN_PATH)
+
+    if args.legacy_lexer and streamed:
+        parser_mode.error('--legacy-lexer reads the whole file, and is not supported with --stream or --mmap')
+
+    if args.legacy_lexer and args.mode == 'parse' and args.input_file == STDIN_PATH:
+        parser_mode.error('--legacy-lexer is not supported when reading the source from stdin')
+
+    if args.jobs != 1 and (streamed or args.legacy_lexer or pipelined):
+        parser_mode.error('-j/--jobs is not supported with --stream, --mmap, --legacy-lexer, --pipeline or stdin input')
+
+def check_engine_options(parser: argparse.ArgumentParser, parser_parse: argparse.ArgumentParser, args: argparse.Namespace):
+    """Exits with a usage error if options are set which the selected --engine doesn't support, rather than ignoring them."""
+    for option, (dest, engines) in ENGINE_OPTIONS.items():
+        default = parser.get_default(dest)
+
+        if default is None:
+            # An option of the parse command
+            default = parser_parse.get_default(dest)
+
+        if getattr(args, dest) != default and args.engine not in engines:
+            supported = ' or '.join(f'--engine={engine}' for engine in engines)
+            parser_parse.error(f'{option} is only supported with {supported}')
+
 if __name__ == "__main__":
     args = configure_parameters()
 
     semantic_analyzer = intrprt.SemanticAnalyzer(args.log_scope)
-    interpreter = intrprt.Interpreter(args.log_stack)
-    args.func(semantic_analyzer,interpreter)
\ No newline at end of file
+    memo_mode = intrprt.MemoMode(args.memo)
+    result_cache = None
+
+    if args.result_cache and args.mode != 'cache':
+        result_cache = intrprt.ResultCache(getattr(args, 'cache_dir', None), args.result_cache_size)
+
+        if memo_mode is intrprt.MemoMode.OFF:
+            memo_mode = intrprt.MemoMode.AUTO
+
+    interpreter = intrprt.Interpreter(args.log_stack, args.memory_budget, memo_mode, args.memo_size, result_cache)
+    # Results of deep recursion (e.g. factorial(5000)) can have many digits
+    sys.set_int_max_str_digits(0)
+
+    try:
+        args.func(semantic_analyzer,interpreter)
+    finally:
+        if result_cache is not None:
+            result_cache.close()
\ No newline at end of file
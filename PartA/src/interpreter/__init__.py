@@ -1,6 +1,19 @@
-from .lexer import Lexer
+from .lexer import Lexer,LegacyLexer,StreamLexer,TokenBuffer,create_lexer
 from .parser import Parser
-from .errors import LexerError,ParserError,SemanticError,InterpreterError
+from .errors import LexerError,ParserError,SemanticError,InterpreterError,SerializationError
 from .semantic_analyzer import SemanticAnalyzer
-from .interpreter import Interpreter
-from .ast import Program
\ No newline at end of file
+from .interpreter import Interpreter,DEFAULT_MEMORY_BUDGET
+from .memo import MemoCache,MemoMode,DEFAULT_MEMO_SIZE
+from .result_cache import ResultCache,DEFAULT_RESULT_CACHE_SIZE
+from .closure_compiler import ClosureCompiler
+from .codegen import PythonCompiler
+from .vm import VirtualMachine
+from .bytecode import BytecodeCompiler,disassemble
+from .ast import Program
+from .node_table import NodeTable
+from .interning import NodeInterner
+from .parallel import ParallelParser
+from .pipeline import Pipeline
+from .repl import Repl
+from .token import TokenArray
+from .serializer import ProgramCache,dumps,loads,source_hash
@@ -1,12 +1,21 @@
 from .token import Token
-from uuid import uuid4
+from itertools import count
 from .symbol import CallableSymbol
 from abc import ABCMeta
 
+# Numbers the (anonymous) lambdas, see `Lambda.lambda_name`
+_lambda_ids = count(1)
+
 class AST(metaclass=ABCMeta):
     """
     The base class for all nodes in the Abstract Syntax Tree (AST).
+
+    Nodes declare their attributes in `__slots__`, so they have no `__dict__`.
+    Attributes which are derived from the node's token (e.g. `Integer.value`)
+    are properties rather than stored copies.
     """
+    __slots__ = ()
+
     def __str__(self) -> str:
         return "<" + self.__class__.__name__ + ">"
     
@@ -20,6 +29,8 @@ class Program(AST):
     Attributes:
         statements (list[AST]): A list of AST nodes representing the statements in the program.
     """
+    __slots__ = ('statements',)
+
     def __init__(self, statements: list[AST]) -> None:
         self.statements = statements
 
@@ -31,9 +42,14 @@ class Integer(AST):
         token (Token): The token associated with the integer literal.
         value (int): The integer value of the token.
     """
+    __slots__ = ('token',)
+
     def __init__(self, token: Token):
         self.token = token
-        self.value: int = token.value
+
+    @property
+    def value(self) -> int:
+        return self.token.value
 
 class Boolean(AST):
     """
@@ -43,9 +59,14 @@ class Boolean(AST):
         token (Token): The token associated with the boolean literal.
         value (bool): The boolean value of the token.
     """
+    __slots__ = ('token',)
+
     def __init__(self, token: Token) -> None:
         self.token = token
-        self.value = token.value
+
+    @property
+    def value(self) -> bool:
+        return self.token.value
 
 class BinOp(AST):
     """
@@ -59,10 +80,16 @@ class BinOp(AST):
     Usage:
         bin_op_node = BinOp(left=expr1, op=plus_token, right=expr2)
     """
+    __slots__ = ('left', 'token', 'right')
+
     def __init__(self, left: AST, op: Token, right: AST):
         self.left = left
-        self.token = self.op = op
+        self.token = op
         self.right = right
+
+    @property
+    def op(self) -> Token:
+        return self.token
     
     def __str__(self) -> str:
         return f"{super().__str__()}(left={self.left}, op={self.op}, right={self.right})"
@@ -78,10 +105,16 @@ class UnaryOp(AST):
     Usage:
         unary_op_node = UnaryOp(op=minus_token, expr=expr)
     """
+    __slots__ = ('token', 'expr')
+
     def __init__(self, op: Token, expr: Token):
-        self.token = self.op = op
+        self.token = op
         self.expr = expr
 
+    @property
+    def op(self) -> Token:
+        return self.token
+
     def __str__(self) -> str:
         return f"{super().__str__()}(op={self.op}, value={self.expr})"
     
@@ -95,6 +128,8 @@ class NotOp(AST):
     Usage:
         not_op_node = NotOp(expr=expr_node)
     """
+    __slots__ = ('expr',)
+
     def __init__(self,expr: AST) -> None:
         self.expr = expr
 
@@ -108,13 +143,24 @@ class Param(AST):
     Attributes:
         token (Token): The token representing the parameter.
         name (str): The name of the parameter.
+        depth (int | None): The number of frames between the reference and the
+            parameter's frame, set by the semantic analyzer.
+        slot (int | None): The index of the parameter in its frame, set by the semantic
+            analyzer. None for global names (e.g. functions passed as values).
 
     Usage:
         param_node = Param(token=param_token)
     """
+    __slots__ = ('token', 'depth', 'slot')
+
     def __init__(self, token: Token) -> None:
         self.token = token
-        self.name = token.value
+        self.depth: int | None = None
+        self.slot: int | None = None
+
+    @property
+    def name(self) -> str:
+        return self.token.value
     
     def __str__(self) -> str:
         return f"{super().__str__()}(name={self.name})"
@@ -131,6 +177,8 @@ class FunctionDecl(AST):
     Usage:
         func_decl_node = FunctionDecl(name='foo', params=[param1, param2], expr_node=body_expr)
     """
+    __slots__ = ('func_name', 'formal_parameters', 'expr_node', 'symbol')
+
     def __init__(self, name:str, params: list[Param], expr_node: AST):
         self.func_name = name
         self.formal_parameters = params
@@ -150,15 +198,28 @@ class FunctionCall(AST):
         func_name (str): The name of the function being called.
         actual_params (list[AST]): A list of parameter nodes representing the actual arguments passed to the function.
         symbol (CallableSymbol): The symbol representing the function in the symbol table.
+        depth (int | None): When calling a parameter (e.g. a lambda passed as an argument),
+            the number of frames between the call and the parameter's frame.
+        slot (int | None): When calling a parameter, the index of the parameter in its frame.
+        tail (bool): Whether the call is in tail position: its result is the result of
+            the enclosing function (or lambda), so its frame can replace the caller's.
 
     Usage:
         func_call_node = FunctionCall(token=call_token, actual_params=[arg1, arg2])
     """
+    __slots__ = ('token', 'actual_params', 'symbol', 'depth', 'slot', 'tail')
+
     def __init__(self, token: Token, actual_params: list[AST] ) -> None:
         self.token = token
-        self.func_name: str = token.value
         self.actual_params = actual_params
         self.symbol: CallableSymbol = None
+        self.depth: int | None = None
+        self.slot: int | None = None
+        self.tail = False
+
+    @property
+    def func_name(self) -> str:
+        return self.token.value
     
     def __str__(self) -> str:
         param_str = [str(param) for param in self.actual_params]
@@ -169,8 +230,8 @@ class Lambda(AST):
     Represents a lambda expression in the AST.
 
     Attributes:
-        lambda_name (str): The unique name of the lambda expression, generated using a UUID.
-        param (List[Param]): The parameter of the lambda expression.
+        lambda_name (str): The unique name of the lambda expression. Generated on first use.
+        formal_params (List[Param]): The parameters of the lambda expression.
         expr_node (AST): The body expression of the lambda.
         symbol (CallableSymbol): The symbol representing the lambda in the symbol table.
 
@@ -178,17 +239,33 @@ class Lambda(AST):
     Usage:
         lambda_node = Lambda(formal_parameters=params, expr_node=body_expr)
     """
+    __slots__ = ('_lambda_name', 'token', 'formal_params', 'expr_node', 'symbol')
+
     def __init__(self,token: Token, formal_parameters:list[Param], expr_node: AST) -> None:
-        self.lambda_name:str = f"lambda_{str(uuid4())[:8]}" # TODO: consider removing
+        self._lambda_name: str = None
         self.token =token
         self.formal_params = formal_parameters
         self.expr_node = expr_node
         self.symbol: CallableSymbol = None
 
+    @property
+    def lambda_name(self) -> str:
+        if self._lambda_name is None:
+            self._lambda_name = f"lambda_{next(_lambda_ids)}"
+
+        return self._lambda_name
+
+    @lambda_name.setter
+    def lambda_name(self, name: str) -> None:
+        self._lambda_name = name
+
     def __str__(self):
-        return f"{super().__str__()}(name={self.lambda_name}, param={self.param}, expr={self.expr_node})"
+        param_str = [str(param) for param in self.formal_params]
+        return f"{super().__str__()}(name={self.lambda_name}, params=[{",".join(param_str)}], expr={self.expr_node})"
 
 class NestedLambda(AST):
+    __slots__ = ('lambda_node', 'actual_params')
+
     def __init__(self, lambda_node: Lambda, actual_params: list[AST]) -> None:
         self.lambda_node = lambda_node
         self.actual_params = actual_params
@@ -200,8 +277,30 @@ class NoOp(AST):
     Usage:
         noop_node = NoOp()
     """
-    pass
+    __slots__ = ()
 
     def __str__(self) -> str:
         return f"{super().__str__()}()"
-    
\ No newline at end of file
+    
+def node_token(node: AST) -> Token | None:
+    """
+    Returns the token of a node, to report errors at. Nodes without a token of their
+    own (e.g. `NotOp` and `FunctionDecl`) report them at the token of their operand or body.
+
+    Args:
+        node (AST): The node.
+
+    Returns:
+        Token | None: The token, or None if the node and its operands have none (e.g. `NoOp`).
+    """
+    while not hasattr(node, 'token'):
+        if isinstance(node, NotOp):
+            node = node.expr
+        elif isinstance(node, NestedLambda):
+            node = node.lambda_node
+        elif isinstance(node, FunctionDecl):
+            node = node.expr_node
+        else:
+            return None
+
+    return node.token
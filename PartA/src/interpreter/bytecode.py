@@ -0,0 +1,343 @@
+from array import array
+from enum import IntEnum
+from typing import Iterable
+from .token import Token,TokenType
+from .ast import (
+    AST,
+    BinOp,
+    Boolean,
+    FunctionCall,
+    FunctionDecl,
+    Integer,
+    Lambda,
+    NoOp,
+    NotOp,
+    Param,
+    UnaryOp,
+    NestedLambda
+)
+from .interpreter import NodeVisitor,yields_children
+from .symbol import CallableSymbol
+
+class Opcode(IntEnum):
+    """The instructions of the bytecode `VirtualMachine`.
+
+    Every instruction is two integers: the opcode and its argument (0 when unused).
+    """
+    LOAD_SLOT           = 0     # Push slot `arg` of the current frame
+    LOAD_CONST          = 1     # Push constant `arg`
+    LOAD_DEREF          = 2     # Push a slot of a frame further up, at the (depth, slot) address in constant `arg`
+    LOAD_GLOBAL         = 3     # Push the declared function named by constant `arg`
+    ADD                 = 4
+    SUB                 = 5
+    MUL                 = 6
+    DIV                 = 7     # Integer division, raising DIV_ZERO at the token in constant `arg`
+    MOD                 = 8
+    EQ                  = 9
+    NE                  = 10
+    GT                  = 11
+    GE                  = 12
+    LT                  = 13
+    LE                  = 14
+    NEG                 = 15
+    POS                 = 16
+    NOT                 = 17
+    JUMP_IF_FALSE_OR_POP = 18   # If the top of the stack is falsy jump to `arg`, otherwise pop it
+    JUMP_IF_TRUE_OR_POP = 19    # If the top of the stack is truthy jump to `arg`, otherwise pop it
+    CALL                = 20    # Call the code object in constant `arg` with its arity's arguments
+    CHECK_CALLABLE      = 21    # Raise at the token in constant `arg` unless the top of the stack is a function
+    CALL_VALUE          = 22    # Call the function value below `arg` arguments
+    APPLY               = 23    # Apply the lambda code object in constant `arg`, linked to the current frame
+    MAKE_CLOSURE        = 24    # Pop the free variables of the lambda code object in constant `arg`, push its closure
+    DECLARE             = 25    # Declare the function of the symbol in constant `arg`
+    RETURN              = 26    # Return the top of the stack to the calling frame
+
+BINARY_OPCODES = {
+    TokenType.PLUS:             Opcode.ADD,
+    TokenType.MINUS:            Opcode.SUB,
+    TokenType.MUL:              Opcode.MUL,
+    TokenType.DIV:              Opcode.DIV,
+    TokenType.MODULO:           Opcode.MOD,
+    TokenType.EQUAL:            Opcode.EQ,
+    TokenType.NOT_EQUAL:        Opcode.NE,
+    TokenType.GREATER_THAN:     Opcode.GT,
+    TokenType.GREATER_THAN_EQ:  Opcode.GE,
+    TokenType.LESS_THAN:        Opcode.LT,
+    TokenType.LESS_THAN_EQ:     Opcode.LE,
+}
+
+# Opcodes whose argument is a constant index, a slot, or a jump target (for the disassembler)
+CONSTANT_ARGS = frozenset((
+    Opcode.LOAD_CONST, Opcode.LOAD_GLOBAL, Opcode.DIV, Opcode.CALL, Opcode.CHECK_CALLABLE,
+    Opcode.APPLY, Opcode.MAKE_CLOSURE, Opcode.DECLARE,
+))
+JUMP_ARGS = frozenset((Opcode.JUMP_IF_FALSE_OR_POP, Opcode.JUMP_IF_TRUE_OR_POP))
+
+class CodeObject:
+    """The bytecode of a function, lambda or top-level statement.
+
+    `code` is a flat array of (opcode, argument) pairs, so instructions can be
+    stored and loaded as bytes (`code.tobytes()`). Arguments refer to the slots
+    of the frame, to `constants`, or to instruction offsets.
+
+    Attributes:
+        name (str): The name of the function (or `<statement>`).
+        symbol (CallableSymbol): The symbol of the function, None for statements.
+        arity (int): The number of parameters.
+        code (array): The instructions.
+        constants (list): The constant pool: literals, names, (depth, slot) addresses, tokens, symbols and code objects.
+        names (list[str]): The names of the slots (parameters, then free variables).
+        calls (dict[int, Token]): The token of every call instruction, by offset, where errors raised by the call are reported.
+    """
+    __slots__ = ('name', 'symbol', 'arity', 'code', 'constants', 'names', 'calls', '_constant_indices')
+
+    def __init__(self, name: str, symbol: CallableSymbol | None = None) -> None:
+        self.name = name
+        self.symbol = symbol
+        self.arity = len(symbol.formal_params) if symbol is not None else 0
+        self.code = array('i')
+        self.constants: list = []
+        self.names: list[str] = []
+        self.calls: dict[int, Token] = {}
+        self._constant_indices: dict = {}
+
+        if symbol is not None:
+            self.names = [param.name for param in symbol.formal_params] + [param.name for param in symbol.free_vars]
+
+    def emit(self, opcode: Opcode, arg: int = 0) -> int:
+        """Appends an instruction, returning its offset."""
+        offset = len(self.code)
+        self.code.append(opcode)
+        self.code.append(arg)
+        return offset
+
+    def patch(self, offset: int, arg: int) -> None:
+        """Sets the argument of the instruction at `offset`."""
+        self.code[offset + 1] = arg
+
+    def constant(self, value) -> int:
+        """Returns the index of a value in the constant pool, adding it if needed."""
+        # Literals and addresses are pooled by value (and type, since True == 1), other objects by identity
+        key = (type(value), value) if isinstance(value, (int, str, tuple)) else (type(value), id(value))
+        index = self._constant_indices.get(key)
+
+        if index is None:
+            index = self._constant_indices[key] = len(self.constants)
+            self.constants.append(value)
+
+        return index
+
+    def __str__(self) -> str:
+        return f'{self.__class__.__name__}(name={self.name}, instructions={len(self.code) // 2})'
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+class BytecodeCompiler(NodeVisitor):
+    """Compiles analyzed ASTs into `CodeObject`s for the `VirtualMachine`.
+
+    Expressions compile to stack code: operands are pushed, and operators pop
+    them and push their result. `&&` and `||` compile to conditional jumps over
+    their right operand, calls of declared functions to `CALL` (with the arity of
+    the function's `CallableSymbol.formal_params`), and lambdas to code objects of
+    their own. Visits are generators, so deeply nested expressions compile without
+    recursion.
+
+    Attributes:
+        functions (dict[CallableSymbol, CodeObject]): The code objects of the compiled functions and lambdas.
+
+    Usage:
+        compiler = BytecodeCompiler()
+        code = compiler.compile(statement)
+        print(disassemble(code))
+    """
+    def __init__(self) -> None:
+        self.functions: dict[CallableSymbol, CodeObject] = {}
+        # The code object being compiled
+        self._code: CodeObject = None
+
+    def compile(self, statement: AST) -> CodeObject:
+        """Compiles a top-level statement into a code object returning its result."""
+        code = CodeObject('<statement>')
+        self.compile_into(code, statement)
+        return code
+
+    def compile_into(self, code: CodeObject, node: AST) -> None:
+        """Compiles a node, followed by a `RETURN`, into `code`."""
+        enclosing_code = self._code
+        self._code = code
+
+        try:
+            self.visit(node)
+            code.emit(Opcode.RETURN)
+        finally:
+            self._code = enclosing_code
+
+    def function(self, symbol: CallableSymbol) -> CodeObject:
+        """Returns the code object of a function (or lambda), compiling it the first time.
+
+        The code object is registered before its body is compiled, so recursive
+        calls in the body refer to it.
+        """
+        code = self.functions.get(symbol)
+
+        if code is None:
+            code = self.functions[symbol] = CodeObject(symbol.name, symbol)
+            self.compile_into(code, symbol.expr_ast)
+
+        return code
+
+    def visit_NoOp(self, node: NoOp) -> None:
+        self._code.emit(Opcode.LOAD_CONST, self._code.constant(None))
+
+    def visit_Integer(self, node: Integer) -> None:
+        self._code.emit(Opcode.LOAD_CONST, self._code.constant(node.value))
+
+    def visit_Boolean(self, node: Boolean) -> None:
+        self._code.emit(Opcode.LOAD_CONST, self._code.constant(node.value))
+
+    def visit_Param(self, node: Param) -> None:
+        self.load(node.name, node.depth, node.slot)
+
+    def load(self, name: str, depth: int | None, slot: int | None) -> None:
+        """Emits the load of a parameter (by its address) or of a declared function (by name)."""
+        if slot is None:
+            self._code.emit(Opcode.LOAD_GLOBAL, self._code.constant(name))
+        elif depth == 0:
+            self._code.emit(Opcode.LOAD_SLOT, slot)
+        else:
+            self._code.emit(Opcode.LOAD_DEREF, self._code.constant((depth, slot)))
+
+    def visit_FunctionDecl(self, node: FunctionDecl) -> None:
+        self.function(node.symbol)
+        self._code.emit(Opcode.DECLARE, self._code.constant(node.symbol))
+        self._code.emit(Opcode.LOAD_CONST, self._code.constant(None))
+
+    @yields_children
+    def visit_NotOp(self, node: NotOp) -> None:
+        yield node.expr
+        self._code.emit(Opcode.NOT)
+
+    @yields_children
+    def visit_UnaryOp(self, node: UnaryOp) -> None:
+        yield node.expr
+        self._code.emit(Opcode.NEG if node.op.type == TokenType.MINUS else Opcode.POS)
+
+    @yields_children
+    def visit_BinOp(self, node: BinOp) -> None:
+        op_type = node.op.type
+
+        yield node.left
+
+        if op_type in (TokenType.AND, TokenType.OR):
+            jump = Opcode.JUMP_IF_FALSE_OR_POP if op_type == TokenType.AND else Opcode.JUMP_IF_TRUE_OR_POP
+            offset = self._code.emit(jump)
+            yield node.right
+            self._code.patch(offset, len(self._code.code))
+            return
+
+        yield node.right
+
+        opcode = BINARY_OPCODES[op_type]
+        self._code.emit(opcode, self._code.constant(node.token) if opcode == Opcode.DIV else 0)
+
+    def visit_Lambda(self, node: Lambda) -> None:
+        symbol = node.symbol
+
+        for depth, slot in symbol.captures:
+            self.load(None, depth, slot)
+
+        self._code.emit(Opcode.MAKE_CLOSURE, self._code.constant(self.function(symbol)))
+
+    @yields_children
+    def visit_NestedLambda(self, node: NestedLambda) -> None:
+        symbol = node.lambda_node.symbol
+
+        if symbol is None:
+            # Raises SYMBOL_NOT_FOUND when it runs
+            self._code.emit(Opcode.LOAD_CONST, self._code.constant(None))
+            self._code.emit(Opcode.CHECK_CALLABLE, self._code.constant(node.lambda_node.token))
+            return
+
+        args = 0
+
+        for _, arg in zip(symbol.formal_params, node.actual_params):
+            yield arg
+            args += 1
+
+        # Missing arguments are unbound
+        for _ in range(len(symbol.formal_params) - args):
+            self._code.emit(Opcode.LOAD_CONST, self._code.constant(None))
+
+        offset = self._code.emit(Opcode.APPLY, self._code.constant(self.function(symbol)))
+        self._code.calls[offset] = node.lambda_node.token
+
+    @yields_children
+    def visit_FunctionCall(self, node: FunctionCall) -> None:
+        if node.symbol is not None:
+            for arg in node.actual_params:
+                yield arg
+
+            offset = self._code.emit(Opcode.CALL, self._code.constant(self.function(node.symbol)))
+            self._code.calls[offset] = node.token
+            return
+
+        self.load(node.func_name, node.depth, node.slot)
+        self._code.emit(Opcode.CHECK_CALLABLE, self._code.constant(node.token))
+
+        for arg in node.actual_params:
+            yield arg
+
+        offset = self._code.emit(Opcode.CALL_VALUE, len(node.actual_params))
+        self._code.calls[offset] = node.token
+
+def disassemble(code: CodeObject, recursive: bool = True) -> str:
+    """Returns a readable listing of a code object (and of the code objects in its constants).
+
+    Every line shows the instruction's offset, opcode and argument, and what the
+    argument refers to (a constant, a slot's name, or a jump target).
+    """
+    lines = []
+    pending = [code]
+    listed = set()
+
+    while pending:
+        code = pending.pop(0)
+
+        if id(code) in listed:
+            continue
+
+        listed.add(id(code))
+        lines.append(f'Disassembly of {code.name} (arity {code.arity}, slots {code.names}):')
+
+        for offset in range(0, len(code.code), 2):
+            opcode = Opcode(code.code[offset])
+            arg = code.code[offset + 1]
+            detail = ''
+
+            if opcode in CONSTANT_ARGS:
+                value = code.constants[arg]
+                detail = value.name if isinstance(value, CodeObject) else repr(value)
+
+                if isinstance(value, CodeObject) and recursive:
+                    pending.append(value)
+            elif opcode in JUMP_ARGS:
+                detail = f'to {arg}'
+            elif opcode == Opcode.LOAD_SLOT:
+                detail = code.names[arg] if arg < len(code.names) else ''
+            elif opcode == Opcode.LOAD_DEREF:
+                depth, slot = code.constants[arg]
+                detail = f'depth {depth}, slot {slot}'
+            elif opcode == Opcode.CALL_VALUE:
+                detail = f'{arg} arguments'
+
+            lines.append(f'{offset:>6} {opcode.name:<22}{arg:>6}  {detail}'.rstrip())
+
+        lines.append('')
+
+    return '\n'.join(lines)
+
+def compile_program(statements: Iterable[AST]) -> list[CodeObject]:
+    """Compiles the top-level statements of an analyzed program."""
+    compiler = BytecodeCompiler()
+    return [compiler.compile(statement) for statement in statements]
@@ -0,0 +1,368 @@
+import sys
+import operator
+from typing import Callable, Iterable
+from .token import TokenType,Token
+from .ast import (
+    AST,
+    BinOp,
+    Boolean,
+    FunctionCall,
+    FunctionDecl,
+    Integer,
+    Lambda,
+    NoOp,
+    NotOp,
+    Param,
+    UnaryOp,
+    NestedLambda,
+    node_token
+)
+from .interpreter import NodeVisitor
+from .stack import Closure
+from .symbol import CallableSymbol
+from .errors import ErrorCode,InterpreterError
+
+# Compiled code runs on Python's stack (one Python frame per nested node or call),
+# which doesn't use the C stack for Python-to-Python calls, so the limit can be raised safely
+RECURSION_LIMIT = 1 << 20
+
+# A compiled node: evaluates the node in a frame
+Code = Callable[[list], object]
+
+ARITHMETIC_OPERATORS = {
+    TokenType.EQUAL:            operator.eq,
+    TokenType.NOT_EQUAL:        operator.ne,
+    TokenType.GREATER_THAN_EQ:  operator.ge,
+    TokenType.LESS_THAN_EQ:     operator.le,
+    TokenType.GREATER_THAN:     operator.gt,
+    TokenType.LESS_THAN:        operator.lt,
+    TokenType.PLUS:             operator.add,
+    TokenType.MINUS:            operator.sub,
+    TokenType.MUL:              operator.mul,
+    TokenType.MODULO:           operator.mod,
+}
+
+class CompiledFunction:
+    """The compiled body of a function (or lambda).
+
+    Attributes:
+        symbol (CallableSymbol): The symbol of the function.
+        body (Code): The function's compiled body, called with the function's frame.
+    """
+    __slots__ = ('symbol', 'body')
+
+    def __init__(self, symbol: CallableSymbol) -> None:
+        self.symbol = symbol
+        self.body: Code = None
+
+    def __str__(self) -> str:
+        return f'{self.__class__.__name__}({self.symbol})'
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+def _load(depth: int, slot: int) -> Code:
+    """Compiles a read of the slot of the frame `depth` frames up."""
+    if depth == 0:
+        return lambda frame: frame[slot]
+    if depth == 1:
+        return lambda frame: frame[-1][slot]
+
+    def load(frame):
+        for _ in range(depth):
+            frame = frame[-1]
+        return frame[slot]
+
+    return load
+
+def _constant(node: AST) -> tuple[bool, object]:
+    """Returns whether a node is a literal, and its value."""
+    if isinstance(node, (Integer, Boolean)):
+        return True, node.value
+
+    return False, None
+
+def _own_slot(node: AST) -> int | None:
+    """Returns the slot of a parameter of the current frame, or None for any other node."""
+    if isinstance(node, Param) and node.depth == 0:
+        return node.slot
+
+    return None
+
+class ClosureCompiler(NodeVisitor):
+    """Execution engine compiling the AST into nested Python closures.
+
+    Every node is compiled once into a Python function of a frame, with its
+    operator, constants and parameter addresses bound when it's compiled: a
+    `BinOp` of `+` becomes `lambda frame: left(frame) + right(frame)`, rather than
+    a visit matching the operator on every evaluation. Function (and lambda)
+    bodies are compiled the first time the function is declared or created, and
+    shared by all its calls. The results are the ones of `Interpreter.interpret`.
+
+    A frame is the list of a call's slots (arguments, then captured free variables,
+    see `SemanticAnalyzer`), followed by the frame it is linked to (the frame of
+    an immediately applied lambda's caller, or None). Function values are the
+    symbols and `Closure`s the `Interpreter` uses.
+
+    Compiled code runs on Python's stack, so the recursion limit is raised to
+    `RECURSION_LIMIT` while it runs; deeper programs need the tree-walking `Interpreter`.
+    A statement exceeding it raises an `InterpreterError` (MEMORY_BUDGET_EXCEEDED)
+    at the statement's token, like a call exceeding the interpreter's memory budget.
+
+    Attributes:
+        functions (dict[CallableSymbol, CompiledFunction]): The compiled functions and lambdas.
+        globals (dict[str, CallableSymbol]): The declared functions, by name.
+
+    Usage:
+        engine = ClosureCompiler()
+        for output in engine.interpret(tree):
+            print(output)
+    """
+    def __init__(self) -> None:
+        self.functions: dict[CallableSymbol, CompiledFunction] = {}
+        self.globals: dict[str, CallableSymbol] = {}
+
+    def error(self,error_code: ErrorCode, token: Token):
+        raise InterpreterError(
+            error_code=error_code,
+            token=token
+        )
+
+    def interpret(self, tree: AST):
+        """Compiles and executes a program, yielding the (non-None) result of every statement."""
+        if tree is not None:
+            yield from self.execute(tree.statements)
+
+    def execute(self, statements: Iterable[AST]):
+        """Compiles and executes top-level statements, one at a time.
+
+        Args:
+            statements (Iterable[AST]): The (analyzed) top-level statements of a program.
+
+        Yields:
+            The (non-None) result of every statement.
+        """
+        frame = [None]
+
+        for statement in statements:
+            try:
+                output = self.run(self.compile(statement), frame)
+            except (RecursionError, MemoryError):
+                # Python's stack can't hold the statement's recursion (or nesting)
+                self.error(ErrorCode.MEMORY_BUDGET_EXCEEDED, node_token(statement))
+
+            if output is not None:
+                yield output
+
+    def compile(self, node: AST) -> Code:
+        """Compiles a node into a function of a frame."""
+        recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(recursion_limit, RECURSION_LIMIT))
+
+        try:
+            return self.visit(node)
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+
+    def run(self, code: Code, frame: list):
+        """Evaluates compiled code in a frame."""
+        recursion_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(max(recursion_limit, RECURSION_LIMIT))
+
+        try:
+            return code(frame)
+        finally:
+            sys.setrecursionlimit(recursion_limit)
+
+    def function(self, symbol: CallableSymbol) -> CompiledFunction:
+        """Returns the compiled function of a symbol, compiling its body the first time.
+
+        The function is registered before its body is compiled, so recursive calls
+        in the body refer to it.
+        """
+        function = self.functions.get(symbol)
+
+        if function is None:
+            function = self.functions[symbol] = CompiledFunction(symbol)
+            function.body = self.visit(symbol.expr_ast)
+
+        return function
+
+    def visit_NoOp(self, node: NoOp) -> Code:
+        return lambda frame: None
+
+    def visit_Integer(self, node: Integer) -> Code:
+        value = node.value
+        return lambda frame: value
+
+    def visit_Boolean(self, node: Boolean) -> Code:
+        value = node.value
+        return lambda frame: value
+
+    def visit_Param(self, node: Param) -> Code:
+        if node.slot is not None:
+            return _load(node.depth, node.slot)
+
+        name = node.name
+        functions = self.globals
+        return lambda frame: functions.get(name)
+
+    def visit_FunctionDecl(self, node: FunctionDecl) -> Code:
+        symbol = node.symbol
+        self.function(symbol)
+        functions = self.globals
+        name = node.func_name
+
+        def declare(frame):
+            functions[name] = symbol
+
+        return declare
+
+    def visit_NotOp(self, node: NotOp) -> Code:
+        expr = self.visit(node.expr)
+        return lambda frame: not expr(frame)
+
+    def visit_UnaryOp(self, node: UnaryOp) -> Code:
+        expr = self.visit(node.expr)
+
+        match node.op.type:
+            case TokenType.PLUS:
+                return lambda frame: +expr(frame)
+            case TokenType.MINUS:
+                return lambda frame: -expr(frame)
+
+    def visit_BinOp(self, node: BinOp) -> Code:
+        op_type = node.op.type
+        left = self.visit(node.left)
+        right = self.visit(node.right)
+
+        match op_type:
+            case TokenType.AND:
+                return lambda frame: left(frame) and right(frame)
+            case TokenType.OR:
+                return lambda frame: left(frame) or right(frame)
+            case TokenType.DIV:
+                token = node.token
+                error = self.error
+
+                def divide(frame):
+                    left_val = left(frame)
+                    right_val = right(frame)
+
+                    if right_val == 0:
+                        error(error_code=ErrorCode.DIV_ZERO, token=token)
+
+                    return left_val // right_val
+
+                return divide
+
+        op = ARITHMETIC_OPERATORS[op_type]
+        is_constant, value = _constant(node.right)
+        left_slot = _own_slot(node.left)
+
+        if is_constant:
+            if left_slot is not None:
+                return lambda frame: op(frame[left_slot], value)
+            return lambda frame: op(left(frame), value)
+
+        right_slot = _own_slot(node.right)
+
+        if left_slot is not None and right_slot is not None:
+            return lambda frame: op(frame[left_slot], frame[right_slot])
+
+        return lambda frame: op(left(frame), right(frame))
+
+    def visit_Lambda(self, node: Lambda) -> Code:
+        symbol = node.symbol
+        self.function(symbol)
+        captures = [_load(depth, slot) for depth, slot in symbol.captures]
+
+        return lambda frame: Closure(symbol, [load(frame) for load in captures])
+
+    def visit_NestedLambda(self, node: NestedLambda) -> Code:
+        symbol = node.lambda_node.symbol
+
+        if symbol is None:
+            token = node.lambda_node.token
+            error = self.error
+
+            def not_found(frame):
+                error(error_code=ErrorCode.SYMBOL_NOT_FOUND, token=token)
+
+            return not_found
+
+        function = self.function(symbol)
+        args = [self.visit(arg) for _, arg in zip(symbol.formal_params, node.actual_params)]
+        unbound = [None] * (len(symbol.formal_params) - len(args))
+
+        def apply(frame):
+            lambda_frame = [arg(frame) for arg in args]
+            lambda_frame += unbound
+            lambda_frame.append(frame)
+            return function.body(lambda_frame)
+
+        return apply
+
+    def visit_FunctionCall(self, node: FunctionCall) -> Code:
+        symbol = node.symbol
+
+        if symbol is not None:
+            return self.compile_call(self.function(symbol), node.actual_params)
+
+        if node.slot is not None:
+            load = _load(node.depth, node.slot)
+        else:
+            name = node.func_name
+            functions = self.globals
+            load = lambda frame: functions.get(name)
+
+        args = [self.visit(arg) for arg in node.actual_params]
+        function_of = self.function
+        token = node.token
+        error = self.error
+
+        def call(frame):
+            value = load(frame)
+
+            if value.__class__ is Closure:
+                func_symbol = value.symbol
+                captured = value.captured
+            elif isinstance(value, CallableSymbol):
+                func_symbol = value
+                captured = ()
+            elif value is None:
+                error(error_code=ErrorCode.SYMBOL_NOT_FOUND, token=token)
+            else:
+                error(error_code=ErrorCode.UNEXPECTED_SYMBOL, token=token)
+
+            formal_params = func_symbol.formal_params
+            callee_frame = [arg(frame) for _, arg in zip(formal_params, args)]
+
+            if len(callee_frame) < len(formal_params):
+                callee_frame += [None] * (len(formal_params) - len(callee_frame))
+
+            callee_frame += captured
+            callee_frame.append(None)
+
+            return function_of(func_symbol).body(callee_frame)
+
+        return call
+
+    def compile_call(self, function: CompiledFunction, actual_params: list[AST]) -> Code:
+        """Compiles a call of a declared function, specialized by its number of arguments."""
+        args = [self.visit(arg) for arg in actual_params]
+
+        match args:
+            case []:
+                return lambda frame: function.body([None])
+            case [arg]:
+                return lambda frame: function.body([arg(frame), None])
+            case [arg1, arg2]:
+                return lambda frame: function.body([arg1(frame), arg2(frame), None])
+
+        def call(frame):
+            callee_frame = [arg(frame) for arg in args]
+            callee_frame.append(None)
+            return function.body(callee_frame)
+
+        return call
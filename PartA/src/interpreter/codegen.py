@@ -0,0 +1,372 @@
+import sys
+from typing import Callable, Iterable
+from .token import TokenType,Token
+from .ast import (
+    AST,
+    BinOp,
+    Boolean,
+    FunctionCall,
+    FunctionDecl,
+    Integer,
+    Lambda,
+    NoOp,
+    NotOp,
+    Param,
+    UnaryOp,
+    NestedLambda,
+    node_token
+)
+from .interpreter import NodeVisitor
+from .symbol import CallableSymbol
+from .errors import ErrorCode,InterpreterError
+
+# Generated code runs on Python's stack, see `closure_compiler.RECURSION_LIMIT`
+RECURSION_LIMIT = 1 << 20
+
+BINARY_OPERATORS = {
+    TokenType.AND:              'and',
+    TokenType.OR:               'or',
+    TokenType.EQUAL:            '==',
+    TokenType.NOT_EQUAL:        '!=',
+    TokenType.GREATER_THAN_EQ:  '>=',
+    TokenType.LESS_THAN_EQ:     '<=',
+    TokenType.GREATER_THAN:     '>',
+    TokenType.LESS_THAN:        '<',
+    TokenType.PLUS:             '+',
+    TokenType.MINUS:            '-',
+    TokenType.MUL:              '*',
+    TokenType.MODULO:           '%',
+}
+
+UNARY_OPERATORS = {
+    TokenType.PLUS:     '+',
+    TokenType.MINUS:    '-',
+}
+
+# The precedences of Python's operators (the higher, the tighter they bind)
+OR_PRECEDENCE               = 1
+AND_PRECEDENCE              = 2
+NOT_PRECEDENCE              = 3
+COMPARE_PRECEDENCE          = 4
+ADDITION_PRECEDENCE         = 5
+MULTIPLICATION_PRECEDENCE   = 6
+UNARY_PRECEDENCE            = 7
+ATOM_PRECEDENCE             = 8 # Literals, names and calls
+
+PRECEDENCES = {
+    TokenType.OR:   OR_PRECEDENCE,
+    TokenType.AND:  AND_PRECEDENCE,
+    **{op_type: COMPARE_PRECEDENCE for op_type in (
+        TokenType.EQUAL,
+        TokenType.NOT_EQUAL,
+        TokenType.GREATER_THAN_EQ,
+        TokenType.LESS_THAN_EQ,
+        TokenType.GREATER_THAN,
+        TokenType.LESS_THAN,
+    )},
+    TokenType.PLUS:     ADDITION_PRECEDENCE,
+    TokenType.MINUS:    ADDITION_PRECEDENCE,
+    TokenType.MUL:      MULTIPLICATION_PRECEDENCE,
+    TokenType.MODULO:   MULTIPLICATION_PRECEDENCE,
+    TokenType.DIV:      ATOM_PRECEDENCE, # A call of `_divide`
+}
+
+# The operators a right operand may continue the chain of without parentheses, by operator:
+# `a + (b - c)` is `a + b - c`, `a - (b - c)` is `a - b + c` (on integers), and `and` / `or` give the same value either way
+CHAINED_OPERATORS = {
+    TokenType.AND:      frozenset((TokenType.AND,)),
+    TokenType.OR:       frozenset((TokenType.OR,)),
+    TokenType.PLUS:     frozenset((TokenType.PLUS, TokenType.MINUS)),
+    TokenType.MINUS:    frozenset((TokenType.PLUS, TokenType.MINUS)),
+    TokenType.MUL:      frozenset((TokenType.MUL,)),
+}
+
+# The operator an operand follows once the chain it's in is subtracted
+NEGATED_OPERATORS = {
+    TokenType.PLUS:     TokenType.MINUS,
+    TokenType.MINUS:    TokenType.PLUS,
+}
+
+class PythonFunction:
+    """A function value of generated code: the Python function, and the symbol it was generated from.
+
+    Function values print as their symbol, like the values of the `Interpreter`.
+
+    Attributes:
+        symbol (CallableSymbol): The symbol of the function (or lambda).
+        call (Callable): The generated Python function.
+        arity (int): The number of parameters.
+    """
+    __slots__ = ('symbol', 'call', 'arity')
+
+    def __init__(self, symbol: CallableSymbol, call: Callable) -> None:
+        self.symbol = symbol
+        self.call = call
+        self.arity = len(symbol.formal_params)
+
+    def __str__(self) -> str:
+        return str(self.symbol)
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+def _divide(left, right, token: Token):
+    """Integer division, raising an `InterpreterError` at `token` on division by zero."""
+    if right == 0:
+        raise InterpreterError(error_code=ErrorCode.DIV_ZERO, token=token)
+
+    return left // right
+
+def _callee(function, token: Token, argc: int) -> Callable:
+    """Returns the Python function of a called function value, raising an `InterpreterError` at `token` for other values.
+
+    Missing arguments are unbound (None), and extra arguments are dropped, as in the `Interpreter`.
+    """
+    if function.__class__ is not PythonFunction:
+        error_code = ErrorCode.SYMBOL_NOT_FOUND if function is None else ErrorCode.UNEXPECTED_SYMBOL
+        raise InterpreterError(error_code=error_code, token=token)
+
+    arity = function.arity
+    call = function.call
+
+    if argc == arity:
+        return call
+
+    return lambda *args: call(*args[:arity], *[None] * (arity - len(args)))
+
+def _variable(name: str) -> str:
+    """The Python name of a parameter."""
+    variable = 'v_' + name
+    return variable if variable.isidentifier() else 'v__' + name.encode().hex()
+
+def _function(name: str) -> str:
+    """The Python name of a declared function."""
+    function = 'f_' + name
+    return function if function.isidentifier() else 'f__' + name.encode().hex()
+
+def _value(name: str) -> str:
+    """The Python name of the value (a `PythonFunction`) of a declared function."""
+    return 'F' + _function(name)[1:]
+
+class PythonCompiler(NodeVisitor):
+    """Execution engine translating the AST into Python source, and running it natively.
+
+    Every top-level statement is translated into Python source and compiled with
+    `compile()`: a `Defun` becomes a `def` (and a `PythonFunction` value of it), a
+    lambda becomes a Python `lambda`, and an expression becomes a Python expression.
+    Parameters become Python variables, so lambdas close over the variables of
+    enclosing functions natively. `&&` and `||` become `and` and `or`, which keep
+    the truthy-value semantics of the `Interpreter`. Divisions, and calls of
+    parameters, go through checks raising the `Interpreter`'s errors, at the token
+    of the division or call, so error positions refer to the `.lambda` source.
+    The code of every statement is compiled with the statement's position as its
+    file name (e.g. `<lambda 12:1>`), so Python tracebacks point back to it too.
+
+    Generated code runs on Python's stack, so the recursion limit is raised to
+    `RECURSION_LIMIT` while it runs. Operations are parenthesized only where Python's
+    precedences require it, and chains of operations are written flat. Python's
+    parser still limits the nesting of expressions (e.g. of calls), so very deeply
+    nested programs need the tree-walking `Interpreter`. A statement exceeding either
+    limit raises an `InterpreterError` (MEMORY_BUDGET_EXCEEDED) at the statement's token.
+
+    Attributes:
+        namespace (dict): The globals of the generated code: the declared functions,
+            and the symbols and tokens the code refers to.
+        sources (list[str]): The generated source of every statement.
+
+    Usage:
+        engine = PythonCompiler()
+        for output in engine.interpret(tree):
+            print(output)
+    """
+    def __init__(self) -> None:
+        self.namespace: dict = {
+            '__builtins__': {},
+            'PythonFunction': PythonFunction,
+            '_divide': _divide,
+            '_callee': _callee,
+        }
+        self.sources: list[str] = []
+        # The Python names of the objects (symbols and tokens) the code refers to, by id
+        self._constants: dict[int, str] = {}
+
+    def interpret(self, tree: AST):
+        """Compiles and executes a program, yielding the (non-None) result of every statement."""
+        if tree is not None:
+            yield from self.execute(tree.statements)
+
+    def execute(self, statements: Iterable[AST]):
+        """Translates, compiles and executes top-level statements, one at a time.
+
+        Args:
+            statements (Iterable[AST]): The (analyzed) top-level statements of a program.
+
+        Yields:
+            The (non-None) result of every statement.
+        """
+        recursion_limit = sys.getrecursionlimit()
+
+        for statement in statements:
+            sys.setrecursionlimit(max(recursion_limit, RECURSION_LIMIT))
+
+            try:
+                output = self.run(statement)
+            except (RecursionError, MemoryError):
+                # Python's stack (or, for deeply nested source, Python's parser) can't hold the statement
+                raise InterpreterError(
+                    error_code=ErrorCode.MEMORY_BUDGET_EXCEEDED,
+                    token=node_token(statement)
+                )
+            finally:
+                sys.setrecursionlimit(recursion_limit)
+
+            if output is not None:
+                yield output
+
+    def run(self, statement: AST):
+        """Translates, compiles and executes a top-level statement, returning its result."""
+        source = self.generate(statement)
+        self.sources.append(source)
+
+        token = getattr(statement, 'token', None)
+        position = getattr(token, 'position', None)
+        filename = f'<lambda {position[0]}:{position[1]}>' if position else '<lambda>'
+
+        if isinstance(statement, FunctionDecl):
+            exec(compile(source, filename, 'exec'), self.namespace)
+            return None
+
+        return eval(compile(source, filename, 'eval'), self.namespace)
+
+    def generate(self, statement: AST) -> str:
+        """Translates a top-level statement into Python source (a `def` for declarations, an expression otherwise)."""
+        if not isinstance(statement, FunctionDecl):
+            return self.visit(statement)
+
+        symbol = statement.symbol
+        params = ', '.join(_variable(param.name) for param in symbol.formal_params)
+
+        return (
+            f'def {_function(statement.func_name)}({params}):\n'
+            f'    return {self.visit(symbol.expr_ast)}\n'
+            f'{_value(statement.func_name)} = PythonFunction({self.constant(symbol)}, {_function(statement.func_name)})\n'
+        )
+
+    def constant(self, value: object) -> str:
+        """Returns the Python name of an object (a symbol or token) in the namespace of the generated code."""
+        name = self._constants.get(id(value))
+
+        if name is None:
+            name = self._constants[id(value)] = f'_k{len(self._constants)}'
+            self.namespace[name] = value
+
+        return name
+
+    def visit_NoOp(self, node: NoOp) -> str:
+        return 'None'
+
+    def visit_Integer(self, node: Integer) -> str:
+        return repr(node.value)
+
+    def visit_Boolean(self, node: Boolean) -> str:
+        return repr(node.value)
+
+    def visit_Param(self, node: Param) -> str:
+        if node.slot is not None:
+            return _variable(node.name)
+
+        # A declared function, used as a value
+        return _value(node.name)
+
+    def visit_NotOp(self, node: NotOp) -> str:
+        return f'not {self.operand(node.expr, NOT_PRECEDENCE)}'
+
+    def visit_UnaryOp(self, node: UnaryOp) -> str:
+        return f'{UNARY_OPERATORS[node.op.type]}{self.operand(node.expr, UNARY_PRECEDENCE)}'
+
+    def visit_BinOp(self, node: BinOp) -> str:
+        """Translates a binary operation, and the chain of operations continuing it on the right.
+
+        The parser makes `+`, `-`, `*` and `%` right associative, so a long chain such
+        as `1 + 1 + ... + 1` is nested on the right. Python's are left associative:
+        where the operators allow it (see `CHAINED_OPERATORS`), the chain is written
+        flat, without the parentheses Python's parser limits the nesting of.
+        """
+        op_type = node.op.type
+
+        if op_type == TokenType.DIV:
+            return f'_divide({self.visit(node.left)}, {self.visit(node.right)}, {self.constant(node.token)})'
+
+        precedence = PRECEDENCES[op_type]
+
+        if precedence == COMPARE_PRECEDENCE:
+            # Python chains comparisons (`a < b < c`), so comparison operands are always parenthesized
+            return (
+                f'{self.operand(node.left, COMPARE_PRECEDENCE + 1)} {BINARY_OPERATORS[op_type]} '
+                f'{self.operand(node.right, COMPARE_PRECEDENCE + 1)}'
+            )
+
+        parts = [self.operand(node.left, precedence)]
+        negated = False
+
+        while True:
+            op_type = node.op.type
+            right = node.right
+            parts.append(BINARY_OPERATORS[NEGATED_OPERATORS[op_type] if negated else op_type])
+
+            if not (isinstance(right, BinOp) and right.op.type in CHAINED_OPERATORS.get(op_type, ())):
+                parts.append(self.operand(right, precedence + 1))
+                return ' '.join(parts)
+
+            negated ^= op_type == TokenType.MINUS
+            parts.append(self.operand(right.left, precedence + 1))
+            node = right
+
+    def operand(self, node: AST, precedence: int) -> str:
+        """Translates an operand, parenthesized if its operator binds looser than `precedence`."""
+        source = self.visit(node)
+
+        return f'({source})' if self.precedence(node) < precedence else source
+
+    @staticmethod
+    def precedence(node: AST) -> int:
+        """The precedence of the Python operator a node translates into."""
+        if isinstance(node, BinOp):
+            return PRECEDENCES[node.op.type]
+
+        if isinstance(node, NotOp):
+            return NOT_PRECEDENCE
+
+        if isinstance(node, UnaryOp) or (isinstance(node, Integer) and node.value < 0):
+            return UNARY_PRECEDENCE
+
+        return ATOM_PRECEDENCE
+
+    def lambda_source(self, node: Lambda) -> str:
+        """Translates a lambda into a Python `lambda`."""
+        params = ', '.join(_variable(param.name) for param in node.formal_params)
+
+        return f'(lambda {params}: {self.visit(node.expr_node)})'
+
+    def visit_Lambda(self, node: Lambda) -> str:
+        return f'PythonFunction({self.constant(node.symbol)}, {self.lambda_source(node)})'
+
+    def visit_NestedLambda(self, node: NestedLambda) -> str:
+        lambda_node = node.lambda_node
+        args = [self.visit(arg) for _, arg in zip(lambda_node.formal_params, node.actual_params)]
+        args.extend(['None'] * (len(lambda_node.formal_params) - len(args)))
+
+        return f'{self.lambda_source(lambda_node)}({", ".join(args)})'
+
+    def visit_FunctionCall(self, node: FunctionCall) -> str:
+        args = ', '.join(self.visit(arg) for arg in node.actual_params)
+
+        if node.symbol is not None:
+            return f'{_function(node.func_name)}({args})'
+
+        if node.slot is not None:
+            function = _variable(node.func_name)
+        else:
+            function = _value(node.func_name)
+
+        return f'_callee({function}, {self.constant(node.token)}, {len(node.actual_params)})({args})'
@@ -9,6 +9,8 @@ class ErrorCode(Enum):
     UNEQUAL_PARAM_COUNT = 'Function actual parameters count does not match formal parameters count'
     UNEXPECTED_SYMBOL   = 'Unexpected symbol'
     DIV_ZERO            = 'Division by zero'
+    MEMORY_BUDGET_EXCEEDED = 'Recursion depth exceeds the memory budget'
+    INVALID_COMPILED_PROGRAM = 'Invalid compiled program'
 
 class Error(Exception):
     def __init__(self, error_code=None, token=None, message=None):
@@ -27,4 +29,7 @@ class SemanticError(Error):
     pass
 
 class InterpreterError(Error):
-    pass
\ No newline at end of file
+    pass
+
+class SerializationError(Error):
+    pass
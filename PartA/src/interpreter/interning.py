@@ -0,0 +1,120 @@
+import sys
+from itertools import count
+from .ast import (
+    AST,
+    BinOp,
+    Boolean,
+    FunctionCall,
+    Integer,
+    NotOp,
+    Param,
+    UnaryOp
+)
+
+class NodeInterner:
+    """Hash-consing table of AST nodes.
+
+    `intern` returns a single shared node for structurally identical subtrees.
+    Only side-effect-free nodes, which the semantic analyzer doesn't annotate
+    per occurrence, are shared: literals, parameters, unary / binary operations
+    and function calls whose arguments are shared themselves. Lambdas (which are
+    renamed during the analysis) and declarations are never shared.
+
+    Since children are interned before their parents, a subtree is identified by
+    its node class, its token and the identities of its (shared) children.
+    Parameters and function calls are resolved by the scope they appear in, so they
+    are only shared within the same function or lambda body.
+
+    Note: A shared node keeps the token of its first occurrence, so errors raised
+    while evaluating it point to the first occurrence.
+
+    Attributes:
+        created (int): The number of nodes passed to `intern`.
+        shared (int): The number of nodes replaced by an existing node.
+        bytes_saved (int): The (estimated) memory of the replaced nodes and their tokens.
+
+    Usage:
+        parser = Parser(lexer, intern=True)
+        tree = parser.parse()
+        print(parser.interner)
+    """
+    def __init__(self) -> None:
+        self.created = 0
+        self.shared = 0
+        self.bytes_saved = 0
+
+        self._nodes: dict[tuple, AST] = {}
+        self._shared_ids: set[int] = set()
+        self._scope_ids = count(1)
+        self._scopes: list[int] = [0]
+
+    def enter_scope(self) -> None:
+        """Called when parsing the body of a function or a lambda."""
+        self._scopes.append(next(self._scope_ids))
+
+    def exit_scope(self) -> None:
+        self._scopes.pop()
+
+    def _key(self, node: AST) -> tuple | None:
+        """The structural key of `node`, or None if it can't be shared."""
+        match node:
+            case Integer() | Boolean():
+                return (type(node), node.token.value)
+            case Param():
+                # Resolved to a frame slot by the scope it appears in
+                return (Param, self._scopes[-1], node.token.value)
+            case BinOp():
+                children = (node.left, node.right)
+            case UnaryOp():
+                children = (node.expr,)
+            case NotOp():
+                return (NotOp, id(node.expr)) if id(node.expr) in self._shared_ids else None
+            case FunctionCall():
+                children = tuple(node.actual_params)
+            case _:
+                return None
+
+        if not all(id(child) in self._shared_ids for child in children):
+            return None
+
+        if isinstance(node, FunctionCall):
+            return (FunctionCall, self._scopes[-1], node.func_name, *map(id, children))
+
+        return (type(node), node.token.code, *map(id, children))
+
+    def intern(self, node: AST) -> AST:
+        """Returns the shared node structurally identical to `node` (or `node` itself)."""
+        self.created += 1
+        key = self._key(node)
+
+        if key is None:
+            return node
+
+        shared_node = self._nodes.get(key)
+
+        if shared_node is None:
+            self._nodes[key] = node
+            self._shared_ids.add(id(node))
+            return node
+
+        self.shared += 1
+        self.bytes_saved += sys.getsizeof(node) + sys.getsizeof(getattr(node, 'token', None))
+
+        if isinstance(node, FunctionCall):
+            self.bytes_saved += sys.getsizeof(node.actual_params)
+
+        return shared_node
+
+    @property
+    def sharing_ratio(self) -> float:
+        """The fraction of nodes which were replaced by a shared node."""
+        return self.shared / self.created if self.created else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f'NodeInterner(nodes={self.created}, shared={self.shared}, '
+            f'sharing_ratio={self.sharing_ratio:.1%}, bytes_saved={self.bytes_saved})'
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
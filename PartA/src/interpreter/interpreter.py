@@ -1,3 +1,6 @@
+from inspect import getattr_static
+from time import perf_counter
+from typing import Iterable
 from .token import TokenType,Token
 from .ast import (
     AST,
@@ -14,9 +17,31 @@ from .ast import (
     UnaryOp,
     NestedLambda
 )
-from .stack import ActivationRecord,CallStack,ARType
+from .stack import ActivationRecord,CallStack,ARType,Closure,TailCall
 from .symbol import CallableSymbol
 from .errors import ErrorCode,InterpreterError
+from .memo import DEFAULT_MEMO_SIZE,MISSING,MemoCache,MemoMode,first_order,memo_key
+from .result_cache import ResultCache,function_hash
+
+# The memory available, by default, for the recursion of a program (see `Interpreter.max_depth`)
+DEFAULT_MEMORY_BUDGET = 1 << 30
+# The approximate memory of one level of recursion: its activation record, and the
+# suspended visits of the call and of the operations waiting for its result
+FRAME_SIZE = 1280
+
+def yields_children(visit):
+    """Marks a `visit_*` method as a generator yielding child nodes (see `NodeVisitor`).
+
+    `functools.wraps` copies the mark, so a decorated visit keeps it as long as
+    the wrapper returns the generator.
+
+    Usage:
+        @yields_children
+        def visit_NotOp(self, node):
+            return not (yield node.expr)
+    """
+    visit.yields_children = True
+    return visit
 
 class NodeVisitor(object):
     """Base class for traversing nodes in an Abstract Syntax Tree (AST).
@@ -24,6 +49,22 @@ class NodeVisitor(object):
     This class provides a mechanism for traversing AST nodes and processing them.
     Subclasses should implement specific `visit_*` methods for handling different node types.
 
+    A `visit_*` method that needs the results of child nodes may be written as a
+    generator which yields each child node, and receives the child's result in return.
+    It must be marked with `yields_children`:
+
+        @yields_children
+        def visit_BinOp(self, node):
+            return (yield node.left) + (yield node.right)
+
+    Such visits are driven by `visit` with an explicit stack instead of Python frames,
+    so the depth of the tree is bounded only by memory, not by the recursion limit.
+    Other visits (including unmarked generators) are regular methods, and are called directly.
+
+    The visit method of a node class is looked up once per visitor class, and kept
+    in the class's dispatch table. A node class without a `visit_*` method of its
+    own is dispatched to the method of its nearest base class that has one.
+
     Usage:
         class CustomVisitor(NodeVisitor):
             def visit_Integer(self, node):
@@ -32,6 +73,45 @@ class NodeVisitor(object):
         visitor = CustomVisitor()
         result = visitor.visit(some_ast_node)
     """
+    # The visit function of every node class, and whether it yields child nodes, by node class
+    _dispatch: dict[type, tuple] = {}
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._dispatch = {}
+
+    @classmethod
+    def dispatch(cls, node_class: type) -> tuple:
+        """Looks up (and caches) the visit method of a node class.
+
+        The method is `visit_` followed by the name of the node class, or of
+        its nearest base class with such a method, or `generic_visit` otherwise.
+
+        Args:
+            node_class (type): The class of the visited node.
+
+        Returns:
+            tuple: The (unbound) visit function, and whether it yields child nodes (see `yields_children`).
+        """
+        for base in node_class.__mro__:
+            name = 'visit_' + base.__name__
+            visitor = getattr(cls, name, None)
+
+            if visitor is not None:
+                break
+        else:
+            name = 'generic_visit'
+            visitor = cls.generic_visit
+
+        # The mark may be on the class attribute rather than on what its lookup returns (e.g. a `partialmethod`)
+        yields_children = (
+            getattr(visitor, 'yields_children', False)
+            or getattr(getattr_static(cls, name), 'yields_children', False)
+        )
+        entry = cls._dispatch[node_class] = (visitor, yields_children)
+
+        return entry
+
     def visit(self, node: AST) -> None:
         """Visits a node in the AST.
 
@@ -44,9 +124,63 @@ class NodeVisitor(object):
         Returns:
             None: Or the result of the specific visit method.
         """
-        method_name = 'visit_' + type(node).__name__
-        visitor = getattr(self,method_name,self.generic_visit)
-        return visitor(node)
+        node_class = type(node)
+        visitor, yields_children = self._dispatch.get(node_class) or self.dispatch(node_class)
+
+        if not yields_children:
+            return visitor(self, node)
+
+        return self.traverse(visitor(self, node))
+
+    def traverse(self, visit) -> None:
+        """Drives a visit yielding child nodes (see `yields_children`), and the visits of its children.
+
+        The pending visits are kept on an explicit stack: a yielded child node is
+        visited (pushing its visit if it yields child nodes too), and its result is
+        sent back to the visit that yielded it.
+
+        An exception raised by a visit propagates out of `traverse`, and the pending
+        visits are closed, innermost first, so their `finally` blocks run.
+
+        Args:
+            visit (Generator): The started visit of a node.
+
+        Returns:
+            The result of the visit.
+        """
+        # The `send` of the innermost pending visit, and of the visits waiting for it
+        send = visit.send
+        stack = []
+        result = None
+        dispatch_table = self._dispatch
+
+        try:
+            while True:
+                try:
+                    node = send(result)
+                except StopIteration as stop:
+                    if not stack:
+                        return stop.value
+
+                    send = stack.pop()
+                    result = stop.value
+                    continue
+
+                node_class = type(node)
+                visitor, yields_children = dispatch_table.get(node_class) or self.dispatch(node_class)
+
+                if yields_children:
+                    stack.append(send)
+                    send = visitor(self, node).send
+                    result = None
+                else:
+                    result = visitor(self, node)
+        finally:
+            # Visits are left pending only when one of them raised (closing a finished visit does nothing)
+            send.__self__.close()
+
+            while stack:
+                stack.pop().__self__.close()
     
     def generic_visit(self,node: AST):
         raise Exception(f'No visit_{type(node).__name__} method')
@@ -58,16 +192,49 @@ class Interpreter(NodeVisitor):
     The Interpreter class traverses the AST, evaluates expressions, and manages 
     function calls using a call stack.
 
+    Evaluation never recurses in Python (see `NodeVisitor.traverse`): the pending
+    visits are kept on the heap, so the depth of non-tail recursion is only limited
+    by `memory_budget`. A call exceeding it raises an `InterpreterError`.
+
+    Functions have no side effects, so calls can be memoized: with `memo_mode`
+    AUTO, the calls of the functions the `SemanticAnalyzer` classifies as memoizable
+    go through a per-function `MemoCache` of their results, keyed by argument values
+    (with ALL, the calls of every function and closure do). With a `result_cache`,
+    the expensive calls of top-level statements are also stored on disk, and reused
+    by later runs.
+
     Attributes:
         call_stack (CallStack): The stack used to manage activation records during interpretation.
+        memory_budget (int): The memory (in bytes) available for the recursion of a program.
+        max_depth (int): The maximum depth of the call stack, estimated from `memory_budget`.
+        memo_mode (MemoMode): Which functions are memoized.
+        memo_size (int): The maximum number of results cached per function.
+        memo_caches (dict[CallableSymbol, MemoCache | None]): The result cache of every called function
+            (None for functions which aren't memoized).
+        result_cache (ResultCache | None): The on-disk cache backing the caches of memoizable functions,
+            so their results are shared across runs.
 
     Usage:
         interpreter = Interpreter()
         result = interpreter.interpret(ast_tree)
     """
-    def __init__(self, log_stack = False) -> None:
+    def __init__(
+            self,
+            log_stack = False,
+            memory_budget: int = DEFAULT_MEMORY_BUDGET,
+            memo_mode: MemoMode = MemoMode.OFF,
+            memo_size: int = DEFAULT_MEMO_SIZE,
+            result_cache: ResultCache | None = None
+        ) -> None:
         self.call_stack = CallStack()
         self.should_log = log_stack
+        self.memory_budget = memory_budget
+        self.max_depth = max(1, memory_budget // FRAME_SIZE)
+        self.memo_mode = memo_mode
+        self.memo_size = memo_size
+        self.memo_caches: dict[CallableSymbol, MemoCache | None] = {}
+        self.result_cache = result_cache
+        self.memoize = memo_mode is not MemoMode.OFF
 
     def log_stack(self,message:str = None):
         if self.should_log:
@@ -91,6 +258,20 @@ class Interpreter(NodeVisitor):
         Args:
             node (Program): The Program AST node.
         """
+        return self.execute(node.statements)
+
+    def execute(self, statements: Iterable[AST]):
+        """Executes top-level statements in a new global-level activation record.
+
+        Statements are taken from `statements` one at a time, and executed before
+        the next one is taken, so they can be produced lazily (see `Pipeline`).
+
+        Args:
+            statements (Iterable[AST]): The top-level statements of a program.
+
+        Yields:
+            The (non-None) result of every statement.
+        """
         ar = ActivationRecord(
             name='PROGRAM',
             type=ARType.PROGRAM,
@@ -100,13 +281,14 @@ class Interpreter(NodeVisitor):
         self.call_stack.push(ar)
         self.log_stack("ENTERING PROGRAM")
 
-        for statement in node.statements:
+        for statement in statements:
             output = self.visit(statement)
             if output is not None:
                 yield output
 
         self.call_stack.pop()
     
+    @yields_children
     def visit_BinOp(self, node: BinOp):
         """Evaluates a binary operation node.
 
@@ -121,36 +303,36 @@ class Interpreter(NodeVisitor):
         """
         op_type = node.op.type
 
-        left_val = self.visit(node.left)
+        left_val = yield node.left
 
         match op_type:
             case TokenType.AND:
-                return left_val and self.visit(node.right)
+                return left_val and (yield node.right)
             case TokenType.OR:
                 if left_val:
                     return left_val
                 else:
-                    return self.visit(node.right)
+                    return (yield node.right)
             case TokenType.EQUAL:
-                return left_val == self.visit(node.right)
+                return left_val == (yield node.right)
             case TokenType.NOT_EQUAL:
-                return left_val != self.visit(node.right)
+                return left_val != (yield node.right)
             case TokenType.GREATER_THAN_EQ:
-                return left_val >= self.visit(node.right)
+                return left_val >= (yield node.right)
             case TokenType.LESS_THAN_EQ:
-                return left_val <= self.visit(node.right)
+                return left_val <= (yield node.right)
             case TokenType.GREATER_THAN:
-                return left_val > self.visit(node.right)
+                return left_val > (yield node.right)
             case TokenType.LESS_THAN:
-                return left_val < self.visit(node.right)
+                return left_val < (yield node.right)
             case TokenType.PLUS:
-                return left_val + self.visit(node.right)
+                return left_val + (yield node.right)
             case TokenType.MINUS:
-                return left_val - self.visit(node.right)
+                return left_val - (yield node.right)
             case TokenType.MUL:
-                return left_val * self.visit(node.right)
+                return left_val * (yield node.right)
             case TokenType.DIV:
-                right_val = self.visit(node.right)
+                right_val = yield node.right
                 if right_val == 0:
                     self.error(
                         error_code=ErrorCode.DIV_ZERO,
@@ -159,7 +341,7 @@ class Interpreter(NodeVisitor):
                     
                 return left_val // right_val
             case TokenType.MODULO:
-                return left_val % self.visit(node.right)
+                return left_val % (yield node.right)
 
     def visit_Integer(self, node: Integer) -> int:
         """Handles an Integer node and returns its value.
@@ -183,6 +365,7 @@ class Interpreter(NodeVisitor):
         """
         return node.value
     
+    @yields_children
     def visit_NotOp(self, node: NotOp):
         """Evaluates a logical NOT operation node.
 
@@ -194,7 +377,7 @@ class Interpreter(NodeVisitor):
         Returns:
             bool: The negated value of the operand.
         """
-        return not self.visit(node.expr)
+        return not (yield node.expr)
     
     def visit_NoOp(self, node: NoOp):
         """Handles NoOp (no operation) nodes.
@@ -221,7 +404,8 @@ class Interpreter(NodeVisitor):
         """Retrieves the value of a parameter from the current activation record.
 
         Since the interpreter is executed after the Semantic Analysis process,
-        We can assume the parameter will exist in the current activation record.
+        We can assume the parameter will exist in the slot the analyzer resolved it to,
+        `depth` records up the chain of enclosing lambdas (or by name, for global names).
         
         Args:
             node (Param): The parameter AST node.
@@ -229,8 +413,21 @@ class Interpreter(NodeVisitor):
         Returns:
             The value of the parameter.
         """
+        if node.slot is not None:
+            return self.lookup_slot(node.depth, node.slot)
+
         return self.call_stack.peek()[node.name]
 
+    def lookup_slot(self, depth: int, slot: int):
+        """Retrieves the value in `slot` of the activation record `depth` lambdas out of the current one."""
+        ar = self.call_stack.peek()
+
+        for _ in range(depth):
+            ar = ar.parent
+
+        return ar.slots[slot]
+
+    @yields_children
     def visit_UnaryOp(self, node: UnaryOp):
         """Evaluates a unary operation node.
 
@@ -248,23 +445,26 @@ class Interpreter(NodeVisitor):
 
         match op_type:
             case TokenType.PLUS:
-                return + self.visit(node.expr)
+                return + (yield node.expr)
             case TokenType.MINUS:
-                return - (self.visit(node.expr))
+                return - (yield node.expr)
 
     def visit_Lambda(self, node: Lambda):
-        return node.symbol
+        """Evaluates a lambda into a closure, capturing the values of its free variables.
+
+        Args:
+            node (Lambda): The Lambda AST node.
 
+        Returns:
+            Closure: The lambda's value.
+        """
+        lambda_symbol = node.symbol
+
+        return Closure(lambda_symbol, [self.lookup_slot(depth, slot) for depth, slot in lambda_symbol.captures])
+
+    @yields_children
     def visit_NestedLambda(self, node: NestedLambda) :
         current_ar = self.call_stack.peek()
-        ar = ActivationRecord(
-            name=node.lambda_node.lambda_name,
-            type=ARType.FUNCTION,
-            nesting_level=self.call_stack.peek().nesting_level +1,
-            old_ar=current_ar
-        )
-        
-        
         lambda_symbol = node.lambda_node.symbol
 
         if lambda_symbol is None:
@@ -273,27 +473,45 @@ class Interpreter(NodeVisitor):
                 token=node.lambda_node.token
             )
 
-        formal_params = lambda_symbol.formal_params
-        actual_params = node.actual_params
+        ar = self.call_stack.pool.acquire(
+            name=node.lambda_node.lambda_name,
+            type=ARType.FUNCTION,
+            nesting_level=current_ar.nesting_level +1,
+            size=len(lambda_symbol.formal_params),
+            params=lambda_symbol.formal_params,
+            parent=current_ar
+        )
+        yield from self.bind_arguments(ar.slots, lambda_symbol, node.actual_params)
 
-        for param_symbol, arg_node in zip(formal_params,actual_params):
-            ar[param_symbol.name] = self.visit(arg_node)
+        if len(self.call_stack) >= self.max_depth:
+            self.error(
+                error_code=ErrorCode.MEMORY_BUDGET_EXCEEDED,
+                token=node.lambda_node.token
+            )
 
         self.call_stack.push(ar)
         self.log_stack("ADDING FRAME TO STACK")
 
-        current_ar['(return value)'] = self.visit(lambda_symbol.expr_ast)
+        current_ar['(return value)'] = yield lambda_symbol.expr_ast
 
         self.call_stack.pop()
         self.log_stack("REMOVING FRAME FROM STACK")
+        self.call_stack.pool.release(ar)
 
         return current_ar['(return value)']
 
+    @yields_children
     def visit_FunctionCall(self, node: FunctionCall):
         """Handles function call nodes.
 
-        This method creates a function-level activation record, evaluates 
-        the function call by visiting its body, and then removes the activation record.
+        This method creates a function-level activation record (recycled by the
+        call stack's pool), evaluates the function call by visiting its body,
+        and then removes the activation record.
+
+        A call in tail position (see `SemanticAnalyzer.mark_tail_calls`) only binds
+        its arguments, and returns a `TailCall`: the enclosing call then runs it in
+        place of its own record (a trampoline), so tail recursion runs in a
+        constant call stack depth.
 
         Args:
             node (FunctionCall): The FunctionCall AST node.
@@ -302,14 +520,18 @@ class Interpreter(NodeVisitor):
             The result of the function call.
         """
         current_ar = self.call_stack.peek()
-        ar = ActivationRecord(
-            name=node.func_name,
-            type=ARType.FUNCTION,
-            nesting_level=self.call_stack.peek().nesting_level +1,
-            old_ar=current_ar
-        )
-        
-        func_symbol: CallableSymbol | None = node.symbol or current_ar[node.func_name]
+        func_symbol: CallableSymbol | Closure | None = node.symbol
+        captured = ()
+
+        if func_symbol is None:
+            if node.slot is None:
+                func_symbol = current_ar[node.func_name]
+            else:
+                func_symbol = self.lookup_slot(node.depth, node.slot)
+
+            if isinstance(func_symbol, Closure):
+                captured = func_symbol.captured
+                func_symbol = func_symbol.symbol
 
         if func_symbol is None:
             self.error(
@@ -323,21 +545,130 @@ class Interpreter(NodeVisitor):
             )
 
         formal_params = func_symbol.formal_params
-        actual_params = node.actual_params
+        ar = self.call_stack.pool.acquire(
+            name=node.func_name,
+            type=ARType.FUNCTION,
+            # A tail call's record replaces the current one
+            nesting_level=current_ar.nesting_level if node.tail else current_ar.nesting_level +1,
+            size=len(formal_params) + len(captured),
+            params=formal_params + func_symbol.free_vars if captured else formal_params,
+            parent=self.call_stack.bottom()
+        )
+        yield from self.bind_arguments(ar.slots, func_symbol, node.actual_params)
+
+        if captured:
+            ar.slots[len(formal_params):] = captured
+
+        cache = self.call_cache(func_symbol, ar.slots) if self.memoize else None
+
+        if cache is not None:
+            key = memo_key(ar.slots)
+            # Only the calls of top-level statements go through the on-disk cache:
+            # they are few, and include the most expensive ones
+            persistent = cache.store is not None and current_ar is self.call_stack.bottom()
+            result = cache.get(key, persistent)
+
+            if result is not MISSING:
+                self.call_stack.pool.release(ar)
+                return result
 
-        for param_symbol, arg_node in zip(formal_params,actual_params):
-            ar[param_symbol.name] = self.visit(arg_node)
+        if node.tail:
+            return TailCall(func_symbol, ar)
+
+        if len(self.call_stack) >= self.max_depth:
+            self.error(
+                error_code=ErrorCode.MEMORY_BUDGET_EXCEEDED,
+                token=node.token
+            )
 
         self.call_stack.push(ar)
         self.log_stack("ADDING FRAME TO STACK")
 
-        current_ar['(return value)'] = self.visit(func_symbol.expr_ast)
+        if cache is not None and persistent:
+            started = perf_counter()
+
+        result = yield func_symbol.expr_ast
+        # The caches of the memoized tail calls returning `result` too
+        tail_results = None
+
+        # Trampoline: run the tail calls of the body in place of the body's record
+        while result.__class__ is TailCall:
+            self.call_stack.pop()
+            self.call_stack.pool.release(ar)
+            ar = result.ar
+            self.call_stack.push(ar)
+            self.log_stack("REPLACING FRAME ON STACK")
+
+            tail_cache = self.call_cache(result.symbol, ar.slots) if self.memoize else None
+
+            if tail_cache is not None:
+                tail_results = tail_results or []
+                tail_results.append((tail_cache, memo_key(ar.slots)))
+
+            result = yield result.symbol.expr_ast
+
+        if cache is not None:
+            # The evaluation time decides whether the result is worth storing on disk
+            cache.put(key, result, perf_counter() - started if persistent else None)
+
+        if tail_results:
+            for tail_cache, tail_key in tail_results:
+                tail_cache.put(tail_key, result)
+
+        current_ar['(return value)'] = result
 
         self.call_stack.pop()
         self.log_stack("REMOVING FRAME FROM STACK")
+        self.call_stack.pool.release(ar)
 
         return current_ar['(return value)']
 
+    def memo_cache(self, func_symbol: CallableSymbol) -> MemoCache | None:
+        """Returns the result cache of a function, or None if its calls aren't memoized (see `memo_mode`)."""
+        cache = self.memo_caches.get(func_symbol, MISSING)
+
+        if cache is MISSING:
+            if func_symbol.memoizable and self.result_cache is not None:
+                # Only the results of functions proven pure are stored across runs
+                function = function_hash(func_symbol, self.call_stack.bottom().__getitem__)
+                cache = MemoCache(self.memo_size, self.result_cache, function)
+            elif self.memo_mode is MemoMode.ALL or func_symbol.memoizable:
+                cache = MemoCache(self.memo_size)
+            else:
+                cache = None
+
+            self.memo_caches[func_symbol] = cache
+
+        return cache
+
+    def call_cache(self, func_symbol: CallableSymbol, slots: list) -> MemoCache | None:
+        """Returns the result cache of a call, or None if it isn't memoized.
+
+        With AUTO, the calls of memoizable functions which are passed function values
+        (e.g. `apply(g, n)`, passing `g` on) aren't memoized either: their keys would
+        never hit, and would keep the function values alive.
+        """
+        cache = self.memo_cache(func_symbol)
+
+        if cache is not None and self.memo_mode is MemoMode.AUTO and not first_order(slots):
+            return None
+
+        return cache
+
+    def bind_arguments(self, slots: list, func_symbol: CallableSymbol, actual_params: list[AST]):
+        """Evaluates the arguments of a call into the (unbound) slots of the callee's activation record.
+
+        This is a part of a generator visit: the argument nodes are yielded to be visited.
+        Slots of missing arguments are left unbound.
+
+        Args:
+            slots (list): The slots of the callee's activation record.
+            func_symbol (CallableSymbol): The called function (or lambda).
+            actual_params (list[AST]): The argument nodes.
+        """
+        for slot, (_, arg_node) in enumerate(zip(func_symbol.formal_params,actual_params)):
+            slots[slot] = yield arg_node
+
     def interpret(self,tree: AST):
         """Interprets the given AST.
 
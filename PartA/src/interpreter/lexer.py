@@ -1,16 +1,43 @@
-from .token import Token,TokenType,RESERVED_KEYWORDS
+import re
+import codecs
+from mmap import mmap
+from typing import IO
+from .token import Token,TokenType,TokenCode,TOKEN_CODES,LineIndex,RESERVED_KEYWORDS,OPERATORS,WORD_OPERATORS,SHARED_TOKENS
 from .errors import LexerError,ErrorCode
 
 IS_ALPHABETIC = lambda char: char.isalpha()
 IS_ALPHANUMERIC = lambda char: char.isalnum()
 IS_NUMERIC = lambda char: char.isdigit()
 
-class Lexer:
-    """Lexical analyzer (lexer) for converting input text into tokens.
+DEFAULT_CHUNK_SIZE = 1 << 16
 
-    The Lexer class reads input text and breaks it down into tokens that 
-    can be used by a parser for further analysis. It handles various token 
-    types such as identifiers, reserved keywords, operators, and literals.
+# Whitespace and one-line comments, skipped in bulk before every token
+SKIP_PATTERN = re.compile(r'(?:\s+|#[^\n]*\n?)*')
+
+# The rest of a comment which started in an earlier chunk, and what follows it
+COMMENT_TAIL_PATTERN = re.compile(r'[^\n]*' + SKIP_PATTERN.pattern)
+
+# Master pattern - longer operators are listed first so '==' wins over '='
+TOKEN_PATTERN = re.compile(
+    r'(?P<operator>' + '|'.join(re.escape(op) for op in sorted(OPERATORS, key=len, reverse=True)) + r')'
+    r'|(?P<integer>\d+)'
+    r'|(?P<id>[^\W\d_][^\W_]*)'
+)
+
+# Upper-cased word -> (token type, token value). A `None` value keeps the original lexeme
+KEYWORD_TOKENS = {
+    **{word: (token_type, None) for word, token_type in RESERVED_KEYWORDS.items()},
+    'TRUE': (TokenType.BOOLEAN_CONST, True),
+    'FALSE': (TokenType.BOOLEAN_CONST, False),
+    **{word: (token_type, token_type.value) for word, token_type in WORD_OPERATORS.items()}
+}
+
+class LegacyLexer:
+    """Character-by-character lexical analyzer (lexer).
+
+    This is the original scanning engine, kept so its token stream can be
+    compared against `Lexer`. It reads the input one character at a time and
+    breaks it down into tokens that can be used by a parser for further analysis.
 
     Attributes:
         text (str): The input text to be tokenized.
@@ -20,7 +47,7 @@ class Lexer:
         column (int): The current column number in the input text.
 
     Usage:
-        lexer = Lexer("1 + 1")
+        lexer = LegacyLexer("1 + 1")
         token = lexer.get_next_token()
     """
     def __init__(self, text: str) -> None:
@@ -194,6 +221,7 @@ class Lexer:
             value = token_type.value
         
         token.type = token_type
+        token.code = TOKEN_CODES[token_type]
         token.value = value
 
         return token
@@ -265,3 +293,349 @@ class Lexer:
         
         # End-of-file (EOF) was reached
         return Token(type=TokenType.EOF, value=None)
+
+
+class Lexer:
+    """Lexical analyzer (lexer) for converting input text into tokens.
+
+    The Lexer class reads input text and breaks it down into tokens that 
+    can be used by a parser for further analysis. It handles various token 
+    types such as identifiers, reserved keywords, operators, and literals.
+
+    Each token is recognized by a single match of a precompiled master pattern,
+    and whitespace / comments are skipped in bulk. Tokens only record their start 
+    offset, and line / column numbers are resolved on demand through `lines`.
+
+    Attributes:
+        text (str): The input text to be tokenized.
+        pos (int): The current index position in the input text.
+        current_char (str or None): The current character being analyzed.
+        lineno (int): The current line number in the input text.
+        column (int): The current column number in the input text.
+        lines (LineIndex): Maps offsets in the input text to line and column numbers.
+        share_tokens (bool): Return the shared, position-free `SHARED_TOKENS` instance 
+            for operators and punctuation instead of a new token per occurrence.
+
+    When the input text is a slice of a larger source starting at a line start, 
+    `offset` and `lineno` give its position, so token positions refer to the source.
+
+    Usage:
+        lexer = Lexer("1 + 1")
+        token = lexer.get_next_token()
+    """
+    def __init__(self, text: str, share_tokens: bool = False, offset: int = 0, lineno: int = 1) -> None:
+        self.text = text
+        self.pos = 0
+        self.lines = LineIndex(text, offset, lineno)
+        self.share_tokens = share_tokens
+        self._offset = offset # Absolute position of `text[0]` in the input
+
+    @property
+    def current_char(self) -> str | None:
+        return self.text[self.pos] if self.pos < len(self.text) else None
+
+    @property
+    def lineno(self) -> int:
+        return self.lines.position(self._offset + self.pos)[0]
+
+    @property
+    def column(self) -> int:
+        return self.lines.position(self._offset + self.pos)[1]
+
+    def _error(self) -> None:
+        """Raises a LexerError with the current character's position.
+
+        This method is called when the lexer encounters an invalid character 
+        or sequence in the input text.
+        """
+        raise LexerError(
+            error_code=ErrorCode.UNEXPECTED_TOKEN,
+            token=None,
+            message="Lexer error on '{lexeme}' line: {lineno} column: {column}".format(
+                lexeme = self.current_char,
+                lineno= self.lineno,
+                column = self.column
+            )
+        )
+
+    def peek(self) -> str:
+        """Returns the character at `self.pos + 1` without consuming it.
+
+        Returns:
+            str: The next character in the input text, or None if at the end.
+        """
+        peek_pos = self.pos + 1
+
+        return self.text[peek_pos] if peek_pos <= len(self.text) - 1 else None
+
+    def peek_next_token(self, n = 1) -> Token:
+        """Peeks at n-th token from the current position without consuming it.
+
+        Returns:
+            Token: The n-th token in the input text from the current position.
+        """
+        state = self._save_state()
+
+        token = self.get_next_token()
+
+        for i in range(1,n):
+            if token.type == TokenType.EOF:
+                break
+            token = self.get_next_token()
+
+        self._restore_state(state)
+
+        return token
+
+    def _save_state(self) -> int:
+        return self._offset + self.pos
+
+    def _restore_state(self, state: int) -> None:
+        self.pos = state - self._offset
+
+    def _refill(self) -> bool:
+        """Appends more input to `text`.
+
+        The whole input is available up front, so there is never more to read.
+
+        Returns:
+            bool: True if more input was appended, otherwise False.
+        """
+        return False
+
+    def skip_whitespace(self) -> None:
+        """Advances the `pos` pointer past all consecutive whitespace and comments."""
+        end = SKIP_PATTERN.match(self.text, self.pos).end()
+        in_comment = False
+
+        # A skipped block reaching the end of the buffered text may continue in the next chunk.
+        # The skipped text is consumed first, and the scan resumes where it stopped (in a comment,
+        # if the last line skipped has a '#'), so long comments are never buffered or rescanned
+        while end == len(self.text):
+            line_start = self.text.rfind('\n', self.pos, end)
+            in_comment = self.text.rfind('#', self.pos, end) > line_start or (in_comment and line_start < 0)
+            self.pos = end
+
+            if not self._refill():
+                break
+
+            pattern = COMMENT_TAIL_PATTERN if in_comment else SKIP_PATTERN
+            end = pattern.match(self.text, self.pos).end()
+
+        self.pos = end
+
+    def get_next_token(self) -> Token:
+        """Tokenizes the input text, returning one token at a time.
+
+        Returns:
+            Token: The next token in the input text.
+        """
+        self.skip_whitespace()
+
+        if self.pos >= len(self.text):
+            # End-of-file (EOF) was reached
+            return Token(type=TokenType.EOF, value=None)
+
+        match = TOKEN_PATTERN.match(self.text, self.pos)
+
+        # A token reaching the end of the buffered text may continue in the next chunk (e.g. '=' + '=')
+        while (match is None or match.end() == len(self.text)) and self._refill():
+            match = TOKEN_PATTERN.match(self.text, self.pos)
+
+        if match is None:
+            # Current char does not start any defined token
+            self._error()
+
+        kind = match.lastgroup
+        value = match.group()
+        offset = self._offset + self.pos
+        self.pos = match.end()
+
+        if kind == 'operator':
+            if self.share_tokens:
+                return SHARED_TOKENS[value]
+            return Token(OPERATORS[value], value, None, None, offset, self.lines)
+
+        if kind == 'integer':
+            return Token(TokenType.INTEGER_CONST, int(value), None, None, offset, self.lines)
+
+        keyword = KEYWORD_TOKENS.get(value.upper())
+
+        if keyword is None:
+            return Token(TokenType.ID, value, None, None, offset, self.lines)
+
+        token_type, keyword_value = keyword
+
+        return Token(token_type, value if keyword_value is None else keyword_value, None, None, offset, self.lines)
+
+class StreamLexer(Lexer):
+    """Lexer reading its input text from a stream in fixed-size chunks.
+
+    Only the unconsumed part of the input is kept in memory, so peak memory 
+    is bounded by `chunk_size` (plus twice the longest token) regardless of the 
+    input size. A token which doesn't fit the buffered text is rescanned once the
+    buffer has at least doubled, so long tokens are scanned in linear time. The stream can be a text file, a binary file or a memory-mapped 
+    file (`mmap.mmap`); binary input is decoded incrementally as UTF-8.
+
+    Attributes:
+        stream (IO | mmap): The stream the input text is read from.
+        chunk_size (int): The number of characters (or bytes) read at once.
+
+    Usage:
+        with open('program.lambda') as file:
+            lexer = StreamLexer(file)
+            token = lexer.get_next_token()
+    """
+    def __init__(self, stream: IO | mmap, chunk_size: int = DEFAULT_CHUNK_SIZE, share_tokens: bool = False) -> None:
+        super().__init__('', share_tokens)
+        self.stream = stream
+        self.chunk_size = chunk_size
+
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._exhausted = False
+        self._pinned = False
+
+        self._refill()
+
+    def _save_state(self) -> int:
+        # Keep the buffered text from being discarded until the state is restored
+        self._pinned = True
+        return super()._save_state()
+
+    def _restore_state(self, state: int) -> None:
+        self._pinned = False
+        super()._restore_state(state)
+
+    def _refill(self) -> bool:
+        """Discards the consumed text and appends the next chunk from the stream.
+
+        The chunk is at least as long as the text kept, so refilling for a long
+        token doubles the buffer, rather than growing it by `chunk_size`.
+
+        Returns:
+            bool: True if more input was appended, otherwise False.
+        """
+        consumed = 0 if self._pinned else self.pos
+        size = max(self.chunk_size, len(self.text) - consumed)
+        chunk = ''
+
+        while not chunk and not self._exhausted:
+            data = self.stream.read(size)
+
+            if isinstance(data, (bytes, bytearray)):
+                chunk = self._decoder.decode(data, final=not data)
+            else:
+                chunk = data
+
+            self._exhausted = not data
+
+        if not chunk:
+            return False
+
+        self.lines.extend(chunk, self._offset + len(self.text))
+        self.text = self.text[consumed:] + chunk
+        self._offset += consumed
+        self.pos -= consumed
+
+        return True
+
+def create_lexer(text: str, legacy: bool = False) -> Lexer | LegacyLexer:
+    """Creates a lexer over `text`.
+
+    Args:
+        text (str): The input text to be tokenized.
+        legacy (bool, optional): Use the character-by-character `LegacyLexer`
+            instead of the pattern based `Lexer`. Useful for comparing token streams.
+
+    Returns:
+        Lexer | LegacyLexer: The selected lexer.
+    """
+    return LegacyLexer(text) if legacy else Lexer(text)
+
+class TokenBuffer:
+    """Ring buffer feeding tokens from a lexer to the parser.
+
+    Every token is scanned by the lexer exactly once, and kept in the buffer 
+    until it is consumed, allowing up to `lookahead` tokens to be peeked 
+    without re-lexing the input text.
+
+    Attributes:
+        lexer (Lexer | LegacyLexer): The lexer producing the tokens.
+        lookahead (int): The maximal number of tokens that can be peeked.
+        scanned (int): The number of tokens produced by the lexer.
+        consumed (int): The number of tokens consumed from the buffer.
+
+    Usage:
+        tokens = TokenBuffer(Lexer("foo(1)"))
+        tokens.peek(2)              # Token(LPAREN, '(')
+        tokens.get_next_token()     # Token(ID, 'foo')
+    """
+    def __init__(self, lexer: Lexer | LegacyLexer, lookahead: int = 2) -> None:
+        self.lexer = lexer
+        self.lookahead = lookahead
+        self.scanned = 0
+        self.consumed = 0
+
+        self._ring: list[Token | None] = [None] * lookahead
+        self._head = 0
+        self._count = 0
+        self._eof: Token | None = None
+
+    def _scan(self) -> None:
+        """Appends the next token from the lexer to the end of the buffer.
+
+        Once EOF was reached, the EOF token is repeated without calling the lexer again.
+        """
+        token = self._eof
+
+        if token is None:
+            token = self.lexer.get_next_token()
+            self.scanned += 1
+
+            if token.code == TokenCode.EOF:
+                self._eof = token
+
+        self._ring[(self._head + self._count) % self.lookahead] = token
+        self._count += 1
+
+    def peek(self, n: int = 1) -> Token:
+        """Returns the n-th unconsumed token without consuming it.
+
+        Args:
+            n (int, optional): The position of the token to peek at, starting from 1.
+
+        Raises:
+            ValueError: If `n` exceeds the buffer's lookahead.
+
+        Returns:
+            Token: The n-th unconsumed token.
+        """
+        if not 1 <= n <= self.lookahead:
+            raise ValueError(f'Cannot peek {n} tokens ahead with a lookahead of {self.lookahead}')
+
+        while self._count < n:
+            self._scan()
+
+        return self._ring[(self._head + n - 1) % self.lookahead]
+
+    def get_next_token(self) -> Token:
+        """Consumes and returns the next token.
+
+        Returns:
+            Token: The next token in the input text.
+        """
+        if self._count == 0:
+            self._scan()
+
+        token = self._ring[self._head]
+        self._ring[self._head] = None
+        self._head = (self._head + 1) % self.lookahead
+        self._count -= 1
+        self.consumed += 1
+
+        return token
+
+    def __str__(self) -> str:
+        return f'{self.__class__.__name__}(scanned={self.scanned}, consumed={self.consumed})'
+
+    __repr__ = __str__
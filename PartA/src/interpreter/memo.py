@@ -0,0 +1,142 @@
+from collections import OrderedDict
+from enum import Enum
+from .result_cache import ResultCache
+from .stack import Closure
+from .symbol import CallableSymbol
+
+# The number of results kept per function, by default
+DEFAULT_MEMO_SIZE = 1 << 12
+
+# The result of a lookup missing the cache (None is a valid result)
+MISSING = object()
+
+class MemoMode(Enum):
+    """Which functions the `Interpreter` memoizes.
+
+    OFF: None.
+    AUTO: The functions the `SemanticAnalyzer` classifies as memoizable (see `CallableSymbol.memoizable`),
+        when called with plain values (see `first_order`).
+    ALL: Every declared function and closure.
+    """
+    OFF     = 'off'
+    AUTO    = 'auto'
+    ALL     = 'all'
+
+def memo_key(slots: list) -> tuple:
+    """The cache key of a call: the values of its slots (arguments, then captured values), and their types.
+
+    The types tell `True` and `1` apart, which are equal (and hash alike) but print differently.
+    """
+    return (*slots, *map(type, slots))
+
+def first_order(slots: list) -> bool:
+    """Whether none of the values of a call's slots is a function value (a `Closure` or a declared function).
+
+    Function values are keyed by identity, and a closure is a new value every time
+    its lambda is evaluated, so the keys of calls passing them on rarely hit.
+    """
+    for value in slots:
+        if isinstance(value, (Closure, CallableSymbol)):
+            return False
+
+    return True
+
+class MemoCache:
+    """The result cache of a function, keyed by argument values.
+
+    At most `max_entries` results are kept: storing a new result beyond it evicts
+    the least recently used one.
+
+    With a `store`, the results of persistent calls (see `Interpreter.visit_FunctionCall`)
+    are looked up on disk when they are missing from memory, and stored on disk, under
+    the hash of the function's code, when they took at least `store.min_cost` seconds
+    to evaluate.
+
+    Attributes:
+        max_entries (int): The maximum number of cached results.
+        hits (int): The number of lookups which found a result (in memory or on disk).
+        misses (int): The number of lookups which didn't.
+        store (ResultCache | None): The on-disk cache shared across runs.
+        function (str | None): The hash of the function's code (see `function_hash`), keying its results on disk.
+
+    Usage:
+        cache = MemoCache(max_entries=100)
+        result = cache.get(key)
+        if result is MISSING:
+            result = evaluate()
+            cache.put(key, result)
+    """
+    __slots__ = ('max_entries', 'hits', 'misses', 'store', 'function', '_results')
+
+    def __init__(
+            self,
+            max_entries: int = DEFAULT_MEMO_SIZE,
+            store: ResultCache | None = None,
+            function: str | None = None
+        ) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.store = store
+        self.function = function
+        self._results: OrderedDict[tuple, object] = OrderedDict()
+
+    def get(self, key: tuple, persistent: bool = False):
+        """Returns the cached result of a call (marking it as recently used), or `MISSING`.
+
+        The result of a `persistent` call is looked up on disk too.
+        """
+        result = self._results.get(key, MISSING)
+
+        if result is not MISSING:
+            self.hits += 1
+            self._results.move_to_end(key)
+            return result
+
+        if persistent:
+            # Memo keys are the argument values, followed by their types
+            result = self.store.get(self.function, key[:len(key) // 2], MISSING)
+
+            if result is not MISSING:
+                self.hits += 1
+                self.remember(key, result)
+                return result
+
+        self.misses += 1
+        return MISSING
+
+    def put(self, key: tuple, result, cost: float | None = None) -> None:
+        """Caches the result of a call.
+
+        The result of a persistent call, which took `cost` seconds to evaluate, is
+        stored on disk too if `cost` is at least `store.min_cost`.
+        """
+        self.remember(key, result)
+
+        if cost is not None and cost >= self.store.min_cost:
+            self.store.put(self.function, key[:len(key) // 2], result)
+
+    def remember(self, key: tuple, result) -> None:
+        """Caches the result of a call in memory, evicting the least recently used result if the cache is full."""
+        self._results[key] = result
+
+        if len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups which found a result."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __str__(self) -> str:
+        return (
+            f'{self.__class__.__name__}(entries={len(self)}, hits={self.hits}, '
+            f'misses={self.misses}, hit_rate={self.hit_rate:.1%})'
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
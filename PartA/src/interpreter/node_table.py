@@ -0,0 +1,249 @@
+from array import array
+from . import ast
+from .ast import AST
+from .token import TokenArray
+
+# Kinds of node fields, and how each one is stored in `NodeTable.fields`
+NODE    = 0 # Index of the child node (-1 for None)
+NODES   = 1 # Index into `NodeTable.lists`, holding the number of children followed by their indices
+TOKEN   = 2 # Index into `NodeTable.tokens`
+OBJECT  = 3 # Index into `NodeTable.objects` (-1 for None), e.g. names and symbols
+
+NODE_FIELDS: dict[type[AST], tuple[tuple[str, int], ...]] = {
+    ast.Program:        (('statements', NODES),),
+    ast.Integer:        (('token', TOKEN),),
+    ast.Boolean:        (('token', TOKEN),),
+    ast.BinOp:          (('left', NODE), ('token', TOKEN), ('right', NODE)),
+    ast.UnaryOp:        (('token', TOKEN), ('expr', NODE)),
+    ast.NotOp:          (('expr', NODE),),
+    ast.Param:          (('token', TOKEN), ('depth', OBJECT), ('slot', OBJECT)),
+    ast.FunctionDecl:   (('func_name', OBJECT), ('formal_parameters', NODES), ('expr_node', NODE), ('symbol', OBJECT)),
+    ast.FunctionCall:   (('token', TOKEN), ('actual_params', NODES), ('symbol', OBJECT), ('depth', OBJECT), ('slot', OBJECT), ('tail', OBJECT)),
+    ast.Lambda:         (('_lambda_name', OBJECT), ('token', TOKEN), ('formal_params', NODES), ('expr_node', NODE), ('symbol', OBJECT)),
+    ast.NestedLambda:   (('lambda_node', NODE), ('actual_params', NODES)),
+    ast.NoOp:           (),
+}
+
+NODE_CLASSES: tuple[type[AST], ...] = tuple(NODE_FIELDS)
+NODE_KINDS: dict[type[AST], int] = {cls: kind for kind, cls in enumerate(NODE_CLASSES)}
+
+class NodeView:
+    """Mixin of the nodes returned by a `NodeTable`.
+
+    A view is a lightweight handle (a table and an index) which is an instance of
+    the node's regular AST class, so `NodeVisitor`s dispatch on it and `isinstance`
+    checks work as they do for regular nodes. Its fields are read from the table on
+    access, and `OBJECT` fields (e.g. `symbol`) can be assigned as well.
+    """
+    __slots__ = ()
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, NodeView) and self._table is other._table and self._index == other._index
+
+    def __hash__(self) -> int:
+        return hash((id(self._table), self._index))
+
+def _field_property(position: int, kind: int) -> property:
+    """Creates the property reading (and for `OBJECT` fields, writing) a field of a view."""
+    def get_field(view: NodeView):
+        table = view._table
+        value = table.fields[table.offsets[view._index] + position]
+
+        if kind == NODE:
+            return None if value < 0 else table.node(value)
+        if kind == NODES:
+            return [table.node(index) for index in table.lists[value + 1:value + 1 + table.lists[value]]]
+        if kind == TOKEN:
+            return table.tokens[value]
+
+        return None if value < 0 else table.objects[value]
+
+    def set_field(view: NodeView, new_value) -> None:
+        if kind != OBJECT:
+            raise AttributeError(f'{type(view).__name__} views of a NodeTable are read-only')
+
+        table = view._table
+        offset = table.offsets[view._index] + position
+        table.fields[offset] = table.add_object(new_value)
+
+    return property(get_field, set_field)
+
+def _view_class(cls: type[AST]) -> type[AST]:
+    """Creates the view class of an AST class. It has the same name, so visitors dispatch on it."""
+    namespace = {
+        '__slots__': ('_table', '_index'),
+        '__module__': __name__,
+        '__qualname__': f'{cls.__name__}View',
+    }
+
+    for position, (name, kind) in enumerate(NODE_FIELDS[cls]):
+        namespace[name] = _field_property(position, kind)
+
+    return type(cls.__name__, (NodeView, cls), namespace)
+
+VIEW_CLASSES: tuple[type[AST], ...] = tuple(_view_class(cls) for cls in NODE_CLASSES)
+# Views (e.g. of the partial programs merged by a `ParallelParser`) are flattened as the nodes they stand for
+NODE_KINDS.update({view_class: kind for kind, view_class in enumerate(VIEW_CLASSES)})
+
+class NodeTable:
+    """Flat, array-backed storage of an AST.
+
+    Every node is identified by its index in the table. The node's kind, and the
+    offset of its fields in `fields`, are stored in typed arrays, and references
+    between nodes are indices rather than objects. Tokens are kept in a
+    `TokenArray`, and the remaining Python objects (names and symbols) in `objects`.
+    Nodes which appear more than once in the tree are stored once.
+
+    `node(index)` returns a view of a node, which any `NodeVisitor` can walk like
+    a regular AST. The semantic analyzer stores its symbols in the table, so a
+    program is flattened after parsing and before its analysis.
+
+    Attributes:
+        kinds (array): The kind (index into `NODE_CLASSES`) of every node.
+        offsets (array): The offset of every node's first field in `fields`.
+        fields (array): The encoded fields of all nodes, see `NODE_FIELDS`.
+        lists (array): The lists of child indices, each prefixed by its length.
+        tokens (TokenArray): The tokens of the nodes.
+        objects (list): The other Python objects referenced by nodes.
+
+    Usage:
+        table = NodeTable.from_tree(Parser(lexer).parse())
+        SemanticAnalyzer().visit(table.root)
+        outputs = Interpreter().interpret(table.root)
+    """
+    def __init__(self) -> None:
+        self.kinds = array('B')
+        self.offsets = array('I')
+        self.fields = array('i')
+        self.lists = array('i')
+        self.tokens = TokenArray()
+        self.objects: list = []
+
+    @classmethod
+    def from_tree(cls, root: AST) -> 'NodeTable':
+        """Flattens the tree under `root` (which gets the index 0). Never recurses."""
+        table = cls()
+        nodes: list[AST] = []
+        # A view is created on every access, so views are identified by their node
+        indices: dict[int | NodeView, int] = {}
+
+        def index_of(node: AST) -> int:
+            key = node if isinstance(node, NodeView) else id(node)
+            index = indices.get(key)
+
+            if index is None:
+                index = indices[key] = len(nodes)
+                nodes.append(node)
+
+            return index
+
+        index_of(root)
+
+        # `nodes` grows while it is being flattened
+        position = 0
+        while position < len(nodes):
+            node = nodes[position]
+            node_kind = NODE_KINDS[type(node)]
+
+            table.kinds.append(node_kind)
+            table.offsets.append(len(table.fields))
+
+            for name, kind in NODE_FIELDS[NODE_CLASSES[node_kind]]:
+                value = getattr(node, name)
+
+                if kind == NODE:
+                    table.fields.append(-1 if value is None else index_of(value))
+                elif kind == NODES:
+                    table.fields.append(len(table.lists))
+                    table.lists.append(len(value))
+                    table.lists.extend(index_of(child) for child in value)
+                elif kind == TOKEN:
+                    table.fields.append(len(table.tokens))
+                    table.tokens.append(value)
+                else:
+                    table.fields.append(table.add_object(value))
+
+            position += 1
+
+        return table
+
+    def to_buffers(self) -> tuple:
+        """Returns the table's arrays (as bytes), tokens and objects, which `marshal` can
+        encode as long as the objects are primitive values (as they are before the analysis)."""
+        return (
+            self.kinds.tobytes(), self.offsets.tobytes(), self.fields.tobytes(),
+            self.lists.tobytes(), self.tokens.to_buffers(), self.objects
+        )
+
+    @classmethod
+    def from_buffers(cls, buffers: tuple) -> 'NodeTable':
+        """Adopts the state returned by `to_buffers`. Each array is copied as a whole,
+        so unlike `to_tree` (or `serializer.loads`) no work is done per node."""
+        table = cls()
+        kinds, offsets, fields, lists, tokens, table.objects = buffers
+
+        for buffer, data in zip((table.kinds, table.offsets, table.fields, table.lists), (kinds, offsets, fields, lists)):
+            buffer.frombytes(data)
+
+        table.tokens = TokenArray.from_buffers(tokens)
+
+        return table
+
+    def add_object(self, value) -> int:
+        """Stores an object referenced by a node, and returns its index (-1 for None)."""
+        if value is None:
+            return -1
+
+        self.objects.append(value)
+        return len(self.objects) - 1
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def node(self, index: int) -> AST:
+        """Returns a view of the node at `index`."""
+        view = VIEW_CLASSES[self.kinds[index]].__new__(VIEW_CLASSES[self.kinds[index]])
+        view._table = self
+        view._index = index
+
+        return view
+
+    @property
+    def root(self) -> AST:
+        return self.node(0)
+
+    def to_tree(self) -> AST:
+        """Materializes the table back into a tree of regular AST nodes. Never recurses."""
+        nodes = [NODE_CLASSES[kind].__new__(NODE_CLASSES[kind]) for kind in self.kinds]
+        lists = self.lists
+
+        for node, offset in zip(nodes, self.offsets):
+            for position, (name, kind) in enumerate(NODE_FIELDS[type(node)]):
+                value = self.fields[offset + position]
+
+                if kind == NODE:
+                    value = None if value < 0 else nodes[value]
+                elif kind == NODES:
+                    value = [nodes[index] for index in lists[value + 1:value + 1 + lists[value]]]
+                elif kind == TOKEN:
+                    value = self.tokens[value]
+                else:
+                    value = None if value < 0 else self.objects[value]
+
+                setattr(node, name, value)
+
+        return nodes[0]
+
+    @property
+    def nbytes(self) -> int:
+        """The size of the array buffers in bytes (excluding the token values and `objects`)."""
+        return self.tokens.nbytes + sum(
+            buffer.itemsize * len(buffer)
+            for buffer in (self.kinds, self.offsets, self.fields, self.lists)
+        )
+
+    def __str__(self) -> str:
+        return f'NodeTable(nodes={len(self)}, tokens={len(self.tokens)}, bytes={self.nbytes})'
+
+    def __repr__(self) -> str:
+        return self.__str__()
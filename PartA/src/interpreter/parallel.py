@@ -0,0 +1,206 @@
+import os
+import re
+import marshal
+import multiprocessing
+from time import perf_counter
+from concurrent.futures import ProcessPoolExecutor
+from .lexer import Lexer,KEYWORD_TOKENS
+from .parser import Parser
+from .ast import Program
+from .token import TokenType
+from .errors import LexerError,ParserError
+from .node_table import NodeTable
+
+# Sources smaller than this are parsed in the current process
+DEFAULT_MIN_CHUNK_SIZE = 1 << 16
+# Chunks per worker, so workers finishing early pick up more work
+CHUNKS_PER_WORKER = 4
+# Forking a process that runs threads (e.g. of a previous executor) may deadlock
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else None
+
+COMMENT_PATTERN = re.compile(r'#[^\n]*')
+FIRST_WORD_PATTERN = re.compile(r'[^\W_]+')
+LAST_WORD_PATTERN = re.compile(r'[^\W_]+$')
+
+# Keywords which may start a statement
+STATEMENT_KEYWORDS = frozenset((TokenType.FUNCTION_DECL, TokenType.BOOLEAN_CONST, TokenType.NOT))
+
+def _depth(text: str) -> int:
+    """The parentheses / curly brackets nesting depth change over `text`."""
+    if '#' in text:
+        text = COMMENT_PATTERN.sub('', text)
+
+    return text.count('(') - text.count(')') + text.count('{') - text.count('}')
+
+def _starts_statement(line: str) -> bool:
+    """Checks whether a (top-level) line starts with a token that can't continue a previous statement."""
+    line = line.lstrip()
+
+    if not line or not line[0].isalnum():
+        # Empty, comment, parenthesis (call arguments / nested lambda) or operator
+        return False
+
+    keyword = KEYWORD_TOKENS.get(FIRST_WORD_PATTERN.match(line).group().upper())
+
+    return keyword is None or keyword[0] in STATEMENT_KEYWORDS
+
+def _ends_statement(text: str, end: int) -> bool:
+    """Checks whether the last token before offset `end` (skipping blank and comment lines) ends an operand."""
+    while end >= 0:
+        start = text.rfind('\n', 0, end) + 1
+        line = text[start:end].split('#', 1)[0].rstrip()
+
+        if line:
+            if line[-1] == ')':
+                return True
+
+            if not line[-1].isalnum():
+                return False
+
+            keyword = KEYWORD_TOKENS.get(LAST_WORD_PATTERN.search(line).group().upper())
+
+            return keyword is None or keyword[0] == TokenType.BOOLEAN_CONST
+
+        end = start - 1
+
+    return False
+
+def split_source(text: str, chunks: int) -> list[tuple[int, int, int]]:
+    """Splits a source into (up to) `chunks` slices of whole top-level statements.
+
+    A slice boundary is placed at the start of a line that is outside of any
+    parentheses or curly brackets, where the previous line ends with an operand
+    and the line starts with a token that can't continue it (an identifier, a
+    literal, `not` or `Defun`). Such a line always starts a new statement.
+
+    Returns:
+        list[tuple[int, int, int]]: The start offset, end offset and first line number of every slice.
+    """
+    targets = [len(text) * index // chunks for index in range(1, chunks)]
+    bounds = [(0, 1)]
+
+    depth = 0
+    lineno = 1
+    scanned = 0 # `depth` and `lineno` are the ones at `scanned`, which is always a line start
+
+    for target in targets:
+        newline = text.find('\n', max(target, scanned))
+
+        while newline != -1:
+            start = newline + 1
+            segment = text[scanned:start]
+            depth += _depth(segment)
+            lineno += segment.count('\n')
+            scanned = start
+
+            line_end = text.find('\n', start)
+            line = text[start:] if line_end == -1 else text[start:line_end]
+
+            if depth == 0 and _starts_statement(line) and _ends_statement(text, newline):
+                bounds.append((start, lineno))
+                break
+
+            newline = text.find('\n', start)
+
+        if newline == -1:
+            break
+
+    bounds.append((len(text), lineno))
+
+    return [
+        (start, end, start_lineno)
+        for (start, start_lineno), (end, _) in zip(bounds, bounds[1:])
+    ]
+
+def _parse_chunk(text: str, offset: int, lineno: int, intern: bool) -> bytes | None:
+    """Parses the statements of a source slice (in a worker process) into a `NodeTable`,
+    whose buffers are returned encoded with `marshal`.
+
+    Returns None if the slice has lexical or syntax errors, which are then
+    reported by parsing the whole source in the calling process.
+    """
+    try:
+        tree = Parser(Lexer(text, offset=offset, lineno=lineno), intern).parse()
+    except (LexerError, ParserError):
+        return None
+
+    return marshal.dumps(NodeTable.from_tree(tree).to_buffers())
+
+class ParallelParser:
+    """Parses large sources by lexing and parsing slices of it in parallel.
+
+    The source is split at top-level statement boundaries, and the slices are parsed
+    by a `ProcessPoolExecutor`. Each worker flattens its partial program into a
+    `NodeTable`, whose arrays the calling process adopts as they are, and the
+    statements (views of the tables) are merged into a single `Program`.
+    Statements only refer to each other through symbols, which the semantic
+    analysis links afterwards, so the merged program has the same structure as
+    the one parsed by a single `Parser` (including token positions).
+    If any slice fails to parse, the whole source is parsed sequentially, so errors
+    are reported exactly as a `Parser` reports them.
+
+    Attributes:
+        text (str): The source text.
+        workers (int): The number of worker processes.
+        min_chunk_size (int): Sources (and slices) are never split below this size.
+        intern (bool): Intern identical subtrees (within each slice), see `Parser`.
+        chunks (int): The number of slices parsed in parallel by the last `parse`.
+        merge_time (float): The time (in seconds) the last `parse` spent adopting the partial
+            programs in the calling process. This part is serial, so it bounds the speedup
+            (see `benchmarks/bench_frontend.py`).
+
+    Usage:
+        tree = ParallelParser(text, workers=8).parse()
+        SemanticAnalyzer().visit(tree)
+    """
+    def __init__(self, text: str, workers: int | None = None, min_chunk_size: int = DEFAULT_MIN_CHUNK_SIZE, intern: bool = False) -> None:
+        self.text = text
+        self.workers = workers or os.cpu_count() or 1
+        self.min_chunk_size = min_chunk_size
+        self.intern = intern
+        self.chunks = 0
+        self.merge_time = 0.0
+
+    def parse(self) -> Program:
+        chunks = min(self.workers * CHUNKS_PER_WORKER, len(self.text) // self.min_chunk_size)
+        slices = split_source(self.text, chunks) if self.workers > 1 and chunks > 1 else []
+        self.merge_time = 0.0
+
+        if len(slices) < 2:
+            self.chunks = 1
+            return Parser(Lexer(self.text), self.intern).parse()
+
+        statements = []
+        executor = ProcessPoolExecutor(
+            min(self.workers, len(slices)),
+            mp_context=multiprocessing.get_context(START_METHOD)
+        )
+
+        try:
+            # Results arrive in order, so earlier slices are merged while later ones are parsed
+            for result in executor.map(
+                _parse_chunk,
+                [self.text[start:end] for start, end, _ in slices],
+                [start for start, _, _ in slices],
+                [lineno for _, _, lineno in slices],
+                [self.intern] * len(slices)
+            ):
+                if result is None:
+                    self.chunks = 1
+                    return Parser(Lexer(self.text), self.intern).parse()
+
+                started = perf_counter()
+                statements.extend(NodeTable.from_buffers(marshal.loads(result)).root.statements)
+                self.merge_time += perf_counter() - started
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+        self.chunks = len(slices)
+
+        return Program(statements)
+
+    def __str__(self) -> str:
+        return f'ParallelParser(workers={self.workers}, chunks={self.chunks}, merge_time={self.merge_time:.2f}s)'
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -1,14 +1,17 @@
-from .lexer import Lexer
+from enum import Enum
+from typing import Generator,Iterator
+from .lexer import Lexer,TokenBuffer
 from .token import (
-    COMPARE_OPERATORS,
+    COMPARE_OPERATOR_CODES,
     FUNCTION_CONFIGURATION_KEYS,
-    LOGICAL_OPERATORS,
+    LOGICAL_OPERATOR_CODES,
     FunctionConfigurationKey,
     Token,
-    TokenType,
-    ADDITION_OPERATORS,MULT_OPERATORS
+    TokenCode,
+    ADDITION_OPERATOR_CODES,MULT_OPERATOR_CODES
 )
 from .errors import ParserError,ErrorCode
+from .interning import NodeInterner
 from .ast import (
     AST,
     BinOp,
@@ -25,14 +28,93 @@ from .ast import (
     NestedLambda
 )
 
+class Associativity(Enum):
+    LEFT    = 'left'
+    RIGHT   = 'right'
+    NONE    = 'none'
+
+LOGICAL_POWER           = 1
+COMPARE_POWER           = 2
+ADDITION_POWER          = 3
+MULTIPLICATION_POWER    = 4
+
+# Token code -> (binding power, associativity) of every binary operator
+BINDING_POWERS = {
+    **{code: (LOGICAL_POWER, Associativity.LEFT) for code in LOGICAL_OPERATOR_CODES},
+    **{code: (COMPARE_POWER, Associativity.NONE) for code in COMPARE_OPERATOR_CODES},
+    **{code: (ADDITION_POWER, Associativity.RIGHT) for code in ADDITION_OPERATOR_CODES},
+    **{code: (MULTIPLICATION_POWER, Associativity.RIGHT) for code in MULT_OPERATOR_CODES},
+}
+
+# Token codes that may start an expression statement
+EXPRESSION_START_CODES = frozenset((
+    TokenCode.ID,
+    TokenCode.BOOLEAN_CONST,
+    TokenCode.INTEGER_CONST,
+    TokenCode.LPAREN,
+    TokenCode.PLUS,
+    TokenCode.NOT,
+    TokenCode.MINUS
+))
+
+# A grammar rule: a generator which yields the (generators of the) sub-rules it 
+# needs to parse, receives their AST nodes, and returns its own AST node
+Rule = Generator['Rule', AST, AST]
+
 class Parser:
-    def __init__(self, lexer: Lexer) -> None:
+    """
+    Recursive descent parser, without the recursion.
+
+    Each grammar rule is a generator: instead of calling a sub-rule, it yields it, 
+    and `run` drives the rules with an explicit stack. Nesting depth (e.g. of 
+    parentheses, `not`s or function calls) is bounded only by memory, not by 
+    Python's recursion limit.
+    """
+    def __init__(self, lexer: Lexer, intern: bool = False) -> None:
         self.lexer = lexer
+        self.tokens = TokenBuffer(lexer)
+        self.interner = NodeInterner() if intern else None
         self.current_token = self.get_next_token()
 
     def get_next_token(self) -> Token:
-        return self.lexer.get_next_token()
+        return self.tokens.get_next_token()
+
+    def peek_token(self, n: int = 1) -> Token:
+        """
+        Return the n-th token after `current_token` without consuming it
+        """
+        return self.tokens.peek(n)
     
+    def intern(self, node: AST) -> AST:
+        """
+        Return the shared node structurally identical to `node` when interning is enabled
+        """
+        if self.interner is None:
+            return node
+
+        return self.interner.intern(node)
+
+    def run(self, rule: Rule) -> AST:
+        """
+        Run a grammar rule, and the sub-rules it yields, using an explicit stack of rules
+        """
+        stack = [rule]
+        node = None
+
+        while True:
+            try:
+                sub_rule = stack[-1].send(node)
+            except StopIteration as result:
+                stack.pop()
+
+                if not stack:
+                    return result.value
+
+                node = result.value
+            else:
+                stack.append(sub_rule)
+                node = None
+
     def error(self,error_code: ErrorCode, token: Token) -> None:
         raise ParserError(
             error_code=error_code,
@@ -40,13 +122,13 @@ class Parser:
             message=f'{error_code.value} -> {token}',
         )
     
-    def eat(self, token_type: TokenType):
+    def eat(self, token_code: int):
         """
-        Validate the `TokenType` of `current_token`.
-        If `current_token` type matches `token_type`: get the next token from the lexer,
+        Validate the `TokenCode` of `current_token`.
+        If `current_token` code matches `token_code`: get the next token from the lexer,
         otherwise: throw an error        
         """
-        if self.current_token.type == token_type:
+        if self.current_token.code == token_code:
             self.current_token = self.get_next_token()
         else:
             self.error(
@@ -54,22 +136,22 @@ class Parser:
                 token=self.current_token
             )
 
-    def program(self) -> Program:
+    def program(self) -> Rule:
         """
         <program> ::= <statement_list>
         """
-        statements = self.statement_list()
+        statements = yield self.statement_list()
 
         return Program(statements)
     
-    def statement_list(self) -> list[AST]:
+    def statement_list(self) -> Rule:
         """
         <statement_list> ::= <statement> | <statement> <statement_list>
         """
         results = []
 
-        while self.current_token is not None and self.current_token.type != TokenType.EOF:
-            results.append(self.statement())
+        while self.current_token is not None and self.current_token.code != TokenCode.EOF:
+            results.append((yield self.statement()))
 
         return results 
 
@@ -77,7 +159,7 @@ class Parser:
         """An empty node"""
         return NoOp()
     
-    def statement(self) -> AST:
+    def statement(self) -> Rule:
         """
         <statement> ::= <empty>
                       | <lambda_decleration>
@@ -85,22 +167,14 @@ class Parser:
                       | <expression> 
                       | "(" <statement> ")"
         """
-        if self.current_token.type == TokenType.LPAREN and self.lexer.peek_next_token().type == TokenType.LAMBDA:
-            return self.lambda_declaration()
+        if self.current_token.code == TokenCode.LPAREN and self.peek_token().code == TokenCode.LAMBDA:
+            return (yield self.lambda_declaration())
         
-        elif self.current_token.type == TokenType.FUNCTION_DECL:
-            return self.function_declaration()
+        elif self.current_token.code == TokenCode.FUNCTION_DECL:
+            return (yield self.function_declaration())
         
-        elif self.current_token.type in (
-            TokenType.ID,
-            TokenType.BOOLEAN_CONST,
-            TokenType.INTEGER_CONST,
-            TokenType.LPAREN,
-            TokenType.PLUS,
-            TokenType.NOT,
-            TokenType.MINUS
-            ):
-            return self.logical_expr()
+        elif self.current_token.code in EXPRESSION_START_CODES:
+            return (yield self.logical_expr())
         elif self.current_token.value == '':
             return self.empty()        
         else:
@@ -109,7 +183,7 @@ class Parser:
                 token=self.current_token
             )
 
-    def function_declaration(self) -> FunctionDecl:
+    def function_declaration(self) -> Rule:
         """
         <function_declaration> ::= "Defun" "{" <function_conf_name> "," <function_conf_args> "}"
                          | "Defun" "{" <function_conf_args> "," <function_conf_name> "}"
@@ -119,13 +193,13 @@ class Parser:
         """
         function_token = self.current_token
 
-        self.eat(TokenType.FUNCTION_DECL)
-        self.eat(TokenType.LCURL)
+        self.eat(TokenCode.FUNCTION_DECL)
+        self.eat(TokenCode.LCURL)
 
         function_config = { x.value: None for x in FunctionConfigurationKey }
 
-        while self.current_token is not None and self.current_token.type is not TokenType.RCURL:
-            self.eat(TokenType.QUOTE)
+        while self.current_token is not None and self.current_token.code != TokenCode.RCURL:
+            self.eat(TokenCode.QUOTE)
 
             if self.current_token.value not in FUNCTION_CONFIGURATION_KEYS:
                 self.error(
@@ -134,14 +208,14 @@ class Parser:
                 )
 
             key = self.current_token.value
-            self.eat(TokenType.ID)
-            self.eat(TokenType.QUOTE)
-            self.eat(TokenType.COLON)
+            self.eat(TokenCode.ID)
+            self.eat(TokenCode.QUOTE)
+            self.eat(TokenCode.COLON)
 
             if key == FunctionConfigurationKey.NAME.value:
-                self.eat(TokenType.QUOTE)
+                self.eat(TokenCode.QUOTE)
 
-                if self.current_token.type is not TokenType.ID:
+                if self.current_token.code != TokenCode.ID:
                     self.error(
                         error_code=ErrorCode.UNEXPECTED_TOKEN,
                         token=self.current_token
@@ -149,21 +223,27 @@ class Parser:
                 
                 function_config[FunctionConfigurationKey.NAME.value] = self.current_token.value
 
-                self.eat(TokenType.ID)
-                self.eat(TokenType.QUOTE)
+                self.eat(TokenCode.ID)
+                self.eat(TokenCode.QUOTE)
             
             else:
-                self.eat(TokenType.LPAREN)
+                self.eat(TokenCode.LPAREN)
                 function_config[FunctionConfigurationKey.ARGUMENTS.value] = self.formal_parameters_list()
-                self.eat(TokenType.RPAREN)
+                self.eat(TokenCode.RPAREN)
                 
-            if self.current_token.type != TokenType.RCURL:
-                self.eat(TokenType.COMMA)
+            if self.current_token.code != TokenCode.RCURL:
+                self.eat(TokenCode.COMMA)
         
 
-        self.eat(TokenType.RCURL)
+        self.eat(TokenCode.RCURL)
         # Match function body <expression>
-        expr_node = self.logical_expr()
+        if self.interner is not None:
+            self.interner.enter_scope()
+
+        expr_node = yield self.logical_expr()
+
+        if self.interner is not None:
+            self.interner.exit_scope()
 
         for key in FunctionConfigurationKey:
             if function_config[key.value] is None:
@@ -184,83 +264,113 @@ class Parser:
         """
         params = []
 
-        while self.current_token.type == TokenType.ID:
+        while self.current_token.code == TokenCode.ID:
             params.append(Param(self.current_token))
-            self.eat(TokenType.ID)
+            self.eat(TokenCode.ID)
 
-            if self.current_token.type == TokenType.COMMA:
-                self.eat(TokenType.COMMA)
+            if self.current_token.code == TokenCode.COMMA:
+                self.eat(TokenCode.COMMA)
             else:
                 break
 
         return params
 
-    def logical_expr(self) -> AST:
+    def logical_expr(self) -> Rule:
         """
-        <logical_expr> ::= <compare_expr> | <compare_expr> <binary_op> <logical_expr>
-        """        
-        left = self.compare_expr()
+        <logical_expr>        ::= <compare_expr> | <compare_expr> <binary_op> <logical_expr>
+        <compare_expr>        ::= <addition_expr> | <addition_expr> <compare_op> <addition_expr>
+        <addition_expr>       ::= <multiplication_expr> | <multiplication_expr> <addition_op> <addition_expr>
+        <multiplication_expr> ::= <factor> | <factor> <mult_op> <multiplication_expr> | <addition_op> <factor>
+
+        All binary operator levels are parsed in a single loop by precedence climbing,
+        driven by the `BINDING_POWERS` table. Operands and pending operators are kept on
+        explicit stacks, so arbitrarily long operator chains never recurse.
+        """
+        operands: list[AST] = []
+        operators: list[Token] = []
+        powers: list[int] = []
+
+        signed = self.current_token.code in ADDITION_OPERATOR_CODES
+        operands.append(self.leaf() or (yield self.operand()))
 
-        while self.current_token is not None and self.current_token.value in LOGICAL_OPERATORS:
+        while True:
             op_token = self.current_token
-            self.eat(op_token.type)
+            binding = BINDING_POWERS.get(op_token.code)
 
-            left = BinOp(left=left,op=op_token,right=self.compare_expr())
-        
-        return left
-    
-    def compare_expr(self) -> AST:
-        """
-        <compare_expr> ::= <addition_expr> | <addition_expr> <compare_op> <addition_expr>
-        """
+            if binding is None:
+                break
 
-        left = self.addition_expr()
+            power, associativity = binding
 
-        op_token = self.current_token
-        
-        if op_token.value in COMPARE_OPERATORS:
-            self.eat(op_token.type)
-        else:
-            return left
-            
-        return BinOp(left=left,op=op_token,right=self.addition_expr())
-        
-    def addition_expr(self) -> AST:
+            if signed and power == MULTIPLICATION_POWER:
+                # A signed operand is a complete <multiplication_expr>, which can only be
+                # extended by the <multiplication_expr> it is the right operand of (if any)
+                if not powers or powers[-1] != MULTIPLICATION_POWER:
+                    break
+
+                right = operands.pop()
+                powers.pop()
+                operands[-1] = self.intern(BinOp(operands[-1], operators.pop(), right))
+            else:
+                while powers and (
+                    powers[-1] > power or
+                    (powers[-1] == power and associativity is Associativity.LEFT)
+                ):
+                    right = operands.pop()
+                    powers.pop()
+                    operands[-1] = self.intern(BinOp(operands[-1], operators.pop(), right))
+
+                if powers and powers[-1] == power and associativity is Associativity.NONE:
+                    break
+
+            self.eat(op_token.code)
+            operators.append(op_token)
+            powers.append(power)
+
+            signed = self.current_token.code in ADDITION_OPERATOR_CODES
+            operands.append(self.leaf() or (yield self.operand()))
+
+        # Operators left on the stack bind from right to left
+        right = operands.pop()
+        while operators:
+            right = self.intern(BinOp(operands.pop(), operators.pop(), right))
+
+        return right
+
+    def operand(self) -> Rule:
         """
-        <addition_expr> ::= <multiplication_expr> | <multiplication_expr> <addition_op> <addition_expr>
+        <operand> ::= <factor> | <addition_op> <factor>
         """
+        if self.current_token.code in ADDITION_OPERATOR_CODES:
+            token = self.current_token
+            self.eat(token.code)
+            return self.intern(UnaryOp(token,(yield self.factor())))
 
-        left = self.multiplication_expr()
-
-        while self.current_token is not None and self.current_token.value in ADDITION_OPERATORS:
-            op_token = self.current_token
-            self.eat(op_token.type)
+        return (yield self.factor())
 
-            left = BinOp(left=left,op=op_token,right=self.addition_expr())
-        
-        return left
-        
-    def multiplication_expr(self) -> AST:
+    def leaf(self) -> AST | None:
         """
-        <multiplication_expr> ::= <factor> | <factor> <mult_op> <multiplication_expr>
+        Parse a <factor> which is a single token (an integer, a boolean or an identifier 
+        which isn't called), or return None if the current token doesn't start one.
+        Leaves are the most common factors, and parsing them doesn't need a rule.
         """
+        token = self.current_token
 
-        if self.current_token.type in (TokenType.PLUS, TokenType.MINUS):
-            token = self.current_token
-            self.eat(token.type)
-            return UnaryOp(token,self.factor())
-        
-        left = self.factor()
+        if token.code == TokenCode.INTEGER_CONST:
+            self.eat(TokenCode.INTEGER_CONST)
+            return self.intern(Integer(token))
 
-        while self.current_token is not None and self.current_token.value in MULT_OPERATORS:
-            op_token = self.current_token
-            self.eat(op_token.type)
+        if token.code == TokenCode.BOOLEAN_CONST:
+            self.eat(TokenCode.BOOLEAN_CONST)
+            return self.intern(Boolean(token))
 
-            left = BinOp(left=left, op=op_token,right=self.multiplication_expr())
+        if token.code == TokenCode.ID and self.peek_token().code != TokenCode.LPAREN:
+            self.eat(TokenCode.ID)
+            return self.intern(Param(token))
 
-        return left
+        return None
     
-    def factor(self):
+    def factor(self) -> Rule:
         """
         <factor> ::= <integer>
                    | <boolean>
@@ -273,32 +383,32 @@ class Parser:
         """
         token = self.current_token
 
-        if token.type == TokenType.NOT:
-            self.eat(TokenType.NOT)
-            return NotOp(self.factor())
+        if token.code == TokenCode.NOT:
+            self.eat(TokenCode.NOT)
+            return self.intern(NotOp((yield self.factor())))
 
-        if token.type == TokenType.BOOLEAN_CONST:
-            self.eat(TokenType.BOOLEAN_CONST)
-            return Boolean(token)
+        if token.code == TokenCode.BOOLEAN_CONST:
+            self.eat(TokenCode.BOOLEAN_CONST)
+            return self.intern(Boolean(token))
         
-        elif self.current_token.type == TokenType.LPAREN:
-            if self.lexer.peek_next_token().type == TokenType.LAMBDA:
-                return self.nested_lambda()
+        elif self.current_token.code == TokenCode.LPAREN:
+            if self.peek_token().code == TokenCode.LAMBDA:
+                return (yield self.nested_lambda())
             else:
-                self.eat(TokenType.LPAREN)
-                node = self.logical_expr()
-                self.eat(TokenType.RPAREN)
+                self.eat(TokenCode.LPAREN)
+                node = yield self.logical_expr()
+                self.eat(TokenCode.RPAREN)
                 return node
         
-        elif token.type == TokenType.INTEGER_CONST:
-            self.eat(TokenType.INTEGER_CONST)
-            return Integer(token)
+        elif token.code == TokenCode.INTEGER_CONST:
+            self.eat(TokenCode.INTEGER_CONST)
+            return self.intern(Integer(token))
         
-        elif token.type == TokenType.ID and self.lexer.peek_next_token().type == TokenType.LPAREN:
-            return self.function_call()
-        elif token.type == TokenType.ID:
-            self.eat(TokenType.ID)
-            return Param(token)
+        elif token.code == TokenCode.ID and self.peek_token().code == TokenCode.LPAREN:
+            return (yield self.function_call())
+        elif token.code == TokenCode.ID:
+            self.eat(TokenCode.ID)
+            return self.intern(Param(token))
         
         else:
             self.error(
@@ -306,28 +416,34 @@ class Parser:
                 token=token
             )
         
-    def lambda_declaration(self) -> Lambda:
+    def lambda_declaration(self) -> Rule:
         """
         <lambda_decleration> ::= "(" "Lambd" <formal_parameters> "." <logical_expr> ")"
                                | "(" "Lambd" <formal_parameters> "." <lambda_declaration> ")"
         """
         token = self.current_token
-        self.eat(TokenType.LPAREN)
-        self.eat(TokenType.LAMBDA)
+        self.eat(TokenCode.LPAREN)
+        self.eat(TokenCode.LAMBDA)
 
         params = self.formal_parameters_list()
 
-        self.eat(TokenType.DOT)
-        
+        self.eat(TokenCode.DOT)
+
+        if self.interner is not None:
+            self.interner.enter_scope()
+
         if (
-            self.lexer.peek_next_token().type == TokenType.LPAREN and
-            self.lexer.peek_next_token(2).type == TokenType.LAMBDA
+            self.peek_token().code == TokenCode.LPAREN and
+            self.peek_token(2).code == TokenCode.LAMBDA
         ):
-            node = self.lambda_declaration()
+            node = yield self.lambda_declaration()
         else:
-            node = self.logical_expr()
+            node = yield self.logical_expr()
+
+        if self.interner is not None:
+            self.interner.exit_scope()
         
-        self.eat(TokenType.RPAREN)
+        self.eat(TokenCode.RPAREN)
 
         return Lambda(
             token=token,
@@ -335,40 +451,40 @@ class Parser:
             expr_node=node
         )
 
-    def nested_lambda(self) -> NestedLambda:
+    def nested_lambda(self) -> Rule:
         """
         <nested_lambda> ::= <lambda_decleration> "(" <actual_parameters> ")"
         """
-        lambda_node = self.lambda_declaration()
+        lambda_node = yield self.lambda_declaration()
 
-        self.eat(TokenType.LPAREN)
+        self.eat(TokenCode.LPAREN)
         
-        actual_param_nodes = self.actual_parameters()
+        actual_param_nodes = yield self.actual_parameters()
         
-        self.eat(TokenType.RPAREN)
+        self.eat(TokenCode.RPAREN)
         
         return NestedLambda(
             lambda_node=lambda_node,
             actual_params=actual_param_nodes
         )
 
-    def function_call(self) -> FunctionCall:
+    def function_call(self) -> Rule:
         """
         <function_call> ::= ID "(" <actual_parameters> ")"
         """
         token = self.current_token
-        self.eat(TokenType.ID)
-        self.eat(TokenType.LPAREN)
+        self.eat(TokenCode.ID)
+        self.eat(TokenCode.LPAREN)
 
-        params = self.actual_parameters()
-        self.eat(TokenType.RPAREN)
+        params = yield self.actual_parameters()
+        self.eat(TokenCode.RPAREN)
         
-        return FunctionCall(
+        return self.intern(FunctionCall(
             actual_params=params,
             token=token
-        )
+        ))
     
-    def actual_parameters(self) -> list[AST]:
+    def actual_parameters(self) -> Rule:
         """
         <actual_parameters> ::= <logical_expr>
                               | <logical_expr> ","
@@ -380,28 +496,36 @@ class Parser:
         """  
         actual_params = []
 
-        while self.current_token is not None and self.current_token.type != TokenType.RPAREN:
+        while self.current_token is not None and self.current_token.code != TokenCode.RPAREN:
             if (
-                self.current_token.type == TokenType.LPAREN and
-                self.lexer.peek_next_token().type == TokenType.LAMBDA
+                self.current_token.code == TokenCode.LPAREN and
+                self.peek_token().code == TokenCode.LAMBDA
             ):
-                actual_params.append(self.lambda_declaration())
+                actual_params.append((yield self.lambda_declaration()))
             else:
-                actual_params.append(self.logical_expr())
+                actual_params.append((yield self.logical_expr()))
 
-            if self.current_token.type == TokenType.COMMA:
-                self.eat(TokenType.COMMA)
+            if self.current_token.code == TokenCode.COMMA:
+                self.eat(TokenCode.COMMA)
 
         return actual_params
     
+    def statements(self) -> Iterator[AST]:
+        """
+        Parse the input one top-level statement at a time, as an alternative to `parse`.
+        Each statement is parsed only when the previous one was consumed.
+        """
+        while self.current_token.code != TokenCode.EOF:
+            yield self.run(self.statement())
+
     def parse(self) -> Program:
         """
         Parse input code into AST tree for execution
         """
 
-        node = self.program()
+        node = self.run(self.program())
 
-        if self.current_token.type != TokenType.EOF:
+        if self.current_token.code != TokenCode.EOF:
             self.error(
                 error_code=ErrorCode.UNEXPECTED_TOKEN,
                 token=self.current_token
@@ -0,0 +1,48 @@
+from typing import Iterator
+from .ast import AST
+from .parser import Parser
+from .semantic_analyzer import SemanticAnalyzer
+from .interpreter import Interpreter
+
+class Pipeline:
+    """Runs a program one top-level statement at a time.
+
+    Every statement is parsed, analyzed against the running global scope and
+    executed before the next one is parsed, so the output of a statement is
+    available as soon as the statement (and the first token after it) was read.
+    Only the AST of the current statement is kept (besides the declarations
+    the symbols refer to), so memory stays flat on long programs, and programs
+    can be streamed in, e.g. from a pipe through a `StreamLexer`.
+
+    Errors are raised when the statement containing them is reached, after the
+    output of the previous statements was produced.
+
+    Attributes:
+        parser (Parser): The parser of the program's source.
+        semantic_analyzer (SemanticAnalyzer): Analyzes every statement before it is executed.
+        interpreter (Interpreter): Executes the statements.
+
+    Usage:
+        pipeline = Pipeline(Parser(StreamLexer(sys.stdin)))
+        for output in pipeline.run():
+            print(output)
+    """
+    def __init__(
+            self,
+            parser: Parser,
+            semantic_analyzer: SemanticAnalyzer | None = None,
+            interpreter: Interpreter | None = None
+        ) -> None:
+        self.parser = parser
+        self.semantic_analyzer = semantic_analyzer or SemanticAnalyzer()
+        self.interpreter = interpreter or Interpreter()
+
+    def statements(self) -> Iterator[AST]:
+        """Parses and analyzes the statements of the program, one at a time."""
+        for statement in self.parser.statements():
+            self.semantic_analyzer.visit(statement)
+            yield statement
+
+    def run(self) -> Iterator:
+        """Executes the program, yielding the (non-None) result of every statement."""
+        return self.interpreter.execute(self.statements())
@@ -0,0 +1,265 @@
+from typing import Iterator
+from .lexer import Lexer,LegacyLexer
+from .parser import Parser
+from .ast import AST,FunctionCall,FunctionDecl
+from .node_table import NODE_FIELDS,NODE,NODES
+from .token import Token,TokenCode
+from .stack import ActivationRecord,ARType
+from .symbol import CallableSymbol
+from .errors import LexerError,ParserError
+from .semantic_analyzer import SemanticAnalyzer
+from .interpreter import Interpreter
+
+class TokenList:
+    """Feeds already scanned tokens to a `Parser`, followed by `eof`."""
+    def __init__(self, tokens: list[Token], eof: Token) -> None:
+        self._tokens = iter(tokens)
+        self._eof = eof
+
+    def get_next_token(self) -> Token:
+        return next(self._tokens, self._eof)
+
+def called_functions(node: AST) -> set[str]:
+    """Returns the names of the declared functions called under `node`. Never recurses."""
+    names = set()
+    nodes = [node]
+
+    while nodes:
+        node = nodes.pop()
+
+        if isinstance(node, FunctionCall) and isinstance(node.symbol, CallableSymbol):
+            names.add(node.func_name)
+
+        for name, kind in NODE_FIELDS[type(node)]:
+            if kind == NODE:
+                child = getattr(node, name)
+                if child is not None:
+                    nodes.append(child)
+            elif kind == NODES:
+                nodes.extend(getattr(node, name))
+
+    return names
+
+class Repl:
+    """Incremental read-eval-print engine.
+
+    Every line of input is lexed once, and its tokens are kept until they form
+    complete statements. A statement is complete once it parses: running out of
+    tokens (a syntax error at the end of the input) means the statement continues
+    on the next line, while any other syntax error is reported right away.
+    Only the completed statements are analyzed (against the session's global scope)
+    and executed (in the session's global activation record), so the cost of an
+    input doesn't depend on the length of the session.
+
+    Functions can be redefined with `Defun`. The new declaration is analyzed and
+    replaces the old one in place (callers keep the function's `CallableSymbol`),
+    and the functions calling it are re-analyzed against the new parameters. If
+    any of them no longer analyzes, the redefinition is rolled back.
+
+    Attributes:
+        semantic_analyzer (SemanticAnalyzer): Analyzes the completed statements.
+        interpreter (Interpreter): Executes the completed statements.
+        legacy_lexer (bool): Tokenize with the `LegacyLexer`.
+        declarations (dict[str, FunctionDecl]): The current declaration of every function.
+        callers (dict[str, set[str]]): The names of the functions calling every function.
+        recompiled (list[str]): The functions re-analyzed by the last redefinition.
+
+    Usage:
+        repl = Repl()
+        for line in lines:
+            for output in repl.feed(line):
+                print(output)
+    """
+    def __init__(
+            self,
+            semantic_analyzer: SemanticAnalyzer | None = None,
+            interpreter: Interpreter | None = None,
+            legacy_lexer: bool = False
+        ) -> None:
+        self.semantic_analyzer = semantic_analyzer or SemanticAnalyzer()
+        self.interpreter = interpreter or Interpreter()
+        self.legacy_lexer = legacy_lexer
+
+        self.declarations: dict[str, FunctionDecl] = {}
+        self.callers: dict[str, set[str]] = {}
+        self.recompiled: list[str] = []
+
+        self._global_scope = self.semantic_analyzer.current_scope
+        self._global_ar = ActivationRecord(
+            name='PROGRAM',
+            type=ARType.PROGRAM,
+            nesting_level=1
+        )
+        self.interpreter.call_stack.push(self._global_ar)
+
+        # The tokens of the pending (incomplete) statement, and the position of its next line
+        self._tokens: list[Token] = []
+        self._offset = 0
+        self._lineno = 1
+
+    @property
+    def pending(self) -> bool:
+        """Whether the input so far ends with an incomplete statement."""
+        return bool(self._tokens)
+
+    def reset(self) -> None:
+        """Discards the pending (incomplete) statement."""
+        self._tokens = []
+        self._offset = 0
+        self._lineno = 1
+
+    def feed(self, line: str) -> Iterator:
+        """Reads a line of input, and executes the statements it completes.
+
+        Token positions are relative to the first line of the statement.
+
+        Args:
+            line (str): A line of input, without its line break.
+
+        Raises:
+            LexerError, ParserError, SemanticError, InterpreterError: When a statement is
+                invalid, or fails. Pending input is discarded on lexer / parser errors.
+
+        Yields:
+            The (non-None) result of every completed statement.
+        """
+        try:
+            tokens, eof = self._scan(line)
+        except LexerError:
+            self.reset()
+            raise
+
+        self._tokens.extend(tokens)
+        self._offset += len(line) + 1
+        self._lineno += 1
+
+        if not self._tokens:
+            self.reset()
+            return
+
+        try:
+            program = Parser(TokenList(self._tokens, eof)).parse()
+        except ParserError as e:
+            if e.token is eof:
+                # The statement continues on the next line
+                return
+
+            self.reset()
+            raise
+
+        self.reset()
+
+        for statement in program.statements:
+            output = self.execute(statement)
+
+            if output is not None:
+                yield output
+
+    def _scan(self, line: str) -> tuple[list[Token], Token]:
+        """Lexes a line of input, returning its tokens and the EOF token following them."""
+        if self.legacy_lexer:
+            lexer = LegacyLexer(line)
+        else:
+            lexer = Lexer(line, offset=self._offset, lineno=self._lineno)
+
+        tokens = []
+        token = lexer.get_next_token()
+
+        while token.code != TokenCode.EOF:
+            tokens.append(token)
+            token = lexer.get_next_token()
+
+        return tokens, token
+
+    def execute(self, statement: AST):
+        """Analyzes and executes a single top-level statement.
+
+        Returns:
+            The result of the statement.
+        """
+        try:
+            if isinstance(statement, FunctionDecl):
+                self.declare(statement)
+            else:
+                self.semantic_analyzer.visit(statement)
+
+            return self.interpreter.visit(statement)
+        finally:
+            # Unwind the scopes and frames left by an error
+            self.semantic_analyzer.current_scope = self._global_scope
+
+            while self.interpreter.call_stack.peek() is not self._global_ar:
+                self.interpreter.call_stack.pop()
+
+    def declare(self, node: FunctionDecl) -> None:
+        """Analyzes a function declaration, which may redefine an existing function.
+
+        Raises:
+            SemanticError: If the declaration, or any function calling the
+                redefined function, doesn't analyze. Nothing is changed then.
+        """
+        name = node.func_name
+        previous = self.declarations.get(name)
+        self.recompiled = []
+
+        if previous is None:
+            existing = self._global_scope.lookup(name, current_scope_only=True)
+
+            try:
+                self.semantic_analyzer.visit(node)
+            except Exception:
+                # Drop the symbol of the failed declaration (but not a symbol it duplicates)
+                if existing is None:
+                    self._global_scope.remove(name)
+                raise
+
+            self._add_declaration(node)
+            return
+
+        symbol: CallableSymbol = previous.symbol
+        old_definition = (symbol.formal_params, symbol.expr_ast, symbol.memoizable)
+        callers = sorted(self.callers[name] - {name})
+
+        self._analyze(node, symbol)
+
+        try:
+            for caller in callers:
+                self._analyze(self.declarations[caller], self.declarations[caller].symbol)
+        except Exception:
+            symbol.formal_params, symbol.expr_ast, symbol.memoizable = old_definition
+            raise
+
+        self._remove_declaration(previous)
+        self._add_declaration(node)
+        self.recompiled = [name, *callers]
+        # Cached results of any function (calling it directly or not) may be stale
+        self.interpreter.memo_caches.clear()
+
+    def _analyze(self, node: FunctionDecl, symbol: CallableSymbol) -> None:
+        """Analyzes the (re)declaration `node` of the function of `symbol`, which keeps its identity."""
+        self._global_scope.remove(node.func_name)
+
+        try:
+            self.semantic_analyzer.visit(node)
+        finally:
+            self._global_scope.insert(symbol)
+
+        symbol.formal_params = node.symbol.formal_params
+        symbol.expr_ast = node.symbol.expr_ast
+        symbol.memoizable = node.symbol.memoizable
+        node.symbol = symbol
+
+    def _add_declaration(self, node: FunctionDecl) -> None:
+        self.declarations[node.func_name] = node
+        self.callers.setdefault(node.func_name, set())
+
+        for callee in called_functions(node.expr_node):
+            self.callers.setdefault(callee, set()).add(node.func_name)
+
+    def _remove_declaration(self, node: FunctionDecl) -> None:
+        for callee in called_functions(node.expr_node):
+            self.callers[callee].discard(node.func_name)
+
+    def close(self) -> None:
+        """Ends the session, removing its global activation record."""
+        self.interpreter.call_stack.pop()
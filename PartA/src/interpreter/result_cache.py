@@ -0,0 +1,272 @@
+import hashlib
+import marshal
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable
+from .ast import AST
+from .node_table import NODE,NODES,TOKEN,NODE_FIELDS
+from .symbol import CallableSymbol
+from .serializer import FORMAT_VERSION,default_cache_directory
+
+# The number of results kept on disk, by default
+DEFAULT_RESULT_CACHE_SIZE = 1 << 20
+
+# The evaluation time (in seconds) from which a result is worth storing, by default
+DEFAULT_MIN_COST = 1e-3
+
+RESULT_CACHE_FILE = 'results.sqlite3'
+
+# Seeds every function hash, with `serializer.FORMAT_VERSION` (the layout of the hashed nodes).
+# Must be bumped whenever what a program evaluates to changes (e.g. the semantics of an
+# operator or of a call), or the encoding of stored arguments and results does, so results
+# stored by earlier versions are never served
+RESULT_VERSION = 1
+
+# The values a result (or an argument) must have to be stored on disk
+PERSISTENT_TYPES = (int, bool, type(None))
+
+# Fields which don't change what a node evaluates to
+_IGNORED_FIELDS = frozenset(('symbol', '_lambda_name'))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    function    TEXT NOT NULL,
+    arguments   BLOB NOT NULL,
+    result      BLOB NOT NULL,
+    used        INTEGER NOT NULL,
+    PRIMARY KEY (function, arguments)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_used ON results (used);
+CREATE TABLE IF NOT EXISTS stats (
+    name        TEXT PRIMARY KEY,
+    value       INTEGER NOT NULL
+);
+"""
+
+def _node_fields(node_class: type) -> tuple:
+    """The fields of a node class (or of the class of a `NodeTable` view)."""
+    for cls in node_class.__mro__:
+        fields = NODE_FIELDS.get(cls)
+
+        if fields is not None:
+            return fields
+
+    raise TypeError(f'Unknown node class {node_class.__name__}')
+
+def function_hash(symbol: CallableSymbol, resolve: Callable[[str], object]) -> str:
+    """Returns a hash of the code a function's results depend on.
+
+    The hash covers the function's parameters and body, and those of every declared
+    function its body (transitively) calls or refers to, so redefining any of them
+    changes the hash. Names of generated lambdas and token positions are left out.
+    Never recurses, regardless of how deep the bodies are. The hash is seeded with
+    `RESULT_VERSION` and `FORMAT_VERSION`, so bumping either invalidates all stored results.
+
+    Args:
+        symbol (CallableSymbol): The (analyzed) function.
+        resolve (Callable[[str], object]): Returns the value of a global name (e.g. a declared function).
+    """
+    digest = hashlib.sha256(f'{RESULT_VERSION}:{FORMAT_VERSION}:'.encode())
+    functions = [symbol]
+    seen = {id(symbol)}
+
+    def reach(value) -> None:
+        if isinstance(value, CallableSymbol) and id(value) not in seen:
+            seen.add(id(value))
+            functions.append(value)
+
+    # `functions` grows while it is being hashed
+    for function in functions:
+        digest.update(f'\0def {function.name}({",".join(param.name for param in function.formal_params)})'.encode())
+        nodes: list[AST | None] = [function.expr_ast]
+
+        while nodes:
+            node = nodes.pop()
+
+            if node is None:
+                digest.update(b'\0-')
+                continue
+
+            digest.update(f'\0{type(node).__name__}'.encode())
+
+            for name, kind in _node_fields(type(node)):
+                if name in _IGNORED_FIELDS:
+                    continue
+
+                value = getattr(node, name)
+
+                if kind == NODE:
+                    nodes.append(value)
+                elif kind == NODES:
+                    digest.update(f'\0[{len(value)}]'.encode())
+                    nodes.extend(reversed(value))
+                elif kind == TOKEN:
+                    digest.update(f'\0{value.type.name}={value.value!r}'.encode())
+                else:
+                    digest.update(f'\0{name}={value!r}'.encode())
+
+            symbol = getattr(node, 'symbol', None)
+
+            if symbol is not None and not hasattr(node, 'formal_params'):
+                # A declared function's call (a lambda's own symbol is hashed through its body)
+                reach(symbol)
+            elif getattr(node, 'slot', 0) is None:
+                # A global name: a declared function, called or used as a value
+                reach(resolve(getattr(node, 'func_name', None) or node.name))
+
+    return digest.hexdigest()
+
+class ResultCache:
+    """On-disk (SQLite) cache of the results of memoizable functions, shared across runs.
+
+    Results are keyed by the hash of the function's code (see `function_hash`) and
+    the values of its arguments. Only plain values (integers, booleans and None)
+    are stored, and only results which took at least `min_cost` seconds to evaluate
+    are worth storing (see `MemoCache.put`): cheap calls are faster to evaluate
+    again than to look up. At most `max_entries` results are kept: beyond it, the
+    least recently used ones are evicted.
+
+    Writes are best-effort: a result which can't be stored (e.g. because another
+    process holds the database's lock) is simply not cached.
+
+    Attributes:
+        path (Path): The SQLite database file.
+        max_entries (int): The maximum number of stored results.
+        min_cost (float): The evaluation time (in seconds) from which results are stored.
+        hits (int): The number of lookups which found a result, in this run.
+        misses (int): The number of lookups which didn't, in this run.
+
+    Usage:
+        cache = ResultCache()
+        result = cache.get(function_hash(symbol, resolve), (5,))
+        ...
+        cache.close()
+    """
+    def __init__(
+            self,
+            directory: Path | str | None = None,
+            max_entries: int = DEFAULT_RESULT_CACHE_SIZE,
+            min_cost: float = DEFAULT_MIN_COST
+        ) -> None:
+        directory = Path(directory) if directory is not None else default_cache_directory()
+        directory.mkdir(parents=True, exist_ok=True)
+
+        self.path = directory / RESULT_CACHE_FILE
+        self.max_entries = max_entries
+        self.min_cost = min_cost
+        self.hits = 0
+        self.misses = 0
+
+        # Autocommit: every write is its own short transaction, so concurrent runs rarely wait on each other
+        self._connection = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(_SCHEMA)
+        self._entries = self._connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+        # The keys of the results used in this run, whose `used` time is updated on close
+        self._used: list[tuple[int, str, bytes]] = []
+
+    @staticmethod
+    def encode(arguments: tuple) -> bytes | None:
+        """Encodes argument values (or a result) for storage, or returns None if they can't be stored."""
+        for value in arguments:
+            if value.__class__ not in PERSISTENT_TYPES:
+                return None
+
+        # `marshal` keeps `True` and `1` apart
+        return marshal.dumps(arguments)
+
+    def get(self, function: str, arguments: tuple, default=None):
+        """Returns the stored result of a call, or `default`."""
+        encoded = self.encode(arguments)
+
+        if encoded is None:
+            return default
+
+        row = self._connection.execute(
+            'SELECT result FROM results WHERE function = ? AND arguments = ?', (function, encoded)
+        ).fetchone()
+
+        if row is None:
+            self.misses += 1
+            return default
+
+        self.hits += 1
+        self._used.append((time.time_ns(), function, encoded))
+        return marshal.loads(row[0])[0]
+
+    def put(self, function: str, arguments: tuple, result) -> None:
+        """Stores the result of a call, if its arguments and result are plain values."""
+        encoded = self.encode(arguments)
+        encoded_result = self.encode((result,))
+
+        if encoded is None or encoded_result is None:
+            return
+
+        try:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+                (function, encoded, encoded_result, time.time_ns())
+            )
+            self._entries += 1
+
+            if self._entries > self.max_entries:
+                self.evict()
+        except sqlite3.OperationalError:
+            pass
+
+    def evict(self) -> None:
+        """Evicts the least recently used results, down to 90% of `max_entries` (so evictions are batched)."""
+        excess = self._entries - self.max_entries * 9 // 10
+        self._connection.execute(
+            'DELETE FROM results WHERE (function, arguments) IN '
+            '(SELECT function, arguments FROM results ORDER BY used LIMIT ?)',
+            (excess,)
+        )
+        self._entries = self._connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def stats(self) -> dict[str, int]:
+        """Returns the number of stored results and functions, the size of the database, and the hits and misses of all runs."""
+        connection = self._connection
+        stats = dict(connection.execute('SELECT name, value FROM stats'))
+
+        return {
+            'entries': connection.execute('SELECT COUNT(*) FROM results').fetchone()[0],
+            'functions': connection.execute('SELECT COUNT(DISTINCT function) FROM results').fetchone()[0],
+            'bytes': sum(path.stat().st_size for path in self.path.parent.glob(f'{self.path.name}*')),
+            'hits': stats.get('hits', 0) + self.hits,
+            'misses': stats.get('misses', 0) + self.misses,
+        }
+
+    def clear(self) -> None:
+        """Removes all stored results and statistics."""
+        self._connection.execute('DELETE FROM results')
+        self._connection.execute('DELETE FROM stats')
+        self._connection.execute('VACUUM')
+        self._entries = 0
+        self.hits = self.misses = 0
+        self._used.clear()
+
+    def close(self) -> None:
+        """Records the usage of the results used in this run, and the run's hits and misses, and closes the database."""
+        try:
+            with self._connection:
+                self._connection.execute('BEGIN')
+                self._connection.executemany(
+                    'UPDATE results SET used = ? WHERE function = ? AND arguments = ?', self._used
+                )
+                self._connection.executemany(
+                    'INSERT INTO stats VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET value = value + excluded.value',
+                    (('hits', self.hits), ('misses', self.misses))
+                )
+        except sqlite3.OperationalError:
+            pass
+        finally:
+            self._connection.close()
+
+    def __str__(self) -> str:
+        return f'{self.__class__.__name__}(path={self.path}, entries={self._entries}, hits={self.hits}, misses={self.misses})'
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -1,8 +1,10 @@
-from .interpreter import NodeVisitor
+from collections import Counter
+from .interpreter import NodeVisitor,yields_children
 from .symbol import BuiltinTypeSymbol, ScopedSymbolTable, ParamSymbol, CallableSymbol
 from .errors import SemanticError, ErrorCode
-from .token import Token
+from .token import Token,TokenType
 from .ast import (
+    AST,
     Program,
     FunctionCall,
     FunctionDecl,
@@ -25,6 +27,18 @@ class SemanticAnalyzer(NodeVisitor):
     during the interpretation process. It traverses the AST,
     checking for semantic errors such as undeclared variables, and incorrect function usage.
     It also manages the scoping of variables and functions.
+
+    Every parameter reference is resolved to a (depth, slot) address: the number of
+    frames between the reference and the function (or lambda) declaring the parameter,
+    which is the difference of their scope levels, and the index of the parameter in
+    that function's frame.
+
+    Lambdas used as values become closures, which can outlive the frame they are
+    created in. The parameters of enclosing functions a closure refers to are its
+    free variables: they are captured when the closure is created, and stored
+    after the closure's own parameters in its frame. References to a free variable
+    inside the closure are resolved to its slot there (capturing it in every
+    closure in between), so frames are only linked across immediately applied lambdas.
     """
     def __init__(self, log_scope = False) -> None:
         self.current_scope: ScopedSymbolTable = ScopedSymbolTable(
@@ -33,6 +47,13 @@ class SemanticAnalyzer(NodeVisitor):
             enclosing_scope=None
         )
         self.should_log = log_scope
+        # The symbols of the closures being analyzed, by the scope level of their bodies
+        self._closures: dict[int, CallableSymbol] = {}
+        # The number of occurrences of every call node in each function (or closure) body
+        # being analyzed, innermost last (shared nodes occur more than once)
+        self._body_calls: list[Counter[FunctionCall]] = []
+        # The symbol of the function declaration being analyzed
+        self._function: CallableSymbol | None = None
 
         self.current_scope._init_builtins()
 
@@ -80,6 +101,7 @@ class SemanticAnalyzer(NodeVisitor):
         """
         pass
 
+    @yields_children
     def visit_BinOp(self,node: BinOp) -> None:
         """
         Handles a binary operation AST node.
@@ -89,15 +111,22 @@ class SemanticAnalyzer(NodeVisitor):
         Args:
             node (BinOp): The binary operation node to be visited.
         """            
-        self.visit(node.left)
-        self.visit(node.right)
+        yield node.left
+        yield node.right
 
+    @yields_children
     def visit_FunctionDecl(self, node: FunctionDecl) -> None:
         """
         Handle a function declaration AST node.
         Processing its name, parameters, body, and creating a scope for the function.
         Taversing its expression node
 
+        Functions have no side effects, so the result of a call only depends on its
+        arguments. The function is classified as memoizable unless its body calls
+        one of its parameters or creates a closure. Its parameters may still hold
+        function values it passes on, so the `Interpreter` checks the arguments of
+        every call (see `memo.first_order`).
+
         Args:
             node (FunctionDecl): The function declaration node to be visited.
         """
@@ -121,19 +150,31 @@ class SemanticAnalyzer(NodeVisitor):
         self.current_scope = func_scope
         self.log_scope("ENTERING FUNCTION DECLARATION BODY")
 
-        for param in node.formal_parameters:
-            param_symbol = ParamSymbol(param.name,BuiltinTypeSymbol)
+        enclosing_function = self._function
+        self._function = func_symbol
+        func_symbol.memoizable = True
+
+        for slot, param in enumerate(node.formal_parameters):
+            param_symbol = ParamSymbol(param.name,BuiltinTypeSymbol,slot,func_scope.scope_level)
 
             self.current_scope.insert(param_symbol)
             func_symbol.formal_params.append(param_symbol)
 
-        self.visit(node.expr_node)
+        self._body_calls.append(Counter())
+
+        try:
+            yield node.expr_node
+        finally:
+            self._function = enclosing_function
+            calls = self._body_calls.pop()
 
         self.current_scope = self.current_scope.enclosing_scope
         self.log_scope("EXITING FUNCTION DECLARATION BODY")
+        self.mark_tail_calls(node.expr_node, calls)
         func_symbol.expr_ast = node.expr_node
         node.symbol = func_symbol
 
+    @yields_children
     def visit_FunctionCall(self, node: FunctionCall) -> None:
         """
         Visits a function call AST node.
@@ -142,6 +183,9 @@ class SemanticAnalyzer(NodeVisitor):
         Args:
             node (FunctionCall): The function call node to be visited.
         """
+        if self._body_calls:
+            self._body_calls[-1][node] += 1
+
         function_symbol: CallableSymbol | ParamSymbol | None = self.current_scope.lookup(node.func_name)
 
         if function_symbol is None:
@@ -158,31 +202,56 @@ class SemanticAnalyzer(NodeVisitor):
                 )
 
             node.symbol = function_symbol
+        elif isinstance(function_symbol,ParamSymbol):
+            node.depth, node.slot = self.resolve(function_symbol)
+
+            if self._function is not None:
+                self._function.memoizable = False
 
         for index,param in enumerate(node.actual_params):
-            self.visit(param)
+            yield param
 
             if isinstance(param, Lambda):
                 param.symbol = self.current_scope.lookup(param.lambda_name)
                 param.lambda_name = function_symbol.formal_params[index].name
 
+    @yields_children
     def visit_Lambda(self, node: Lambda) -> None:
         """
-        Handles a lambda expression AST node.
-        Processes its parameter and traverses its expression.
+        Handles a lambda expression AST node, which evaluates to a closure.
+        Processes its parameter and traverses its expression, collecting its free variables.
 
         Args:
             node (Lambda): The lambda expression node to be visited.
         """
+        if self._function is not None:
+            self._function.memoizable = False
+
+        yield from self.analyze_lambda(node, closure=True)
+
+    def analyze_lambda(self, node: Lambda, closure: bool):
+        """
+        Processes the parameters of a lambda and traverses its expression.
+        This is a part of a generator visit: the lambda's body is yielded to be visited.
+
+        Args:
+            node (Lambda): The lambda expression node.
+            closure (bool): Whether the lambda is a value (rather than applied immediately),
+                so its free variables are captured.
+        """
         lambda_name = node.lambda_name
 
-        param_symbols = [ParamSymbol(param.name, BuiltinTypeSymbol) for param in node.formal_params]
+        scope_level = self.current_scope.scope_level +1
+        param_symbols = [
+            ParamSymbol(param.name, BuiltinTypeSymbol, slot, scope_level)
+            for slot, param in enumerate(node.formal_params)
+        ]
         lambda_symbol = CallableSymbol(name=lambda_name, formal_params=node.formal_params)
 
         self.current_scope.insert(lambda_symbol)
         lambda_scope = ScopedSymbolTable(
             scope_name=lambda_name,
-            scope_level= self.current_scope.scope_level +1,
+            scope_level= scope_level,
             enclosing_scope= self.current_scope
         )
 
@@ -192,44 +261,97 @@ class SemanticAnalyzer(NodeVisitor):
         for symbol in param_symbols:
             self.current_scope.insert(symbol)
 
-        self.visit(node.expr_node)
+        # Only closures are called through a frame of their own, which a tail call can replace
+        if closure:
+            self._closures[scope_level] = lambda_symbol
+            self._body_calls.append(Counter())
+
+        try:
+            yield node.expr_node
+        finally:
+            if closure:
+                self._closures.pop(scope_level, None)
+                calls = self._body_calls.pop()
 
         self.current_scope = self.current_scope.enclosing_scope
         self.log_scope("EXITING LAMBDA DECLARATION BODY")
 
+        if closure:
+            self.mark_tail_calls(node.expr_node, calls)
+
         lambda_symbol.expr_ast = node.expr_node
         node.symbol = lambda_symbol
 
+    def mark_tail_calls(self, body: AST, calls: Counter[FunctionCall]) -> None:
+        """
+        Marks the call in tail position of a function (or lambda) body, if any.
+        The body is in tail position, and so is the right operand of a `&&` or `||`
+        in tail position, e.g. `f(n)` in `(n == 0) || f(n)`.
+
+        The parser may share a call between its occurrences in a body (see
+        `NodeInterner`, which never shares calls across bodies), so a call
+        occurring more than once isn't marked.
+
+        Args:
+            body (AST): The (analyzed) body expression.
+            calls (Counter[FunctionCall]): The number of occurrences of every call
+                node in the body, counted while it was analyzed.
+        """
+        node = body
+
+        while (
+            isinstance(node, BinOp)
+            and isinstance(node.right, (BinOp, FunctionCall))
+            and node.op.type in (TokenType.AND, TokenType.OR)
+        ):
+            node = node.right
+
+        if isinstance(node, FunctionCall) and calls[node] == 1:
+            node.tail = True
+
+    @yields_children
     def visit_NestedLambda(self, node: NestedLambda):
-        self.visit(node.lambda_node)
+        """
+        Handles an immediately applied lambda AST node.
+        Traverses the lambda, and its actual parameters in the enclosing scope.
+        The lambda's frame is linked to the enclosing frame, so nothing is captured.
+
+        Args:
+            node (NestedLambda): The nested lambda node to be visited.
+        """
+        yield from self.analyze_lambda(node.lambda_node, closure=False)
 
-        map(lambda x: self.visit(x),node.actual_params)
+        for param in node.actual_params:
+            yield param
 
+    @yields_children
     def visit_NotOp(self, node: NotOp) -> None:
         """
         Handles a logical NOT operation AST node.
-        No action is performed here to allow a truthy-falsy behavior
+        Only its operand is traversed (to resolve parameters), its type isn't
+        checked to allow a truthy-falsy behavior
 
         Args:
             node (NotOp): The logical NOT operation node to be visited.
         """
-        pass
+        yield node.expr
 
+    @yields_children
     def visit_UnaryOp(self, node: UnaryOp) -> None:
         """
         Visits a unary operation AST node.
-        No action is performed here.
+        Traversing its operand.
 
         Args:
             node (UnaryOp): The unary operation node to be visited.
         """
-        pass
+        yield node.expr
 
     def visit_Param(self, node: Param) -> None:
         """
         Handles a actual parameter AST node.
         
-        Verifies the parameter was already declared
+        Verifies the parameter was already declared, and resolves its address
 
         Args:
             node (Param): The parameter node to be visited.
@@ -242,6 +364,42 @@ class SemanticAnalyzer(NodeVisitor):
                 token=node.token
             )
 
+        if isinstance(param_symbol, ParamSymbol):
+            node.depth, node.slot = self.resolve(param_symbol)
+
+    def resolve(self, param_symbol: ParamSymbol) -> tuple[int, int]:
+        """
+        Resolves a reference (in the current scope) to a parameter into a (depth, slot) address.
+        If the reference is inside closures nested in the parameter's function, the
+        parameter is captured by each of them (outermost first).
+
+        Args:
+            param_symbol (ParamSymbol): The referenced parameter.
+
+        Returns:
+            tuple[int, int]: The number of frames up, and the slot in that frame.
+        """
+        scope_level = self.current_scope.scope_level
+        closure_levels = [
+            level for level in range(param_symbol.scope_level + 1, scope_level + 1)
+            if level in self._closures
+        ]
+
+        # The address of the parameter from the frame each closure is created in
+        level, slot = param_symbol.scope_level, param_symbol.slot
+
+        for closure_level in closure_levels:
+            closure_symbol = self._closures[closure_level]
+
+            if param_symbol not in closure_symbol.free_vars:
+                closure_symbol.free_vars.append(param_symbol)
+                closure_symbol.captures.append((closure_level - 1 - level, slot))
+
+            level = closure_level
+            slot = len(closure_symbol.formal_params) + closure_symbol.free_vars.index(param_symbol)
+
+        return scope_level - level, slot
+
     def visit_Integer(self, node: Integer) -> None:
         """
         Handles an integer literal AST node.
@@ -0,0 +1,287 @@
+import gc
+import os
+import marshal
+import hashlib
+from functools import cache
+from contextlib import contextmanager
+from enum import Enum
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from . import ast
+from . import symbol
+from .token import TOKEN_TYPES,Token,TokenType
+from .node_table import NodeView
+from .errors import SerializationError,ErrorCode
+
+__version__ = '1.0.0'
+
+MAGIC = b'LMBDC'
+# Bumped whenever the layout of serialized programs (or of the AST classes) changes
+FORMAT_VERSION = 6
+
+# Tags of the encoded non-primitive values
+_REF    = 'r'
+_LIST   = 'l'
+_TUPLE  = 't'
+_ENUM   = 'e'
+_CLASS  = 'c'
+_TOKEN  = 'k'
+
+_PRIMITIVES = frozenset((type(None), bool, int, str, float))
+
+def _registry() -> dict[str, type]:
+    """Returns the classes allowed in a serialized program, by name."""
+    classes = [Token, TokenType]
+
+    for module in (ast, symbol):
+        classes.extend(
+            value for value in vars(module).values()
+            if isinstance(value, type) and value.__module__ == module.__name__
+        )
+
+    return {cls.__name__: cls for cls in classes}
+
+CLASSES = _registry()
+
+@contextmanager
+def _gc_paused():
+    """Pauses the cyclic garbage collector, which would otherwise run over and over
+    while the (acyclic, for the most part) object graph of a program is created."""
+    enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+@cache
+def _slot_names(cls: type) -> tuple[str, ...]:
+    """Returns the names of all `__slots__` of `cls`, including inherited ones.
+
+    The slots of `NodeTable` views (their table and index) are left out, so a view
+    is serialized as the regular node it stands for.
+    """
+    names = []
+
+    for base in reversed(cls.__mro__):
+        if issubclass(base, NodeView):
+            continue
+
+        slots = base.__dict__.get('__slots__', ())
+        names.extend((slots,) if isinstance(slots, str) else slots)
+
+    return tuple(name for name in names if name not in ('__dict__', '__weakref__'))
+
+def _object_state(obj: object) -> dict:
+    """Returns the attributes of `obj`, from both its `__dict__` and its `__slots__`."""
+    state = dict(getattr(obj, '__dict__', {}))
+
+    for name in _slot_names(type(obj)):
+        if hasattr(obj, name):
+            state[name] = getattr(obj, name)
+
+    return state
+
+def dumps(program: ast.Program) -> bytes:
+    """Serializes an (analyzed) program, including its symbols, to bytes.
+
+    The object graph is flattened into a table of objects, where every reference
+    between objects is an index into the table. This keeps shared objects (e.g. the
+    `CallableSymbol` of a recursive function) shared, and never recurses, regardless
+    of how deep the AST is. Tokens are encoded inline, with their resolved position.
+    The table is then encoded with `marshal`.
+
+    Args:
+        program (Program): The program to serialize.
+
+    Returns:
+        bytes: The serialized program.
+    """
+    indices: dict[int | NodeView, int] = {}
+    objects: list[object] = []
+    schemas: dict[tuple, int] = {}
+    table: list[tuple] = []
+    # Encoded enum members, reused so `marshal` writes each one once
+    members: dict[Enum, tuple] = {}
+
+    def encode(value):
+        value_class = value.__class__
+
+        if value_class in _PRIMITIVES:
+            return value
+
+        if value_class is Token and value.code is not None:
+            return (_TOKEN, value.code, value.value, value.offset, value.position)
+
+        if isinstance(value, Enum):
+            member = members.get(value)
+            if member is None:
+                member = members[value] = (_ENUM, value_class.__name__, value.name)
+            return member
+
+        if isinstance(value, type):
+            return (_CLASS, value.__name__)
+
+        if value_class is list:
+            return (_LIST, [encode(item) for item in value])
+
+        if value_class is tuple:
+            return (_TUPLE, [encode(item) for item in value])
+
+        if value_class.__name__ not in CLASSES:
+            raise SerializationError(
+                error_code=ErrorCode.INVALID_COMPILED_PROGRAM,
+                message=f'Cannot serialize {value_class.__name__} objects'
+            )
+
+        # A `NodeTable` view is created on every access, so views are identified by their node
+        key = value if isinstance(value, NodeView) else id(value)
+        index = indices.get(key)
+
+        if index is None:
+            index = indices[key] = len(objects)
+            objects.append(value)
+
+        return (_REF, index)
+
+    with _gc_paused():
+        encode(program)
+
+        # `objects` grows while it is being encoded
+        position = 0
+        while position < len(objects):
+            obj = objects[position]
+            state = _object_state(obj)
+
+            # The class name and attribute names are stored once per schema, not once per object
+            schema = (type(obj).__name__, *state)
+            schema_index = schemas.get(schema)
+
+            if schema_index is None:
+                schema_index = schemas[schema] = len(schemas)
+
+            table.append((schema_index, *[encode(value) for value in state.values()]))
+            position += 1
+
+    return MAGIC + marshal.dumps((FORMAT_VERSION, __version__, list(schemas), table))
+
+def loads(data: bytes) -> ast.Program:
+    """Deserializes a program serialized by `dumps`.
+
+    Raises:
+        SerializationError: If the data is not a compiled program of the current version.
+
+    Returns:
+        Program: The analyzed program, ready to be interpreted.
+    """
+    try:
+        if not data.startswith(MAGIC):
+            raise ValueError('bad magic number')
+
+        format_version, version, schemas, table = marshal.loads(data[len(MAGIC):])
+    except (ValueError, EOFError, TypeError) as e:
+        raise SerializationError(
+            error_code=ErrorCode.INVALID_COMPILED_PROGRAM,
+            message=f'{ErrorCode.INVALID_COMPILED_PROGRAM.value}: {e}'
+        )
+
+    if (format_version, version) != (FORMAT_VERSION, __version__):
+        raise SerializationError(
+            error_code=ErrorCode.INVALID_COMPILED_PROGRAM,
+            message=f'{ErrorCode.INVALID_COMPILED_PROGRAM.value}: compiled by version {version}, expected {__version__}'
+        )
+
+    try:
+        with _gc_paused():
+            return _build(schemas, table)
+    except (KeyError, IndexError, TypeError, ValueError, AttributeError) as e:
+        raise SerializationError(
+            error_code=ErrorCode.INVALID_COMPILED_PROGRAM,
+            message=f'{ErrorCode.INVALID_COMPILED_PROGRAM.value}: corrupted object table ({e!r})'
+        )
+
+def _build(schemas: list[tuple], table: list[tuple]) -> ast.Program:
+    """Recreates the objects of a table encoded by `dumps`, and returns the root object."""
+    classes = [CLASSES[class_name] for class_name, *_ in schemas]
+    names = [schema[1:] for schema in schemas]
+    objects = [classes[entry[0]].__new__(classes[entry[0]]) for entry in table]
+    tuple_class = tuple
+
+    def decode(value: tuple):
+        tag = value[0]
+
+        if tag == _REF:
+            return objects[value[1]]
+        if tag == _TOKEN:
+            _, code, token_value, offset, position = value
+            return Token(TOKEN_TYPES[code], token_value, *(position or (None, None)), offset)
+        if tag == _LIST:
+            return [decode(item) if item.__class__ is tuple_class else item for item in value[1]]
+        if tag == _TUPLE:
+            return tuple(decode(item) if item.__class__ is tuple_class else item for item in value[1])
+        if tag == _ENUM:
+            return CLASSES[value[1]][value[2]]
+
+        return CLASSES[value[1]]
+
+    for obj, entry in zip(objects, table):
+        for name, value in zip(names[entry[0]], entry[1:]):
+            setattr(obj, name, decode(value) if value.__class__ is tuple_class else value)
+
+    return objects[0]
+
+def source_hash(path: Path, chunk_size: int = 1 << 16) -> str:
+    """Hashes the content of a source file (read in chunks) with the interpreter version."""
+    digest = hashlib.sha256(f'{__version__}:{FORMAT_VERSION}:'.encode())
+
+    with open(path, 'rb') as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+def default_cache_directory() -> Path:
+    """The directory of the on-disk caches: `$XDG_CACHE_HOME/lambda`, or `~/.cache/lambda`."""
+    return Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache')) / 'lambda'
+
+class ProgramCache:
+    """On-disk cache of analyzed programs.
+
+    Programs are stored as compiled (`.lambdac`) files, keyed by the hash of
+    their source and the interpreter version, so any change to either one
+    results in a cache miss.
+
+    Attributes:
+        directory (Path): The directory holding the cached programs.
+
+    Usage:
+        cache = ProgramCache()
+        key = source_hash(path)
+        tree = cache.get(key)
+        if tree is None:
+            tree = ... # parse & analyze
+            cache.put(key, tree)
+    """
+    def __init__(self, directory: Path | str | None = None) -> None:
+        self.directory = Path(directory) if directory is not None else default_cache_directory()
+
+    def path(self, key: str) -> Path:
+        return self.directory / f'{key}.lambdac'
+
+    def get(self, key: str) -> ast.Program | None:
+        """Returns the cached program for `key`, or None if it isn't cached (or is invalid)."""
+        try:
+            return loads(self.path(key).read_bytes())
+        except (OSError, SerializationError):
+            return None
+
+    def put(self, key: str, program: ast.Program) -> None:
+        """Stores `program` under `key`. Written atomically, so concurrent runs never read partial files."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        with NamedTemporaryFile(dir=self.directory, suffix='.tmp', delete=False) as file:
+            file.write(dumps(program))
+
+        os.replace(file.name, self.path(key))
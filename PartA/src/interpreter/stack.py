@@ -1,6 +1,9 @@
 from enum import Enum
 from typing import Self
 
+# The number of released activation records kept for reuse, per number of slots
+DEFAULT_POOL_SIZE = 1 << 12
+
 class ARType(Enum):
     """
     Enumeration for Activation Record types.
@@ -17,37 +20,59 @@ class ActivationRecord:
 
     An activation record stores the context for a function or block, including
     its name, type, nesting level, and members (variables and their values).
+    The values of parameters are held in `slots`, a list indexed by the slot
+    numbers the semantic analyzer assigned to them.
+
+    A record holds only its own bindings, and is linked to the record of its
+    defining environment (its `parent`): the program's record for functions, and
+    the record a lambda was created in for lambdas. Names missing from `members`
+    are looked up along the chain of parents, so calls never copy the caller's bindings.
 
     Attributes:
         name (str): The name of the activation record.
         type (ARType): The type of the activation record (PROGRAM, FUNCTION, LAMBDA).
         nesting_level (int): The nesting level of the activation record.
         members (dict): A dictionary holding the variables and their values.
+        slots (list): The values of the parameters.
+        params (list): The formal parameters (anything with a `name`) the slots belong to.
+        parent (ActivationRecord): The record of the defining environment.
 
     Usage:
         ar = ActivationRecord(name='main', type=ARType.PROGRAM, nesting_level=1)
         ar['var1'] = 10
     """
+    __slots__ = ('name', 'type', 'nesting_level', 'members', 'slots', 'params', 'parent')
+
     def __init__(
             self,
             name: str,
             type: ARType,
             nesting_level: int,
-            old_ar: Self = None
+            slots: list = None,
+            params: list = (),
+            parent: Self = None
         ) -> None:
         self.name = name
         self.type = type
         self.nesting_level = nesting_level
         self.members = {}
-
-        if old_ar is not None:
-            self.members.update(old_ar.members)
+        self.slots = [] if slots is None else slots
+        self.params = params
+        self.parent = parent
     
     def __setitem__(self,key: str,value):
         self.members[key] = value
 
     def __getitem__(self, key: str):
-        return self.members.get(key)
+        ar = self
+
+        while ar is not None:
+            if key in ar.members:
+                return ar.members[key]
+
+            ar = ar.parent
+
+        return None
     
     def update(self, kvp: dict):
         self.members.update(kvp)
@@ -61,6 +86,11 @@ class ActivationRecord:
         ):
             s.append(f'{header_name:<15}: {header_value}')
         
+        if len(self.slots) > 0:
+            longest_key = max(len(param.name) for param in self.params)
+            s.append('Slots:')
+            s.extend([f'{param.name:>{longest_key}}: {str(v)}' for param,v in zip(self.params, self.slots)])
+
         if len(self.members) > 0:
             longest_key = max(len(x) for x in self.members.keys())
             s.append('Members:')
@@ -71,14 +101,164 @@ class ActivationRecord:
     def __repr__(self):
         return f"{self.__class__.__name__}(name={self.name}, level={self.nesting_level}, type={self.type.value})"
     
+class Closure:
+    """A lambda value: the lambda's symbol, and the values of its free variables.
+
+    Only the free variables (see `CallableSymbol.free_vars`) are captured, so a
+    closure never keeps the record it was created in alive. When the closure is
+    called, the captured values follow the arguments in the slots of its record.
+
+    Attributes:
+        symbol (CallableSymbol): The symbol of the lambda.
+        captured (list): The values of the lambda's free variables.
+    """
+    __slots__ = ('symbol', 'captured')
+
+    def __init__(self, symbol, captured: list) -> None:
+        self.symbol = symbol
+        self.captured = captured
+
+    def __str__(self) -> str:
+        return str(self.symbol)
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+class TailCall:
+    """A call in tail position (see `FunctionCall.tail`), ready to run in place of its caller.
+
+    The `Interpreter` returns it, instead of running the call, up to the nearest
+    enclosing call, which replaces its own activation record with the callee's and
+    runs the callee's body. Loops written as tail recursion thus run in a constant
+    call stack depth.
+
+    Attributes:
+        symbol (CallableSymbol): The called function (or lambda).
+        ar (ActivationRecord): The callee's activation record, with its arguments bound.
+    """
+    __slots__ = ('symbol', 'ar')
+
+    def __init__(self, symbol, ar: ActivationRecord) -> None:
+        self.symbol = symbol
+        self.ar = ar
+
+    def __str__(self) -> str:
+        return f'{self.__class__.__name__}({self.symbol})'
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+class FramePool:
+    """Recycles the activation records of calls, by their number of slots (arity).
+
+    A record released after its call returns is cleared and kept, and the next
+    call with the same number of slots reuses it (a hit) instead of allocating a
+    new record, its members dict and its slots list (a miss). Records are released
+    only once nothing refers to them: closures capture values rather than records,
+    and a lambda record's parent is always released after the lambda's record.
+
+    Attributes:
+        max_frames (int): The number of released records kept per arity (0 disables reuse).
+        hits (dict[int, int]): The number of reused records, by arity.
+        misses (dict[int, int]): The number of allocated records, by arity.
+
+    Usage:
+        pool = FramePool()
+        ar = pool.acquire('foo', ARType.FUNCTION, 2, size=1)
+        ...
+        pool.release(ar)
+    """
+    def __init__(self, max_frames: int = DEFAULT_POOL_SIZE) -> None:
+        self.max_frames = max_frames
+        self.hits: dict[int, int] = {}
+        self.misses: dict[int, int] = {}
+        # The released records, and a blank (all None) tuple to clear their slots with, by arity
+        self._frames: dict[int, list[ActivationRecord]] = {}
+        self._blanks: dict[int, tuple] = {}
+
+    def acquire(
+            self,
+            name: str,
+            type: ARType,
+            nesting_level: int,
+            size: int,
+            params: list = (),
+            parent: ActivationRecord = None
+        ) -> ActivationRecord:
+        """Returns a cleared activation record with `size` (unbound) slots.
+
+        Args:
+            size (int): The number of slots.
+            name, type, nesting_level, params, parent: See `ActivationRecord`.
+
+        Returns:
+            ActivationRecord: A released record, or a new one if there is none.
+        """
+        frames = self._frames.get(size)
+
+        if frames:
+            self.hits[size] = self.hits.get(size, 0) + 1
+            ar = frames.pop()
+            ar.name = name
+            ar.type = type
+            ar.nesting_level = nesting_level
+            ar.params = params
+            ar.parent = parent
+            return ar
+
+        self.misses[size] = self.misses.get(size, 0) + 1
+
+        return ActivationRecord(name, type, nesting_level, [None] * size, params, parent)
+
+    def release(self, ar: ActivationRecord) -> None:
+        """Clears an activation record which is no longer used, and keeps it for reuse.
+
+        Args:
+            ar (ActivationRecord): The record, which must not be referred to anymore.
+        """
+        size = len(ar.slots)
+        frames = self._frames.get(size)
+
+        if frames is None:
+            frames = self._frames[size] = []
+            self._blanks[size] = (None,) * size
+
+        if len(frames) < self.max_frames:
+            ar.members.clear()
+            ar.slots[:] = self._blanks[size]
+            ar.params = ()
+            ar.parent = None
+            frames.append(ar)
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of acquired records which were reused."""
+        hits = sum(self.hits.values())
+        total = hits + sum(self.misses.values())
+
+        return hits / total if total else 0.0
+
+    def __str__(self) -> str:
+        arities = ', '.join(
+            f'{size}: {self.hits.get(size, 0)}/{self.hits.get(size, 0) + misses}'
+            for size, misses in sorted(self.misses.items())
+        )
+
+        return f'{self.__class__.__name__}(hit_rate={self.hit_rate:.1%}, hits_by_arity={{{arities}}})'
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
 class CallStack:
     """Represents a call stack for managing activation records.
 
     The call stack stores a stack of activation records, allowing functions
     and blocks to manage their scopes and contexts during execution.
+    The records of calls are taken from (and released to) its `pool`.
 
     Attributes:
         _records (list[ActivationRecord]): A list storing the activation records in the stack.
+        pool (FramePool): Recycles the activation records of calls.
 
     Usage:
         ar = ActivationRecord(name='main', type=ARType.PROGRAM, nesting_level=1)
@@ -87,8 +267,9 @@ class CallStack:
         current_ar = stack.peek()
         stack.pop()
     """
-    def __init__(self) -> None:
+    def __init__(self, pool: FramePool | None = None) -> None:
         self._records: list[ActivationRecord] = []
+        self.pool = FramePool() if pool is None else pool
 
     def push(self, item: ActivationRecord) -> None:
         """Pushes an activation record onto the call stack.
@@ -118,6 +299,17 @@ class CallStack:
             ActivationRecord: The activation record at the top of the stack.
         """
         return self._records[-1]
+
+    def bottom(self) -> ActivationRecord:
+        """Returns the bottom activation record of the call stack (the program's record).
+
+        Returns:
+            ActivationRecord: The activation record at the bottom of the stack.
+        """
+        return self._records[0]
+
+    def __len__(self) -> int:
+        return len(self._records)
     
     def __str__(self):
         stack_width=25
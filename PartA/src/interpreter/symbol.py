@@ -51,12 +51,16 @@ class ParamSymbol(Symbol):
     Attributes:
         name (str): The name of the parameter.
         type (optional): The type of the parameter, if applicable.
+        slot (int, optional): The index of the parameter's value in the frames of its function.
+        scope_level (int, optional): The level of the scope of the function declaring the parameter.
 
     Usage:
-        param = ParamSymbol(name='x', type='INTEGER')
+        param = ParamSymbol(name='x', type='INTEGER', slot=0, scope_level=2)
     """
-    def __init__(self, name: str, type=BuiltinTypeSymbol):
+    def __init__(self, name: str, type=BuiltinTypeSymbol, slot: int = None, scope_level: int = None):
         super().__init__(name, type)
+        self.slot = slot
+        self.scope_level = scope_level
 
 class CallableSymbol(Symbol):
     """Represents a function / Lambda symbol in the symbol table.
@@ -68,6 +72,12 @@ class CallableSymbol(Symbol):
         name (str): The name of the function.
         formal_params (list[ParamSymbol]): The list of parameters for the function.
         expr_ast (AST): The AST node representing the function's body.
+        free_vars (list[ParamSymbol]): For lambdas used as values, the parameters of enclosing
+            functions the lambda refers to, which are stored after its own parameters in its frame.
+        captures (list[tuple[int, int]]): The (depth, slot) address of every free variable,
+            from the frame the lambda is created in.
+        memoizable (bool): For declared functions, whether calls can be memoized by their
+            argument values (see `SemanticAnalyzer.visit_FunctionDecl`).
 
     Usage:
         param1 = Param(token=param_token1)
@@ -79,6 +89,9 @@ class CallableSymbol(Symbol):
 
         self.formal_params = [] if formal_params is None else formal_params
         self.expr_ast = None
+        self.free_vars: list[ParamSymbol] = []
+        self.captures: list[tuple[int, int]] = []
+        self.memoizable = False
 
     def __str__(self) -> str:
         params_str = ", ".join(param.name for param in self.formal_params)
@@ -153,6 +166,18 @@ class ScopedSymbolTable(object):
         """
         self._symbols[symbol.name] = symbol
 
+    def remove(self, name: str) -> Symbol | None:
+        """
+        Removes a symbol from the symbol table (but not from enclosing scopes).
+
+        Args:
+            name (str): The name of the symbol to remove.
+
+        Returns:
+            Symbol | None: The removed symbol, or None if it wasn't in the table.
+        """
+        return self._symbols.pop(name, None)
+
     def lookup(self, name: str, current_scope_only: bool = False) -> Symbol | None:
         """
         Looks up a symbol by name in the symbol table.
@@ -1,4 +1,7 @@
-from enum import Enum
+import re
+from enum import Enum, IntEnum
+from array import array
+from bisect import bisect_right
 
 class TokenType(Enum):
     """Enumeration of all token types used by the lexer and parser.
@@ -41,6 +44,53 @@ class TokenType(Enum):
     BOOLEAN_CONST   = 'BOOLEAN_CONST'
     EOF             = 'EOF'
 
+class TokenCode(IntEnum):
+    """Integer codes of all token types.
+
+    Every `TokenType` has the code of the same name (its definition index, see
+    `TOKEN_CODES`), which tokens carry as their `code`. Comparing these codes is
+    cheaper than comparing Enum members, and is used on hot paths such as the
+    parser's token matching.
+
+    Usage:
+        token.code == TokenCode.LPAREN
+    """
+    NOT             = 0
+    AND             = 1
+    OR              = 2
+    EQUAL           = 3
+    NOT_EQUAL       = 4
+    GREATER_THAN_EQ = 5
+    LESS_THAN_EQ    = 6
+    GREATER_THAN    = 7
+    LESS_THAN       = 8
+    PLUS            = 9
+    MINUS           = 10
+    MUL             = 11
+    DIV             = 12
+    MODULO          = 13
+    LPAREN          = 14
+    RPAREN          = 15
+    LCURL           = 16
+    RCURL           = 17
+    DOT             = 18
+    COMMENT         = 19
+    QUOTE           = 20
+    COLON           = 21
+    COMMA           = 22
+    LAMBDA          = 23
+    FUNCTION_DECL   = 24
+    ID              = 25
+    INTEGER_CONST   = 26
+    BOOLEAN_CONST   = 27
+    EOF             = 28
+
+# TokenType -> integer code
+TOKEN_CODES: dict[TokenType, int] = {token_type: TokenCode[token_type.name].value for token_type in TokenType}
+
+# Integer code -> TokenType
+TOKEN_TYPES = tuple(TokenType)
+
 class FunctionConfigurationKey(Enum):
     """Enumeration for function configuration keys.
 
@@ -88,35 +138,130 @@ ADDITION_OPERATORS  = _build_keywords_dictionary(TokenType,TokenType.PLUS,TokenT
 MULT_OPERATORS      = _build_keywords_dictionary(TokenType,TokenType.MUL,TokenType.MODULO)
 BINARY_OPERATIONS   = [*LOGICAL_OPERATORS,*COMPARE_OPERATORS,*ADDITION_OPERATORS,*MULT_OPERATORS]
 
+# Every operator / punctuation lexeme, excluding the comment marker which is skipped by the lexer
+OPERATORS = {
+    value: token_type
+    for value, token_type in _build_keywords_dictionary(TokenType,TokenType.NOT,TokenType.COMMA).items()
+    if token_type is not TokenType.COMMENT
+}
+WORD_OPERATORS = {
+    'AND': TokenType.AND,
+    'OR': TokenType.OR,
+    'NOT': TokenType.NOT
+}
+
+LOGICAL_OPERATOR_CODES  = frozenset(TOKEN_CODES[token_type] for token_type in LOGICAL_OPERATORS.values())
+COMPARE_OPERATOR_CODES  = frozenset(TOKEN_CODES[token_type] for token_type in COMPARE_OPERATORS.values())
+ADDITION_OPERATOR_CODES = frozenset(TOKEN_CODES[token_type] for token_type in ADDITION_OPERATORS.values())
+MULT_OPERATOR_CODES     = frozenset(TOKEN_CODES[token_type] for token_type in MULT_OPERATORS.values())
+
+NEWLINE_PATTERN = re.compile('\n')
+
 FUNCTION_CONFIGURATION_KEYS = _build_keywords_dictionary(FunctionConfigurationKey,FunctionConfigurationKey.NAME,FunctionConfigurationKey.ARGUMENTS)
 
+class LineIndex:
+    """Maps character offsets in a source text to line and column numbers.
+
+    The offsets where each line starts are collected once (lazily, on the 
+    first lookup), and every lookup is a binary search over them. This keeps 
+    line / column bookkeeping out of the lexer's scanning loop.
+
+    Text added with `extend` (e.g. the chunks a `StreamLexer` reads) is indexed 
+    right away instead, so only the line start offsets of the chunks are kept, 
+    not the chunks themselves.
+
+    When indexing a slice of a larger source, `offset` and `lineno` give the 
+    position of the slice's first character (which starts a line) in the source.
+
+    Usage:
+        lines = LineIndex("x +\ny")
+        lines.position(4)   # (2, 1)
+    """
+    def __init__(self, text: str = '', offset: int = 0, lineno: int = 1) -> None:
+        self._line_starts = array('q', [offset])
+        self._first_line = lineno
+        self._pending = (text, offset) if text else None
+
+    def extend(self, text: str, offset: int) -> None:
+        """Indexes `text`, which starts at `offset` in the source (after the text indexed so far)."""
+        if self._pending is not None:
+            self._build()
+
+        self._index(text, offset)
+
+    def _index(self, text: str, offset: int) -> None:
+        self._line_starts.extend(match.end() + offset for match in NEWLINE_PATTERN.finditer(text))
+
+    def _build(self) -> None:
+        self._index(*self._pending)
+        self._pending = None
+
+    def position(self, offset: int) -> tuple[int, int]:
+        """Returns the (line, column) of `offset`, both starting from 1."""
+        if self._pending is not None:
+            self._build()
+
+        line = bisect_right(self._line_starts, offset)
+
+        return line + self._first_line - 1, offset - self._line_starts[line - 1] + 1
+
 class Token:
     """Represents a token produced by the lexer.
 
     A token is a tuple of a token type, a value, and optionally the line 
     and column where the token appears in the source code.
+    Tokens are stored in `__slots__` to keep large token streams compact.
+
+    The position can either be given explicitly, or as a start `offset` into 
+    the source together with the source's `LineIndex`, in which case the line 
+    and column are only computed (and cached) when they are first read.
 
     Attributes:
         type (TokenType): The type of the token (e.g., ID, INTEGER_CONST).
+        code (int): The integer code of the token type (see `TokenCode`).
         value (Any): The value of the token (e.g., 'x', 42).
         lineno (int, optional): The line number where the token appears.
         column (int, optional): The column number where the token appears.
+        offset (int, optional): The character offset where the token starts in the source.
 
     Usage:
         token = Token(TokenType.ID, 'x', lineno=1, column=5)
         print(token)
     """
+    __slots__ = ('type', 'code', 'value', 'offset', '_lines', '_position')
+
     def __init__(
         self,
         type: TokenType,
         value,
         lineno: int = None,
-        column: int = None
+        column: int = None,
+        offset: int = None,
+        lines: LineIndex = None
     ) -> None:
         self.type = type
+        self.code: int = TOKEN_CODES.get(type)
         self.value = value
-        self.lineno = lineno
-        self.column = column
+        self.offset = offset
+        self._lines = lines
+        self._position = None if lineno is None and column is None else (lineno, column)
+
+    @property
+    def position(self) -> tuple[int, int] | None:
+        if self._position is None and self._lines is not None:
+            self._position = self._lines.position(self.offset)
+
+        return self._position
+
+    @property
+    def lineno(self) -> int | None:
+        position = self.position
+        return None if position is None else position[0]
+
+    @property
+    def column(self) -> int | None:
+        position = self.position
+        return None if position is None else position[1]
 
     def __str__(self):
         position = ''
@@ -126,3 +271,108 @@ class Token:
         return f'Token({self.type.name}, {repr(self.value)}{position})'
     
     __repr__ = __str__
+
+# One position-free token per operator / punctuation, shared by all of its occurrences
+SHARED_TOKENS = {value: Token(token_type, value) for value, token_type in OPERATORS.items()}
+
+class TokenArray:
+    """Struct-of-arrays storage for a whole token stream.
+
+    Instead of holding one `Token` object per token, the stream is kept in 
+    parallel `array` buffers of type codes, value indices, line numbers and 
+    column numbers. Each distinct token value is stored once in a value table.
+    Tokens are materialized on access, and the array can feed a `Parser` 
+    directly through `get_next_token`.
+
+    Attributes:
+        codes (array): The type code of every token.
+        value_indices (array): The index of every token's value in the value table.
+        linenos (array): The line number of every token (0 when unknown).
+        columns (array): The column number of every token (0 when unknown).
+        pos (int): The index of the next token returned by `get_next_token`.
+
+    Usage:
+        tokens = TokenArray.from_lexer(Lexer("1 + 1"))
+        tree = Parser(tokens).parse()
+    """
+    def __init__(self) -> None:
+        self.codes = array('B')
+        self.value_indices = array('I')
+        self.linenos = array('I')
+        self.columns = array('I')
+        self.pos = 0
+
+        self._values: list = []
+        self._value_index: dict[tuple, int] = {}
+
+    @classmethod
+    def from_lexer(cls, lexer) -> 'TokenArray':
+        """Scans all tokens of `lexer`, up to and including EOF, into a new TokenArray."""
+        tokens = cls()
+
+        while True:
+            token = lexer.get_next_token()
+            tokens.append(token)
+
+            if token.code == TokenCode.EOF:
+                return tokens
+
+    def append(self, token: Token) -> None:
+        # Keyed by the value's class as well, since True == 1
+        key = (token.value.__class__, token.value)
+        index = self._value_index.get(key)
+
+        if index is None:
+            index = self._value_index[key] = len(self._values)
+            self._values.append(token.value)
+
+        self.codes.append(token.code)
+        self.value_indices.append(index)
+        self.linenos.append(token.lineno or 0)
+        self.columns.append(token.column or 0)
+
+    def to_buffers(self) -> tuple:
+        """Returns the arrays (as bytes) and the value table, which `marshal` can encode."""
+        return (
+            self.codes.tobytes(), self.value_indices.tobytes(),
+            self.linenos.tobytes(), self.columns.tobytes(), self._values
+        )
+
+    @classmethod
+    def from_buffers(cls, buffers: tuple) -> 'TokenArray':
+        """Adopts the state returned by `to_buffers`, copying each array as a whole."""
+        tokens = cls()
+        codes, value_indices, linenos, columns, tokens._values = buffers
+
+        for buffer, data in zip((tokens.codes, tokens.value_indices, tokens.linenos, tokens.columns), (codes, value_indices, linenos, columns)):
+            buffer.frombytes(data)
+
+        tokens._value_index = {(value.__class__, value): index for index, value in enumerate(tokens._values)}
+
+        return tokens
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index: int) -> Token:
+        return Token(
+            TOKEN_TYPES[self.codes[index]],
+            self._values[self.value_indices[index]],
+            self.linenos[index] or None,
+            self.columns[index] or None
+        )
+
+    def get_next_token(self) -> Token:
+        """Returns the next token of the stream, repeating the last (EOF) token once exhausted."""
+        token = self[min(self.pos, len(self) - 1)]
+        self.pos += 1
+
+        return token
+
+    @property
+    def nbytes(self) -> int:
+        """The size of the array buffers in bytes (excluding the value table)."""
+        return sum(
+            buffer.itemsize * len(buffer)
+            for buffer in (self.codes, self.value_indices, self.linenos, self.columns)
+        )
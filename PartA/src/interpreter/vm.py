@@ -0,0 +1,283 @@
+from typing import Iterable
+from .ast import AST
+from .bytecode import BytecodeCompiler,CodeObject,Opcode
+from .stack import Closure
+from .symbol import CallableSymbol
+from .errors import ErrorCode,InterpreterError
+from .interpreter import DEFAULT_MEMORY_BUDGET
+
+# The approximate size (in bytes) of a calling frame: its entry on the frame stack,
+# its slots, and the operands waiting on the value stack for its result
+FRAME_SIZE = 256
+
+# The opcodes as plain ints, which compare faster than enum members in the dispatch loop
+LOAD_SLOT = int(Opcode.LOAD_SLOT)
+LOAD_CONST = int(Opcode.LOAD_CONST)
+LOAD_DEREF = int(Opcode.LOAD_DEREF)
+LOAD_GLOBAL = int(Opcode.LOAD_GLOBAL)
+ADD = int(Opcode.ADD)
+SUB = int(Opcode.SUB)
+MUL = int(Opcode.MUL)
+DIV = int(Opcode.DIV)
+MOD = int(Opcode.MOD)
+EQ = int(Opcode.EQ)
+NE = int(Opcode.NE)
+GT = int(Opcode.GT)
+GE = int(Opcode.GE)
+LT = int(Opcode.LT)
+LE = int(Opcode.LE)
+NEG = int(Opcode.NEG)
+POS = int(Opcode.POS)
+NOT = int(Opcode.NOT)
+JUMP_IF_FALSE_OR_POP = int(Opcode.JUMP_IF_FALSE_OR_POP)
+JUMP_IF_TRUE_OR_POP = int(Opcode.JUMP_IF_TRUE_OR_POP)
+CALL = int(Opcode.CALL)
+CHECK_CALLABLE = int(Opcode.CHECK_CALLABLE)
+CALL_VALUE = int(Opcode.CALL_VALUE)
+APPLY = int(Opcode.APPLY)
+MAKE_CLOSURE = int(Opcode.MAKE_CLOSURE)
+DECLARE = int(Opcode.DECLARE)
+RETURN = int(Opcode.RETURN)
+
+class VirtualMachine:
+    """Execution engine compiling the AST into bytecode (see `BytecodeCompiler`), and running it in a dispatch loop.
+
+    The loop keeps operands on an explicit value stack, and the calling frames on
+    an explicit frame stack, so calls don't use Python's stack, and the depth of
+    recursion is only bounded by `memory_budget`, like the `Interpreter`'s. A frame is the list of a call's slots (arguments,
+    then captured free variables), followed by the frame it is linked to, as in
+    the `ClosureCompiler`. Function values are the symbols and `Closure`s the
+    `Interpreter` uses, and the results are the ones of `Interpreter.interpret`.
+
+    Attributes:
+        compiler (BytecodeCompiler): The compiler, holding the code objects of the compiled functions.
+        globals (dict[str, CallableSymbol]): The declared functions, by name.
+        statements (list[CodeObject]): The code objects of the executed statements.
+        memory_budget (int): The memory (in bytes) available for the recursion of a program.
+        max_depth (int): The maximum depth of the frame stack, estimated from `memory_budget`.
+
+    Usage:
+        engine = VirtualMachine()
+        for output in engine.interpret(tree):
+            print(output)
+    """
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET) -> None:
+        self.compiler = BytecodeCompiler()
+        self.globals: dict[str, CallableSymbol] = {}
+        self.statements: list[CodeObject] = []
+        self.memory_budget = memory_budget
+        self.max_depth = max(1, memory_budget // FRAME_SIZE)
+
+    def interpret(self, tree: AST):
+        """Compiles and executes a program, yielding the (non-None) result of every statement."""
+        if tree is not None:
+            yield from self.execute(tree.statements)
+
+    def execute(self, statements: Iterable[AST]):
+        """Compiles and executes top-level statements, one at a time.
+
+        Args:
+            statements (Iterable[AST]): The (analyzed) top-level statements of a program.
+
+        Yields:
+            The (non-None) result of every statement.
+        """
+        for statement in statements:
+            code = self.compiler.compile(statement)
+            self.statements.append(code)
+            output = self.run(code)
+
+            if output is not None:
+                yield output
+
+    def callee(self, value, token) -> tuple[CodeObject, list]:
+        """Returns the code object and captured values of a called function value, raising an `InterpreterError` at `token` for other values."""
+        if value.__class__ is Closure:
+            return self.compiler.function(value.symbol), value.captured
+        if isinstance(value, CallableSymbol):
+            return self.compiler.function(value), ()
+
+        error_code = ErrorCode.SYMBOL_NOT_FOUND if value is None else ErrorCode.UNEXPECTED_SYMBOL
+        raise InterpreterError(error_code=error_code, token=token)
+
+    def exceed_budget(self, code: CodeObject, pc: int):
+        """Raises an `InterpreterError` at the token of the call instruction before `pc`, whose frame would exceed `max_depth`."""
+        raise InterpreterError(error_code=ErrorCode.MEMORY_BUDGET_EXCEEDED, token=code.calls.get(pc - 2))
+
+    def run(self, code: CodeObject):
+        """Runs the code object of a top-level statement, returning its result."""
+        functions = self.globals
+        callee = self.callee
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        max_depth = self.max_depth
+        # The (code, pc, slots) of the calling frames
+        frames = []
+
+        instructions = code.code
+        constants = code.constants
+        slots = [None]
+        pc = 0
+
+        while True:
+            op = instructions[pc]
+            arg = instructions[pc + 1]
+            pc += 2
+
+            if op == LOAD_SLOT:
+                push(slots[arg])
+            elif op == LOAD_CONST:
+                push(constants[arg])
+            elif op == ADD:
+                right = pop()
+                stack[-1] = stack[-1] + right
+            elif op == SUB:
+                right = pop()
+                stack[-1] = stack[-1] - right
+            elif op == EQ:
+                right = pop()
+                stack[-1] = stack[-1] == right
+            elif op == CALL:
+                function = constants[arg]
+                arity = function.arity
+
+                if arity:
+                    callee_slots = stack[-arity:]
+                    del stack[-arity:]
+                else:
+                    callee_slots = []
+
+                if len(frames) >= max_depth:
+                    self.exceed_budget(code, pc)
+
+                callee_slots.append(None)
+                frames.append((code, pc, slots))
+                code = function
+                instructions = function.code
+                constants = function.constants
+                slots = callee_slots
+                pc = 0
+            elif op == RETURN:
+                if not frames:
+                    return pop()
+
+                code, pc, slots = frames.pop()
+                instructions = code.code
+                constants = code.constants
+            elif op == JUMP_IF_TRUE_OR_POP:
+                if stack[-1]:
+                    pc = arg
+                else:
+                    pop()
+            elif op == JUMP_IF_FALSE_OR_POP:
+                if stack[-1]:
+                    pop()
+                else:
+                    pc = arg
+            elif op == MUL:
+                right = pop()
+                stack[-1] = stack[-1] * right
+            elif op == DIV:
+                right = pop()
+
+                if right == 0:
+                    raise InterpreterError(error_code=ErrorCode.DIV_ZERO, token=constants[arg])
+
+                stack[-1] = stack[-1] // right
+            elif op == MOD:
+                right = pop()
+                stack[-1] = stack[-1] % right
+            elif op == NE:
+                right = pop()
+                stack[-1] = stack[-1] != right
+            elif op == LT:
+                right = pop()
+                stack[-1] = stack[-1] < right
+            elif op == LE:
+                right = pop()
+                stack[-1] = stack[-1] <= right
+            elif op == GT:
+                right = pop()
+                stack[-1] = stack[-1] > right
+            elif op == GE:
+                right = pop()
+                stack[-1] = stack[-1] >= right
+            elif op == NOT:
+                stack[-1] = not stack[-1]
+            elif op == NEG:
+                stack[-1] = -stack[-1]
+            elif op == POS:
+                stack[-1] = +stack[-1]
+            elif op == LOAD_DEREF:
+                frame = slots
+                depth, slot = constants[arg]
+
+                for _ in range(depth):
+                    frame = frame[-1]
+
+                push(frame[slot])
+            elif op == LOAD_GLOBAL:
+                push(functions.get(constants[arg]))
+            elif op == CHECK_CALLABLE:
+                callee(stack[-1], constants[arg])
+            elif op == CALL_VALUE:
+                function, captured = callee(stack[-arg - 1], None)
+                arity = function.arity
+                callee_slots = stack[len(stack) - arg:]
+                del stack[len(stack) - arg - 1:]
+
+                # Missing arguments are unbound, and extra arguments are dropped
+                if arg > arity:
+                    del callee_slots[arity:]
+                elif arg < arity:
+                    callee_slots += [None] * (arity - arg)
+
+                if len(frames) >= max_depth:
+                    self.exceed_budget(code, pc)
+
+                callee_slots += captured
+                callee_slots.append(None)
+                frames.append((code, pc, slots))
+                code = function
+                instructions = function.code
+                constants = function.constants
+                slots = callee_slots
+                pc = 0
+            elif op == APPLY:
+                function = constants[arg]
+                arity = function.arity
+
+                if arity:
+                    callee_slots = stack[-arity:]
+                    del stack[-arity:]
+                else:
+                    callee_slots = []
+
+                if len(frames) >= max_depth:
+                    self.exceed_budget(code, pc)
+
+                # Immediately applied lambdas are linked to the frame they are applied in
+                callee_slots.append(slots)
+                frames.append((code, pc, slots))
+                code = function
+                instructions = function.code
+                constants = function.constants
+                slots = callee_slots
+                pc = 0
+            elif op == MAKE_CLOSURE:
+                function = constants[arg]
+                count = len(function.symbol.free_vars)
+
+                if count:
+                    captured = stack[-count:]
+                    del stack[-count:]
+                else:
+                    captured = []
+
+                push(Closure(function.symbol, captured))
+            elif op == DECLARE:
+                symbol = constants[arg]
+                functions[symbol.name] = symbol
+            else:
+                raise ValueError(f'Unknown opcode {op} at {pc - 2} in {code.name}')
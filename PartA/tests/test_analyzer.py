@@ -333,4 +333,82 @@ def test_param_overriden_lookup():
 
     assert param_symbol.name == param_name
     assert isinstance(param_symbol.type,BuiltinTypeSymbol)
-    assert param_symbol.type.name == 'BOOLEAN'
\ No newline at end of file
+    assert param_symbol.type.name == 'BOOLEAN'
+def test_param_addresses():
+    from src.interpreter.lexer import Lexer
+    from src.interpreter.parser import Parser
+
+    text = """
+    Defun {'name': 'apply', 'arguments': (g)}
+    g(1)
+    Defun {'name': 'f', 'arguments': (a)}
+    apply((Lambd x. (Lambd y. x + y + a)(x)))
+    """
+    tree = Parser(Lexer(text)).parse()
+    SemanticAnalyzer().visit(tree)
+
+    param_call = tree.statements[0].expr_node
+    call = tree.statements[1].expr_node
+    outer_lambda = call.actual_params[0]
+    nested_lambda = outer_lambda.expr_node
+    body = nested_lambda.lambda_node.expr_node
+    x, y, a = body.left, body.right.left, body.right.right
+
+    assert (param_call.depth, param_call.slot) == (0, 0)
+    assert (call.depth, call.slot) == (None, None)
+    assert (nested_lambda.actual_params[0].depth, nested_lambda.actual_params[0].slot) == (0, 0)
+    # `a` is captured by the closure, after its parameter `x`
+    assert [(p.depth, p.slot) for p in (x, y, a)] == [(1, 0), (0, 0), (1, 1)]
+    assert [p.name for p in outer_lambda.symbol.free_vars] == ['a']
+    assert outer_lambda.symbol.captures == [(0, 0)]
+    assert nested_lambda.lambda_node.symbol.free_vars == []
+
+def test_tail_calls():
+    from src.interpreter.lexer import Lexer
+    from src.interpreter.parser import Parser
+
+    text = """
+    Defun {'name': 'fib', 'arguments': (n)}
+    (n < 2) or (fib(n - 1) + fib(n - 2))
+    Defun {'name': 'loop', 'arguments': (n)}
+    (n == 0) || (n > 0) && loop(n - 1)
+    Defun {'name': 'twice', 'arguments': (n)}
+    loop(n) || loop(n)
+
+    loop(3)
+    """
+
+    for intern in (False, True):
+        tree = Parser(Lexer(text), intern).parse()
+        SemanticAnalyzer().visit(tree)
+        fib, loop, twice, call = tree.statements
+
+        assert not fib.expr_node.right.left.tail and not fib.expr_node.right.right.tail
+        assert loop.expr_node.right.tail
+        # Top-level calls have no caller frame to replace
+        assert not call.tail
+        # An interned call occurring twice is the same node, which is also in non-tail position
+        assert twice.expr_node.right.tail != intern
+
+def test_tail_calls_keep_no_nodes():
+    from src.interpreter.lexer import Lexer
+    from src.interpreter.parser import Parser
+
+    text = """
+    Defun {'name': 'loop', 'arguments': (n)}
+    (n == 0) || loop(n - 1)
+    Defun {'name': 'apply', 'arguments': (f, n)}
+    f(n)
+
+    apply((Lambd x. (x == 0) || loop(x) || loop(x)), 3)
+    apply((Lambd x. loop(x)), 3)
+    """
+    tree = Parser(Lexer(text), True).parse()
+    analyzer = SemanticAnalyzer()
+    analyzer.visit(tree)
+    twice, once = (statement.actual_params[0] for statement in tree.statements[2:])
+
+    assert not twice.expr_node.right.tail and once.expr_node.tail
+    # The occurrences of calls are only counted while their body is analyzed
+    assert analyzer._body_calls == []
+    assert not any(isinstance(value, _ast.FunctionCall) for value in vars(analyzer).values())
@@ -0,0 +1,91 @@
+import math
+import pytest
+from array import array
+from src.interpreter.bytecode import BytecodeCompiler,Opcode,disassemble
+from src.interpreter.vm import FRAME_SIZE,VirtualMachine
+from src.interpreter.errors import ErrorCode,InterpreterError
+from tests.test_engines import get_ast
+
+def test_vm_errors():
+    with pytest.raises(InterpreterError) as e:
+        list(VirtualMachine().interpret(get_ast("1 + 1\n(4 - 2) / (1 - 1)")))
+
+    assert e.value.token.position == (2, 9)
+
+    text = """
+    Defun {'name': 'foo', 'arguments': (n)}
+    n(2,2)
+
+    foo(5)
+    """
+    with pytest.raises(InterpreterError):
+        list(VirtualMachine().interpret(get_ast(text)))
+
+def test_vm_deep_recursion():
+    text = """
+    Defun {'arguments': (n), 'name': 'sumRecursive'}
+    (n == 1) or (n + sumRecursive(n - 1))
+
+    sumRecursive(100000)
+    """
+
+    # Calls use the VM's frame stack, not Python's
+    assert list(VirtualMachine().interpret(get_ast(text))) == [100000 * 100001 // 2]
+
+def test_vm_memory_budget():
+    text = """
+    Defun {'name': 'factorial', 'arguments': (n)}
+    (n == 0) || n * factorial(n - 1)
+    Defun {'name': 'loop', 'arguments': (f, n)}
+    (n == 0) || f(f, n - 1) && True
+
+    factorial(2)
+    loop(loop, 2)
+    0 + (Lambd a. 0 + (Lambd b. 0 + (Lambd c. c)(b))(a))(1)
+    """
+    deep_statements = {
+        'factorial(3)': (3, 21),
+        'loop(loop, 3)': (5, 17),
+        '0 + (Lambd a. 0 + (Lambd b. 0 + (Lambd c. 0 + (Lambd d. d)(c))(b))(a))(1)': (10, 51),
+    }
+    # At most 3 frames
+    engine = VirtualMachine(memory_budget=3 * FRAME_SIZE + FRAME_SIZE // 2)
+
+    assert list(engine.interpret(get_ast(text))) == [2, True, 1]
+
+    # Calls, calls of function values and applied lambdas beyond the budget raise an error at their token
+    for statement, position in deep_statements.items():
+        with pytest.raises(InterpreterError) as e:
+            list(engine.interpret(get_ast(text + statement)))
+
+        assert e.value.error_code == ErrorCode.MEMORY_BUDGET_EXCEEDED
+        assert e.value.token.position == position
+
+def test_vm_wide_addresses():
+    arity = 70000
+    params = ', '.join(f'p{index}' for index in range(arity))
+    args = ', '.join(map(str, range(arity)))
+    text = f"Defun {{'name': 'last', 'arguments': ({params})}}\n0 + (Lambd x. p{arity - 1} + x)(1)\nlast({args})"
+
+    # The lambda reads a slot of the function's frame beyond 16 bits
+    assert list(VirtualMachine().interpret(get_ast(text))) == [arity]
+
+def test_bytecode_format():
+    tree = get_ast("""
+    Defun {'name': 'isZero', 'arguments': (n)}
+    n == 0 || n / 0
+
+    isZero(3 + 3)
+    """)
+    compiler = BytecodeCompiler()
+    codes = [compiler.compile(statement) for statement in tree.statements]
+    function = compiler.functions[tree.statements[0].symbol]
+
+    assert isinstance(function.code, array) and function.code.typecode == 'i'
+    assert function.arity == 1
+    # `||` jumps over its right operand
+    assert Opcode.JUMP_IF_TRUE_OR_POP in function.code[::2]
+    assert list(codes[1].code[::2]) == [Opcode.LOAD_CONST, Opcode.LOAD_CONST, Opcode.ADD, Opcode.CALL, Opcode.RETURN]
+
+    listing = disassemble(codes[1])
+    assert 'CALL' in listing and 'isZero' in listing and 'JUMP_IF_TRUE_OR_POP' in listing
@@ -1,5 +1,5 @@
 import pytest
-from src.interpreter.stack import ActivationRecord,ARType,CallStack
+from src.interpreter.stack import ActivationRecord,ARType,CallStack,FramePool
 
 def test_activation_record_create():
     ar_details = {
@@ -83,4 +83,59 @@ def test_call_stack_peek():
 def test_call_stack_pop_empty():
     stack = CallStack()
     with pytest.raises(IndexError):
-        stack.pop()
\ No newline at end of file
+        stack.pop()
+def test_activation_record_parent_lookup():
+    program = ActivationRecord(name='main', type=ARType.PROGRAM, nesting_level=1)
+    program['foo'] = 1
+    program['bar'] = 2
+
+    ar = ActivationRecord(name='foo', type=ARType.FUNCTION, nesting_level=2, parent=program)
+    ar['bar'] = 3
+
+    # Own bindings shadow the parent's, which are never copied
+    assert ar['foo'] == 1
+    assert ar['bar'] == 3
+    assert ar['baz'] is None
+    assert ar.members == {'bar': 3}
+
+    with pytest.raises(AttributeError):
+        ar.extra = 1
+
+def test_call_stack_bottom():
+    stack = CallStack()
+    ar1 = ActivationRecord(name='main', type=ARType.PROGRAM, nesting_level=1)
+    ar2 = ActivationRecord(name='foo', type=ARType.FUNCTION, nesting_level=2)
+
+    stack.push(ar1)
+    stack.push(ar2)
+
+    assert stack.bottom() == ar1
+
+def test_frame_pool_reuse():
+    pool = FramePool()
+    parent = ActivationRecord(name='main', type=ARType.PROGRAM, nesting_level=1)
+
+    ar = pool.acquire('foo', ARType.FUNCTION, 2, size=2, parent=parent)
+    assert ar.slots == [None, None]
+    ar.slots[:] = [1, 2]
+    ar['x'] = 3
+    pool.release(ar)
+
+    # Released records are cleared, and reused by calls with the same number of slots
+    assert ar.slots == [None, None] and ar.members == {} and ar.parent is None
+    assert pool.acquire('bar', ARType.FUNCTION, 3, size=1) is not ar
+
+    reused = pool.acquire('bar', ARType.FUNCTION, 3, size=2)
+    assert reused is ar
+    assert (reused.name, reused.nesting_level) == ('bar', 3)
+    assert pool.hits == {2: 1}
+    assert pool.misses == {1: 1, 2: 1}
+    assert pool.hit_rate == 1 / 3
+
+def test_frame_pool_max_frames():
+    pool = FramePool(max_frames=0)
+    ar = pool.acquire('foo', ARType.FUNCTION, 2, size=1)
+    pool.release(ar)
+
+    assert pool.acquire('foo', ARType.FUNCTION, 2, size=1) is not ar
+    assert pool.hit_rate == 0.0
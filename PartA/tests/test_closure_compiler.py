@@ -0,0 +1,47 @@
+import sys
+import pytest
+from src.interpreter.closure_compiler import ClosureCompiler
+from src.interpreter.errors import ErrorCode,InterpreterError
+from tests.test_engines import get_ast
+
+def test_closure_compiler_errors():
+    with pytest.raises(InterpreterError) as e:
+        list(ClosureCompiler().interpret(get_ast("1 + 1\n(4 - 2) / (1 - 1)")))
+
+    assert e.value.token.position == (2, 9)
+
+    text = """
+    Defun {'name': 'foo', 'arguments': (n)}
+    n(2,2)
+
+    foo(5)
+    """
+    with pytest.raises(InterpreterError):
+        list(ClosureCompiler().interpret(get_ast(text)))
+
+def test_closure_compiler_deep_recursion():
+    text = """
+    Defun {'arguments': (n), 'name': 'sumRecursive'}
+    (n == 1) or (n + sumRecursive(n - 1))
+
+    sumRecursive(20000)
+    """
+
+    assert list(ClosureCompiler().interpret(get_ast(text))) == [20000 * 20001 // 2]
+
+def test_closure_compiler_recursion_limit():
+    text = """
+    Defun {'name': 'loop', 'arguments': (n)}
+    (n == 0) || loop(n - 1)
+
+    loop(2000000)
+    """
+    recursion_limit = sys.getrecursionlimit()
+
+    # Recursion beyond Python's stack is reported like a call exceeding the interpreter's memory budget
+    with pytest.raises(InterpreterError) as e:
+        list(ClosureCompiler().interpret(get_ast(text)))
+
+    assert e.value.error_code == ErrorCode.MEMORY_BUDGET_EXCEEDED
+    assert e.value.token.position == (5, 5)
+    assert sys.getrecursionlimit() == recursion_limit
@@ -0,0 +1,62 @@
+import sys
+import pytest
+from src.interpreter.codegen import PythonCompiler
+from src.interpreter.errors import InterpreterError,ErrorCode
+from tests.test_engines import OPERATOR_CHAINS,get_ast
+
+def test_python_compiler_source():
+    engine = PythonCompiler()
+    tree = get_ast("Defun {'name': 'inc', 'arguments': (x)} x + 1\ninc(41)")
+
+    assert list(engine.interpret(tree)) == [42]
+    assert engine.sources[0].startswith('def f_inc(v_x):\n    return v_x + 1\n')
+    assert engine.sources[1] == 'f_inc(41)'
+
+def test_python_compiler_operator_chains():
+    engine = PythonCompiler()
+    list(engine.interpret(get_ast(OPERATOR_CHAINS[0])))
+    list(engine.interpret(get_ast(OPERATOR_CHAINS[-2])))
+
+    # Operations are parenthesized only where Python's precedences require it
+    # (`+` and `-` are right associative: `10 - (4 - 3) + ...` is `10 - ((4 - 3) + ...)`)
+    assert engine.sources[0].count('(') == 0
+    assert engine.sources[1] == '10 - (4 - 3) - 2 * ((3 + 4) % 5) + -(2 + 3) % 4'
+
+def test_python_compiler_errors():
+    text = """
+    Defun {'name': 'half', 'arguments': (x)}
+    x / (x - x)
+    Defun {'name': 'foo', 'arguments': (n)}
+    n(2,2)
+    """
+
+    with pytest.raises(InterpreterError) as e:
+        list(PythonCompiler().interpret(get_ast(text + "half(2)")))
+
+    assert e.value.error_code == ErrorCode.DIV_ZERO
+    assert e.value.token.position == (3, 7)
+
+    with pytest.raises(InterpreterError) as e:
+        list(PythonCompiler().interpret(get_ast(text + "foo(5)")))
+
+    assert e.value.error_code == ErrorCode.UNEXPECTED_SYMBOL
+    assert e.value.token.position == (5, 5)
+
+def test_python_compiler_limits():
+    text = """
+    Defun {'name': 'loop', 'arguments': (n)}
+    (n == 0) || loop(n - 1)
+
+    """
+    recursion_limit = sys.getrecursionlimit()
+    # Recursion beyond Python's stack, and expressions nested beyond Python's parser
+    statements = ('loop(2000000)', 'not ' * 100000 + 'True', '2 * (' * 5000 + '1' + ')' * 5000)
+
+    for statement in statements:
+        with pytest.raises(InterpreterError) as e:
+            list(PythonCompiler().interpret(get_ast(text + statement)))
+
+        assert e.value.error_code == ErrorCode.MEMORY_BUDGET_EXCEEDED
+        assert e.value.token.position[0] == 5
+
+    assert sys.getrecursionlimit() == recursion_limit
@@ -1,3 +1,4 @@
+import math
 
 import pytest
 from src.interpreter.lexer import Lexer
@@ -5,7 +6,7 @@ from src.interpreter.parser import Parser
 from src.interpreter.semantic_analyzer import SemanticAnalyzer
 from src.interpreter.interpreter import Interpreter
 from src.interpreter.ast import AST
-from src.interpreter.errors import InterpreterError
+from src.interpreter.errors import ErrorCode,InterpreterError
 
 def get_ast(text:str)-> AST:
     tree =  Parser(Lexer(text)).parse()
@@ -96,4 +97,118 @@ def test_function_call_no_lambda():
     """
     interpreter = Interpreter()
     with pytest.raises(InterpreterError):
-        next(interpreter.interpret(get_ast(text)))
\ No newline at end of file
+        next(interpreter.interpret(get_ast(text)))
+def test_deeply_nested_expressions():
+    depth = 20000
+    tests = [
+        ('(' * depth + '1' + ')' * depth, 1),
+        ('not ' * depth + 'False', False),
+        (' - '.join(['1'] * depth), 0),
+        ("Defun {'name': 'inc', 'arguments': (x)}\nx + 1\n" + 'inc(' * depth + '0' + ')' * depth, depth),
+        ('0 + (Lambd x. ' * depth + 'x + 1' + ')(x)' * (depth - 1) + ')(1)', 2),
+    ]
+    interpreter = Interpreter()
+
+    for text, expected_output in tests:
+        assert list(interpreter.interpret(get_ast(text))) == [expected_output]
+
+def test_deep_recursion():
+    text = """
+    Defun {'arguments': (n), 'name': 'sumRecursive'}
+    (n == 1) or (n + sumRecursive(n - 1))
+
+    sumRecursive(5000)
+    """
+    interpreter = Interpreter()
+
+    assert next(interpreter.interpret(get_ast(text))) == 5000 * 5001 // 2
+
+def test_recursion_memory_budget():
+    text = """
+    Defun {'name': 'factorial', 'arguments': (n)}
+    (n == 0) || n * factorial(n - 1)
+
+    factorial(5000) % 1000007
+    factorial(20000)
+    """
+    tree = get_ast(text)
+    interpreter = Interpreter(memory_budget=10000 * 1280)
+    outputs = interpreter.interpret(tree)
+
+    assert next(outputs) == math.factorial(5000) % 1000007
+
+    with pytest.raises(InterpreterError) as e:
+        next(outputs)
+
+    assert e.value.error_code == ErrorCode.MEMORY_BUDGET_EXCEEDED
+    assert e.value.token.value == 'factorial'
+
+def test_lexical_scope():
+    text = """
+    Defun {'name': 'apply', 'arguments': (f, n)}
+    f(n)
+    Defun {'name': 'addn', 'arguments': (n)}
+    apply((Lambd x. x + n), 1)
+    Defun {'name': 'twice', 'arguments': (f, x)}
+    f(f(x))
+
+    addn(10)
+    twice((Lambd y. (Lambd z. z * y)(y) + 1), 2)
+    """
+    interpreter = Interpreter()
+
+    # Lambdas see the parameters of the function they were created in, not the caller's
+    assert list(interpreter.interpret(get_ast(text))) == [11, 26]
+
+def test_closures_capture_free_variables():
+    text = """
+    Defun {'name': 'apply', 'arguments': (f, n)}
+    f(n)
+    Defun {'name': 'outer', 'arguments': (k, unused)}
+    apply((Lambd x. apply((Lambd y. x + y + k), 1)), 10)
+
+    outer(100, 5)
+    """
+    tree = get_ast(text)
+    outer_lambda = tree.statements[1].expr_node.actual_params[0]
+    inner_lambda = outer_lambda.expr_node.actual_params[0]
+
+    # `k` is captured by both closures (the outer one only passes it on), `unused` by neither
+    assert [p.name for p in outer_lambda.symbol.free_vars] == ['k']
+    assert [p.name for p in inner_lambda.symbol.free_vars] == ['x', 'k']
+    assert list(Interpreter().interpret(tree)) == [111]
+
+def test_frames_are_reused():
+    text = """
+    Defun {'name': 'fib', 'arguments': (n)}
+    (n < 2) or (fib(n - 1) + fib(n - 2))
+    Defun {'name': 'apply', 'arguments': (f, n)}
+    f(n)
+
+    fib(10)
+    apply((Lambd x. apply((Lambd y. x * y), x + 1)), 3) + apply((Lambd x. x), 1)
+    """
+    interpreter = Interpreter()
+
+    assert list(interpreter.interpret(get_ast(text))) == [89, 13]
+    # Only as many frames of each arity as are alive at once are allocated
+    # (the closure of `y` has 2 slots: `y`, and its captured `x`, and replaces the
+    # frame of `apply`, which calls it in tail position)
+    assert interpreter.call_stack.pool.misses == {1: 10, 2: 2}
+    assert interpreter.call_stack.pool.hit_rate > 0.9
+
+def test_tail_calls_run_in_constant_stack():
+    text = """
+    Defun {'name': 'loop', 'arguments': (n, acc)}
+    (n == 0) && acc || loop(n - 1, acc + n)
+    Defun {'name': 'apply', 'arguments': (f, n)}
+    f(n)
+
+    loop(100000, 1)
+    apply((Lambd n. loop(n, 1)), 100)
+    """
+    interpreter = Interpreter()
+
+    assert list(interpreter.interpret(get_ast(text))) == [5000050001, 5051]
+    # Every call of `loop` replaces the frame of its caller
+    assert interpreter.call_stack.pool.misses == {2: 2, 1: 1}
@@ -0,0 +1,85 @@
+import pytest
+from pathlib import Path
+from src.interpreter.lexer import Lexer
+from src.interpreter.parser import Parser
+from src.interpreter.semantic_analyzer import SemanticAnalyzer
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.closure_compiler import ClosureCompiler
+from src.interpreter.codegen import PythonCompiler
+from src.interpreter.vm import VirtualMachine
+from src.interpreter.ast import AST
+from src.interpreter.errors import SemanticError
+
+EXAMPLES_DIR = Path(__file__).parent.parent / 'examples'
+EXAMPLE_PATHS = sorted(EXAMPLES_DIR.glob('*.lambda'))
+
+# The examples demonstrating semantic errors, by name
+INVALID_EXAMPLES = {
+    'lmbd_example.lambda': 'calls foo with fewer arguments than it declares',
+}
+
+# The text of every example, for the tests running whole programs
+EXAMPLES = [
+    pytest.param(
+        path.read_text(),
+        id=path.name,
+        marks=[pytest.mark.xfail(raises=SemanticError, strict=True, reason=INVALID_EXAMPLES[path.name])]
+            if path.name in INVALID_EXAMPLES else []
+    )
+    for path in EXAMPLE_PATHS
+]
+
+# The execution engines which must produce the same outputs as the `Interpreter`
+ENGINES = (ClosureCompiler, PythonCompiler, VirtualMachine)
+
+PROGRAM = """
+Defun {'name': 'apply', 'arguments': (f, n)}
+f(n)
+Defun {'name': 'outer', 'arguments': (k, unused)}
+apply((Lambd x. apply((Lambd y. x + y + k), 1)), 10)
+Defun {'name': 'fib', 'arguments': (n)}
+(n < 2) or (fib(n - 1) + fib(n - 2))
+Defun {'name': 'class', 'arguments': (import, x)}
+(x > 2) && import || (0 / 1)
+
+outer(100, 5)
+fib(12)
+class(7, 3)
+class(7, 1)
+0 + (Lambd a, b. (Lambd c. a * c - b)(b + 1))(3, 4)
+not (2 >= 3) && (7 / 2) % 3 != 1 || -5 <= 4
+(1 > 2) && (1 / 0) || 0 && 5
+apply
+"""
+
+TERMS = ['1', '2', '3', '(4 - 5)', '-6', '7 * 8', '(9 + 10)']
+
+# Long operator chains, which the parser nests on the right
+OPERATOR_CHAINS = [
+    ' + '.join(['1'] * 300),
+    ' - '.join(['1'] * 300),
+    ' - '.join(TERMS * 40),
+    ' + '.join(TERMS * 40) + ' - ' + ' - '.join(TERMS * 40),
+    ' * '.join(['2', '(1 - 3)'] * 150) + ' % 1000007',
+    ' && '.join(['True'] * 300) + ' || ' + ' || '.join(['False'] * 300),
+    '10 - (4 - 3) + 2 * (3 + 4) % 5 - (-(2 + 3)) % 4',
+    '((1 < 2) == True) != (3 >= 4) && not (1 == 2) || not 3 - 3',
+]
+
+PROGRAMS = [
+    *EXAMPLES,
+    pytest.param(PROGRAM, id='program'),
+    *[pytest.param(text, id=f'operator_chain_{index}') for index, text in enumerate(OPERATOR_CHAINS)],
+]
+
+def get_ast(text:str)-> AST:
+    tree =  Parser(Lexer(text)).parse()
+    SemanticAnalyzer().visit(tree)
+    return tree
+
+@pytest.mark.parametrize('engine', ENGINES, ids=lambda engine: engine.__name__)
+@pytest.mark.parametrize('text', PROGRAMS)
+def test_engine_matches_interpreter(engine: type, text: str):
+    tree = get_ast(text)
+    expected_outputs = [str(output) for output in Interpreter().interpret(tree)]
+    assert [str(output) for output in engine().interpret(tree)] == expected_outputs
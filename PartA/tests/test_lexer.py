@@ -1,8 +1,13 @@
 
+import io
+import mmap
+import time
+import tracemalloc
 import pytest
-from src.interpreter.lexer import Lexer
-from src.interpreter.token import TokenType, Token
+from src.interpreter.lexer import Lexer, LegacyLexer, StreamLexer, TokenBuffer, create_lexer
+from src.interpreter.token import TokenType, TokenCode, TOKEN_CODES, Token, TokenArray, LineIndex, SHARED_TOKENS
 from src.interpreter.errors import LexerError
+from tests.test_engines import EXAMPLES_DIR,EXAMPLE_PATHS
 
 def test_last_token_is_EOF():
     text = ''
@@ -148,4 +153,199 @@ def test_ignore_comments():
     text = "# this is a comment x + y"
     lexer = Lexer(text)
 
-    assert lexer.get_next_token().type == TokenType.EOF
\ No newline at end of file
+    assert lexer.get_next_token().type == TokenType.EOF
+
+def get_tokens(lexer) -> list[Token]:
+    tokens: list[Token] = []
+
+    while (token := lexer.get_next_token()).type is not TokenType.EOF:
+        tokens.append(token)
+
+    return tokens
+
+def test_token_positions():
+    text = "Defun {'name': 'f', 'arguments': (n)}\n  # comment\n\n  n >= 10"
+    tokens = get_tokens(Lexer(text))
+
+    assert (tokens[0].lineno, tokens[0].column) == (1, 1)
+    assert (tokens[1].lineno, tokens[1].column) == (1, 7)
+    assert tokens[-3].value == 'n' and (tokens[-3].lineno, tokens[-3].column) == (4, 3)
+    assert tokens[-2].type == TokenType.GREATER_THAN_EQ and (tokens[-2].lineno, tokens[-2].column) == (4, 5)
+
+def test_unexpected_character_position():
+    text = "1 +\n  2 & 3"
+
+    with pytest.raises(LexerError) as error:
+        get_tokens(Lexer(text))
+
+    assert error.value.message == "LexerError: Lexer error on '&' line: 2 column: 5"
+
+def test_peek_next_token_does_not_consume():
+    lexer = Lexer("foo ( bar )")
+
+    assert lexer.peek_next_token().type == TokenType.ID
+    assert lexer.peek_next_token(2).type == TokenType.LPAREN
+    assert lexer.peek_next_token(5).type == TokenType.EOF
+    assert lexer.get_next_token().value == 'foo'
+
+def test_legacy_lexer_produces_same_tokens():
+    texts = [path.read_text() for path in EXAMPLE_PATHS]
+    texts.append("( ) { } + - * / == != > < >= <= && || , : not and or ! . ' 1.20 True false")
+
+    for text in texts:
+        tokens = get_tokens(create_lexer(text))
+        legacy_tokens = get_tokens(create_lexer(text, legacy=True))
+
+        assert isinstance(create_lexer(text, legacy=True), LegacyLexer)
+        assert [(t.type, t.value, t.lineno, t.column) for t in tokens] == \
+               [(t.type, t.value, t.lineno, t.column) for t in legacy_tokens]
+
+def test_token_buffer_lookahead():
+    tokens = TokenBuffer(Lexer("foo ( 1 )"))
+
+    assert tokens.peek(2).type == TokenType.LPAREN
+    assert tokens.peek().value == 'foo'
+    assert tokens.scanned == 2 and tokens.consumed == 0
+
+    assert tokens.get_next_token().value == 'foo'
+    assert tokens.peek(2).type == TokenType.INTEGER_CONST
+
+    for expected_type in (TokenType.LPAREN, TokenType.INTEGER_CONST, TokenType.RPAREN, TokenType.EOF, TokenType.EOF):
+        assert tokens.get_next_token().type == expected_type
+
+    assert tokens.scanned == 5
+
+    with pytest.raises(ValueError):
+        tokens.peek(3)
+
+def test_stream_lexer_chunk_boundaries():
+    texts = [path.read_text() for path in EXAMPLE_PATHS]
+    texts.append("# a comment longer than a chunk\nx >= 10 && y != 200 || \u00e9t\u00e9 <= 3")
+    texts.append("1 # a # comment\n\n  # another one\n  #\n2 #3\n#")
+
+    for text in texts:
+        expected = [(t.type, t.value, t.lineno, t.column) for t in get_tokens(Lexer(text))]
+
+        for chunk_size in (1, 2, 3, 7, 64):
+            for stream in (io.StringIO(text), io.BytesIO(text.encode())):
+                tokens = get_tokens(StreamLexer(stream, chunk_size=chunk_size))
+
+                assert [(t.type, t.value, t.lineno, t.column) for t in tokens] == expected
+
+def test_stream_lexer_mmap(tmp_path):
+    path = tmp_path / 'program.lambda'
+    path.write_text("Defun {'name': 'f', 'arguments': (n)}\n  n * 2\nf(21)")
+
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        lexer = StreamLexer(mapped, chunk_size=4)
+
+        assert lexer.peek_next_token(3).type == TokenType.QUOTE
+        tokens = get_tokens(lexer)
+
+    assert tokens[0].type == TokenType.FUNCTION_DECL
+    assert tokens[-2].value == 21 and (tokens[-2].lineno, tokens[-2].column) == (3, 3)
+
+def test_stream_lexer_keeps_bounded_buffer():
+    text = "1 + 2\n" * 10000
+    lexer = StreamLexer(io.StringIO(text), chunk_size=128)
+    longest_buffer = 0
+
+    while lexer.get_next_token().type is not TokenType.EOF:
+        longest_buffer = max(longest_buffer, len(lexer.text))
+
+    assert longest_buffer <= 2 * 128
+
+def test_stream_lexer_scales_linearly():
+    def lex_time(text: str) -> float:
+        best = float('inf')
+
+        for _ in range(3):
+            started = time.perf_counter()
+            get_tokens(StreamLexer(io.StringIO(text), chunk_size=4096))
+            best = min(best, time.perf_counter() - started)
+
+        return best
+
+    # A token or comment spanning many chunks is scanned in linear time (8x the input,
+    # not 64x the time), and comments are skipped without being buffered
+    for template in ('x{} + 1', '1 # {}\n+ 1'):
+        short, long = (template.format('x' * size) for size in (1 << 18, 1 << 21))
+
+        assert lex_time(long) < 24 * lex_time(short)
+
+    lexer = StreamLexer(io.StringIO('1 # ' + 'x' * (1 << 20) + '\n+ 1'), chunk_size=4096)
+
+    assert [token.value for token in get_tokens(lexer)] == [1, '+', 1]
+    assert len(lexer.text) < 2 * 4096
+
+def test_stream_lexer_line_index_drops_chunks():
+    text = "x" * 999 + "\n"
+    lexer = StreamLexer(io.StringIO(text * 1000), chunk_size=128)
+
+    tracemalloc.start()
+    try:
+        while lexer.get_next_token().type is not TokenType.EOF:
+            pass
+
+        # Only the line start offsets of the 1 MB input are kept
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert lexer.lines.position(len(text) * 1000 - 1) == (1000, 1000)
+    assert allocated < 100_000
+
+def test_compact_tokens():
+    token = Token(TokenType.LPAREN, '(', lineno=1, column=1)
+
+    assert not hasattr(token, '__dict__')
+    assert token.code == TokenCode.LPAREN == TOKEN_CODES[TokenType.LPAREN]
+    assert [(code.name, code) for code in TokenCode] == [(token_type.name, index) for index, token_type in enumerate(TokenType)]
+
+    lexer = Lexer("(1 + 2) + (3)", share_tokens=True)
+    tokens = get_tokens(lexer)
+
+    assert tokens[0] is tokens[6] is SHARED_TOKENS['(']
+    assert tokens[2] is tokens[5] is SHARED_TOKENS['+']
+    assert tokens[1].value == 1 and tokens[1].column == 2
+
+def test_token_array_round_trip():
+    text = (EXAMPLES_DIR / 'presentation_example.lambda').read_text()
+    tokens = TokenArray.from_lexer(Lexer(text))
+    expected = get_tokens(Lexer(text))
+
+    assert len(tokens) == len(expected) + 1
+    assert [(t.type, t.value, t.lineno, t.column) for t in get_tokens(tokens)] == \
+           [(t.type, t.value, t.lineno, t.column) for t in expected]
+    assert tokens.get_next_token().type == TokenType.EOF
+    assert tokens.nbytes < len(tokens) * 16
+
+def test_line_index_positions():
+    lines = LineIndex("ab\n\ncd\n")
+    lines.extend("e\nf", 7)
+
+    assert lines.position(0) == (1, 1)
+    assert lines.position(2) == (1, 3)
+    assert lines.position(3) == (2, 1)
+    assert lines.position(5) == (3, 2)
+    assert lines.position(7) == (4, 1)
+    assert lines.position(9) == (5, 1)
+
+def test_lazy_token_position():
+    token = Lexer("\n\n   foo").get_next_token()
+
+    assert token.offset == 5
+    assert token.position == (3, 4)
+    assert str(token) == "Token(ID, 'foo', position=3:4)"
+
+def test_error_messages_match_legacy_lexer():
+    texts = ["1 +\n  2 & 3", "# comment\nfoo(@)", "x\n\n   = 2"]
+
+    for text in texts:
+        with pytest.raises(LexerError) as error:
+            get_tokens(Lexer(text))
+
+        with pytest.raises(LexerError) as legacy_error:
+            get_tokens(LegacyLexer(text))
+
+        assert error.value.message == legacy_error.value.message
@@ -0,0 +1,89 @@
+from src.interpreter.lexer import Lexer
+from src.interpreter.parser import Parser
+from src.interpreter.semantic_analyzer import SemanticAnalyzer
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.memo import MISSING,MemoCache,MemoMode,memo_key
+from src.interpreter.ast import AST
+
+def get_ast(text:str)-> AST:
+    tree =  Parser(Lexer(text)).parse()
+    SemanticAnalyzer().visit(tree)
+    return tree
+
+TEXT = """
+Defun {'name': 'fib', 'arguments': (n)}
+(n < 2) or (fib(n - 1) + fib(n - 2))
+Defun {'name': 'apply', 'arguments': (f, n)}
+f(n)
+Defun {'name': 'adder', 'arguments': (k)}
+apply((Lambd x. x + k), 1)
+Defun {'name': 'loop', 'arguments': (n)}
+(n == 0) || loop(n - 1)
+
+fib(20)
+apply((Lambd x. fib(x)), 20)
+adder(5)
+loop(10)
+loop(12)
+"""
+
+def test_memo_cache_lru():
+    cache = MemoCache(max_entries=2)
+
+    cache.put((1,), 'a')
+    cache.put((2,), 'b')
+    assert cache.get((1,)) == 'a'
+    # (2,) is the least recently used
+    cache.put((3,), 'c')
+
+    assert cache.get((2,)) is MISSING
+    assert cache.get((3,)) == 'c'
+    assert (cache.hits, cache.misses, len(cache)) == (2, 1, 2)
+    # True and 1 are different arguments
+    assert memo_key([True]) != memo_key([1])
+
+def test_memoizable_functions():
+    fib, apply, adder, loop = get_ast(TEXT).statements[:4]
+
+    assert fib.symbol.memoizable and loop.symbol.memoizable
+    # Calls a parameter, or creates a closure
+    assert not apply.symbol.memoizable and not adder.symbol.memoizable
+
+def test_memoized_calls():
+    tree = get_ast(TEXT)
+    expected_outputs = list(Interpreter().interpret(tree))
+    fib, apply, adder, loop = (statement.symbol for statement in tree.statements[:4])
+
+    interpreter = Interpreter(memo_mode=MemoMode.AUTO)
+    assert list(interpreter.interpret(tree)) == expected_outputs
+    assert set(cache for cache in interpreter.memo_caches.values() if cache is not None) == {
+        interpreter.memo_caches[fib], interpreter.memo_caches[loop]
+    }
+    # Every fib(n) is evaluated once
+    assert interpreter.memo_caches[fib].misses == 21
+    # The calls of a tail call chain all cache its result
+    assert interpreter.memo_caches[loop].hits == 1
+    assert len(interpreter.memo_caches[loop]) == 13
+
+    interpreter = Interpreter(memo_mode=MemoMode.ALL, memo_size=4)
+    assert list(interpreter.interpret(tree)) == expected_outputs
+    assert interpreter.memo_caches[apply] is not None
+    assert len(interpreter.memo_caches[fib]) == 4
+
+def test_calls_passing_function_values():
+    tree = get_ast(TEXT + """
+    Defun {'name': 'pass', 'arguments': (g, n)}
+    apply(g, n)
+
+    pass((Lambd x. x + 1), 1)
+    pass((Lambd x. x + 1), 1)
+    pass(fib, 10)
+    """)
+    pass_function = tree.statements[-4].symbol
+
+    interpreter = Interpreter(memo_mode=MemoMode.AUTO)
+    assert list(interpreter.interpret(tree))[-3:] == [2, 2, 89]
+    # `pass` only passes `g` on, so it is memoizable, but its calls are keyed by function values
+    assert pass_function.memoizable
+    assert len(interpreter.memo_caches[pass_function]) == 0
+    assert interpreter.memo_caches[pass_function].misses == 0
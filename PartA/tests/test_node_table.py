@@ -0,0 +1,98 @@
+import marshal
+import pytest
+from src.interpreter.lexer import Lexer
+from src.interpreter.parser import Parser
+from src.interpreter.semantic_analyzer import SemanticAnalyzer
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.ast import BinOp,Integer,Lambda,Program
+from src.interpreter.errors import InterpreterError
+from src.interpreter.node_table import NodeTable
+from tests.test_engines import EXAMPLES,get_ast
+
+def get_table(text:str)-> NodeTable:
+    table = NodeTable.from_tree(Parser(Lexer(text)).parse())
+    SemanticAnalyzer().visit(table.root)
+    return table
+
+def test_nodes_have_no_dict():
+    tree = get_ast("Defun {'name': 'foo', 'arguments': (x,)} x + 1\nfoo(2)\n(Lambd y.(y))(3)")
+
+    for node in [tree, *tree.statements, tree.statements[0].expr_node]:
+        assert not hasattr(node, '__dict__')
+
+@pytest.mark.parametrize('text', EXAMPLES)
+def test_interpret_table(text: str):
+    tree = get_ast(text)
+    table = get_table(text)
+
+    assert list(Interpreter().interpret(table.root)) == list(Interpreter().interpret(tree))
+
+def test_views_are_ast_nodes():
+    table = NodeTable.from_tree(Parser(Lexer("1 + 2\n(Lambd x.(x))(1)")).parse())
+    binop = table.root.statements[0]
+
+    assert isinstance(table.root, Program)
+    assert isinstance(binop, BinOp) and type(binop).__name__ == 'BinOp'
+    assert isinstance(binop.left, Integer) and binop.left.value == 1
+    assert binop.op.value == '+'
+    assert binop == table.root.statements[0]
+
+    lambda_node = table.root.statements[1]
+    assert isinstance(lambda_node, Lambda)
+
+    lambda_node.lambda_name = 'f'
+    assert table.root.statements[1].lambda_name == 'f'
+
+    with pytest.raises(AttributeError):
+        binop.left = binop.right
+
+def test_to_tree_round_trip():
+    text = "Defun {'name': 'fact', 'arguments': (n,)} (n == 0) || (n * fact(n - 1))\nfact(5)"
+    tree = NodeTable.from_tree(Parser(Lexer(text)).parse()).to_tree()
+    SemanticAnalyzer().visit(tree)
+
+    assert type(tree) is Program
+    assert list(Interpreter().interpret(tree)) == [120]
+
+def test_buffers_round_trip():
+    text = "Defun {'name': 'fact', 'arguments': (n,)} (n == 0) || (n * fact(n - 1))\nfact(5)\n1 +\n  4 / 0"
+    table = NodeTable.from_tree(Parser(Lexer(text)).parse())
+    adopted = NodeTable.from_buffers(marshal.loads(marshal.dumps(table.to_buffers())))
+    SemanticAnalyzer().visit(adopted.root)
+
+    assert (len(adopted), adopted.nbytes) == (len(table), table.nbytes)
+
+    with pytest.raises(InterpreterError) as e:
+        list(Interpreter().interpret(adopted.root))
+
+    assert e.value.token.position == (4, 5)
+    assert list(Interpreter().interpret(Program(adopted.root.statements[:2]))) == [120]
+
+    # Views are flattened as the nodes they stand for
+    assert len(NodeTable.from_tree(adopted.root)) == len(table)
+
+def test_shared_nodes_are_stored_once():
+    one = Integer(Lexer('1').get_next_token())
+    table = NodeTable.from_tree(Program([BinOp(one, Lexer('+').get_next_token(), one)]))
+
+    assert len(table) == 3
+    assert list(Interpreter().interpret(table.to_tree())) == [2]
+
+def test_error_positions():
+    table = get_table("1 +\n  4 / 0")
+
+    with pytest.raises(InterpreterError) as e:
+        list(Interpreter().interpret(table.root))
+
+    assert e.value.token.position == (2, 5)
+
+def test_deep_tree():
+    table = NodeTable.from_tree(Parser(Lexer(' + '.join(['1'] * 50000))).parse())
+    node = table.to_tree().statements[0]
+
+    depth = 0
+    while isinstance(node, BinOp):
+        node = node.right
+        depth += 1
+
+    assert depth == 49999
@@ -0,0 +1,78 @@
+import marshal
+import pytest
+from pathlib import Path
+from src.interpreter.lexer import Lexer
+from src.interpreter.parser import Parser
+from src.interpreter.semantic_analyzer import SemanticAnalyzer
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.ast import AST
+from src.interpreter.node_table import NodeTable
+from src.interpreter.errors import ParserError,SemanticError
+from src.interpreter.parallel import ParallelParser,split_source
+from src.interpreter.serializer import MAGIC,dumps
+from tests.test_engines import EXAMPLE_PATHS
+
+def structure(tree: AST) -> tuple:
+    """The structure (including token positions) of a tree, comparable with `==`.
+
+    Trees are compared as `NodeTable`s (as the partial programs of a parallel parse
+    are), whose tokens have a position but no source offset.
+    """
+    return marshal.loads(dumps(NodeTable.from_tree(tree).root)[len(MAGIC):])
+
+def split(text: str, chunks: int) -> list[str]:
+    return [text[start:end] for start, end, _ in split_source(text, chunks)]
+
+def test_split_at_statement_boundaries():
+    text = "1 +\n2\n3\n-4\nfoo\n(5)\nx and\ny\nnot z\nDefun {'name': 'f',\n'arguments': (x,)}\nx\nf(1)"
+
+    assert split(text, 100) == [
+        "1 +\n2\n",
+        "3\n-4\n",
+        "foo\n(5)\n",
+        "x and\ny\n",
+        "not z\n",
+        "Defun {'name': 'f',\n'arguments': (x,)}\nx\n",
+        "f(1)"
+    ]
+    assert split(text, 1) == [text]
+
+def test_split_line_numbers():
+    text = "1\n# comment (\n\n2\n3"
+
+    assert split_source(text, 10) == [(0, 15, 1), (15, 17, 4), (17, 18, 5)]
+
+@pytest.mark.parametrize('path', EXAMPLE_PATHS, ids=lambda path: path.name)
+def test_parallel_parse_examples(path: Path):
+    text = path.read_text()
+    tree = ParallelParser(text, workers=3, min_chunk_size=1).parse()
+
+    assert structure(tree) == structure(Parser(Lexer(text)).parse())
+
+def test_parallel_parse_links_symbols():
+    text = '\n'.join(f"Defun {{'name': 'f{i}', 'arguments': (x,)}} x + {i}\nf{i}(1)" for i in range(50)) + '\nf0(f49(1))'
+    parser = ParallelParser(text, workers=4, min_chunk_size=1)
+    tree = parser.parse()
+    SemanticAnalyzer().visit(tree)
+
+    assert parser.chunks == 16 and parser.merge_time > 0
+
+    assert list(Interpreter().interpret(tree)) == [1 + i for i in range(50)] + [50]
+
+def test_parallel_parse_error_positions():
+    text = '\n'.join(f'{i} + {i}' for i in range(50)) + '\nundefined(1)\n1 + (2 *'
+
+    with pytest.raises(ParserError) as sequential_error:
+        Parser(Lexer(text)).parse()
+
+    with pytest.raises(ParserError) as parallel_error:
+        ParallelParser(text, workers=4, min_chunk_size=1).parse()
+
+    assert parallel_error.value.message == sequential_error.value.message
+
+    tree = ParallelParser(text.rsplit('\n', 1)[0], workers=4, min_chunk_size=1).parse()
+
+    with pytest.raises(SemanticError) as e:
+        SemanticAnalyzer().visit(tree)
+
+    assert e.value.token.position == (51, 1)
@@ -1,9 +1,9 @@
 import pytest
 from src.interpreter.parser import Parser
-from src.interpreter.lexer import Lexer
+from src.interpreter.lexer import Lexer, LegacyLexer
 from src.interpreter.ast import NotOp, Program, FunctionDecl, Lambda, BinOp, Integer, Boolean, FunctionCall,UnaryOp,Param,NestedLambda
 from src.interpreter.errors import ParserError
-from src.interpreter.token import TokenType
+from src.interpreter.token import TokenType, TokenArray
 
 def get_ast(text):
     return Parser(Lexer(text)).parse()
@@ -360,4 +360,121 @@ def test_not_operation():
 
         assert len(ast.statements) == 1
         assert isinstance(ast.statements[0],NotOp)
-        assert isinstance(ast.statements[0].expr,expr_node_type )
\ No newline at end of file
+        assert isinstance(ast.statements[0].expr,expr_node_type )
+
+def test_each_token_scanned_once():
+    text = "Defun {'name': 'foo', 'arguments': (n)} n(2,2)\nfoo((Lambd x,y. (Lambd z. z + 1)(y)))"
+    parser = Parser(Lexer(text))
+    parser.parse()
+
+    assert parser.tokens.scanned == parser.tokens.consumed
+
+def test_parse_token_array():
+    text = "Defun {'name': 'foo', 'arguments': (n)} n(2,2)\nfoo((Lambd x,y. x + y * 2))"
+    ast = Parser(TokenArray.from_lexer(Lexer(text))).parse()
+
+    assert str(ast.statements[0]) == str(get_ast(text).statements[0])
+    assert isinstance(ast.statements[1].actual_params[0], Lambda)
+
+def test_parse_with_legacy_lexer():
+    text = "Defun {'name': 'foo', 'arguments': (n)} n(2,2)\nfoo(3 + x * 2) and not True"
+
+    assert str(Parser(LegacyLexer(text)).parse().statements) == str(get_ast(text).statements)
+
+def test_parser_error_position():
+    with pytest.raises(ParserError) as error:
+        get_ast("1 +\n  (2 * )")
+
+    assert error.value.message == "ParserError: Unexpected token -> Token(RPAREN, ')', position=2:8)"
+
+def test_long_operator_chains():
+    terms = 5000
+    tests = [
+        (' + '.join(['1'] * terms), TokenType.PLUS),
+        (' * '.join(['x'] * terms), TokenType.MUL),
+        (' || '.join(['True'] * terms), TokenType.OR),
+    ]
+
+    for text, op_type in tests:
+        ast = get_ast(text)
+        node = ast.statements[0]
+        depth = 0
+
+        while isinstance(node, BinOp):
+            assert node.op.type == op_type
+            # Additive and multiplicative chains nest to the right, logical chains to the left
+            node = node.left if op_type == TokenType.OR else node.right
+            depth += 1
+
+        assert depth == terms - 1
+
+def test_signed_operand_in_multiplication_chain():
+    ast = get_ast("2 * -3 * 4")
+
+    binop1: BinOp = ast.statements[0]
+    assert isinstance(binop1.left, BinOp)
+    assert isinstance(binop1.left.right, UnaryOp)
+    assert isinstance(binop1.right, Integer)
+
+    with pytest.raises(ParserError):
+        get_ast("-3 * 4")
+
+def test_deep_nesting():
+    depth = 20000
+    tests = [
+        ('(' * depth + '1' + ')' * depth, Integer),
+        ('!' * depth + 'True', NotOp),
+        ('-(' * depth + '1' + ')' * depth, UnaryOp),
+        ('f(' * depth + '1' + ')' * depth, FunctionCall),
+    ]
+
+    # Nesting far beyond the recursion limit is parsed without RecursionError
+    for text, node_type in tests:
+        ast = get_ast(text)
+        assert isinstance(ast.statements[0], node_type)
+
+    node = get_ast('f(' * depth + 'x' + ')' * depth).statements[0]
+
+    for _ in range(depth):
+        assert isinstance(node, FunctionCall)
+        node, = node.actual_params
+
+    assert isinstance(node, Param)
+
+def test_interning_shares_identical_subtrees():
+    text = "Defun {'name': 'step', 'arguments': (n,)} (n - 1) * (n - 1) + step(n - 1) + step(n - 1)"
+    parser = Parser(Lexer(text), intern=True)
+    body = parser.parse().statements[0].expr_node
+
+    # ((n - 1) * (n - 1)) + (step(n - 1) + step(n - 1))
+    product, calls = body.left, body.right
+
+    assert product.left is product.right
+    assert calls.left is calls.right
+    assert calls.left.actual_params[0] is product.left
+    assert parser.interner.shared > 0
+    assert 0 < parser.interner.sharing_ratio < 1
+    assert parser.interner.bytes_saved > 0
+
+def test_interning_scopes():
+    text = (
+        "Defun {'name': 'f', 'arguments': (x,)} g(x) + (Lambd y.(g(x) + y))(1)\n"
+        "(Lambd a.(a))\n"
+        "(Lambd a.(a))"
+    )
+    tree = Parser(Lexer(text), intern=True).parse()
+    body = tree.statements[0].expr_node
+
+    # Calls and parameters are only shared within the same function / lambda body
+    assert body.left is not body.right.lambda_node.expr_node.left
+    assert body.left.actual_params[0] is not body.right.lambda_node.expr_node.left.actual_params[0]
+
+    # Lambdas are renamed by the semantic analyzer, so they are never shared
+    assert tree.statements[1] is not tree.statements[2]
+
+def test_interning_disabled_by_default():
+    parser = Parser(Lexer("1 + 1"))
+    node = parser.parse().statements[0]
+
+    assert parser.interner is None
+    assert node.left is not node.right
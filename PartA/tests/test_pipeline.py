@@ -0,0 +1,55 @@
+import io
+import pytest
+from src.interpreter.lexer import Lexer,StreamLexer
+from src.interpreter.parser import Parser
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.pipeline import Pipeline
+from src.interpreter.errors import SemanticError
+from tests.test_engines import EXAMPLES,get_ast
+
+def run(text: str) -> list:
+    return list(Pipeline(Parser(Lexer(text))).run())
+
+@pytest.mark.parametrize('text', EXAMPLES)
+def test_pipeline_matches_whole_program(text: str):
+    expected_outputs = list(Interpreter().interpret(get_ast(text)))
+
+    assert run(text) == expected_outputs
+
+def test_pipeline_statements_share_global_scope():
+    text = """
+    Defun {'name': 'inc', 'arguments': (x)}
+    x + 1
+
+    inc(1)
+    Defun {'name': 'twice', 'arguments': (x)}
+    inc(inc(x))
+
+    twice(inc(1))
+    5
+    -3
+    """
+
+    assert run(text) == [2, 4, 2]
+
+def test_pipeline_executes_before_parsing_the_rest():
+    text = "1 + 1\n2 * 3\nfoo(1)\n4"
+    outputs = Pipeline(Parser(Lexer(text))).run()
+
+    assert next(outputs) == 2
+    assert next(outputs) == 6
+
+    with pytest.raises(SemanticError) as e:
+        next(outputs)
+
+    assert e.value.token.position == (3, 1)
+
+def test_pipeline_parses_one_statement_ahead_at_most():
+    lexer = StreamLexer(io.StringIO("1\n2\n3\n4\n5"), chunk_size=2)
+    parser = Parser(lexer)
+    outputs = Pipeline(parser).run()
+
+    assert next(outputs) == 1
+    # Only the first token of the next statement (and one lookahead token) were read
+    assert parser.tokens.scanned <= 3
+    assert list(outputs) == [2, 3, 4, 5]
@@ -0,0 +1,128 @@
+import pytest
+from src.interpreter.repl import Repl
+from src.interpreter.semantic_analyzer import SemanticAnalyzer
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.memo import MemoMode
+from src.interpreter.errors import ParserError,SemanticError,InterpreterError
+
+def feed(repl: Repl, *lines: str) -> list:
+    outputs = []
+
+    for line in lines:
+        outputs.extend(repl.feed(line))
+
+    return outputs
+
+def test_repl_continuation():
+    repl = Repl()
+    tests = [
+        ("Defun {'name': 'add',", True),
+        ("'arguments': (x, y)}", True),
+        ("x +", True),
+        ("y", False),
+        ("add(", True),
+        ("1, 2", True),
+        (")", False),
+        ("(1 + 2", True),
+        (") * 3", False),
+        ("(Lambd x.", True),
+    ]
+
+    for line, pending in tests:
+        feed(repl, line)
+        assert repl.pending == pending, line
+
+    repl.reset()
+    assert not repl.pending
+    assert feed(repl, "add(1, 2)", "(1 +", "2) * 3") == [3, 9]
+
+def test_repl_errors():
+    repl = Repl()
+
+    with pytest.raises(ParserError) as e:
+        feed(repl, "1 +", "2)")
+
+    assert e.value.token.position == (2, 2)
+    assert not repl.pending
+
+    with pytest.raises(SemanticError):
+        feed(repl, "foo(1)")
+
+    with pytest.raises(InterpreterError):
+        feed(repl, "Defun {'name': 'div', 'arguments': (x)} 1 / x", "div(0)")
+
+    # The session recovers from errors
+    assert feed(repl, "div(1)") == [1]
+
+def test_repl_analyzes_new_statements_only():
+    class CountingAnalyzer(SemanticAnalyzer):
+        visits = 0
+
+        def visit(self, node):
+            self.visits += 1
+            return super().visit(node)
+
+    analyzer = CountingAnalyzer()
+    repl = Repl(analyzer)
+
+    feed(repl, "Defun {'name': 'inc', 'arguments': (x)} x + 1")
+    visits = analyzer.visits
+
+    for value in range(100):
+        assert feed(repl, f"inc({value})") == [value + 1]
+
+    # Each call is visited once (its argument is visited by the call's traversal)
+    assert analyzer.visits - visits == 100
+
+def test_repl_redefinition():
+    repl = Repl()
+    feed(
+        repl,
+        "Defun {'name': 'f', 'arguments': (x)} x + 1",
+        "Defun {'name': 'g', 'arguments': (x)} f(x) * 2",
+        "Defun {'name': 'h', 'arguments': (x)} g(x) + 1",
+        "Defun {'name': 'k', 'arguments': (x)} x",
+    )
+    assert feed(repl, "h(1)") == [5]
+
+    feed(repl, "Defun {'name': 'f', 'arguments': (x)} x + 10")
+
+    # Only the function and its callers are recompiled, and callers of callers see the change
+    assert repl.recompiled == ['f', 'g']
+    assert feed(repl, "h(1)", "g(1)") == [23, 22]
+
+def test_repl_redefinition_memoized():
+    repl = Repl(interpreter=Interpreter(memo_mode=MemoMode.AUTO))
+    feed(
+        repl,
+        "Defun {'name': 'f', 'arguments': (x)} x + 1",
+        "Defun {'name': 'g', 'arguments': (x)} f(x) * 2",
+        "Defun {'name': 'h', 'arguments': (x)} g(x) + 1",
+    )
+    assert feed(repl, "h(1)", "h(1)") == [5, 5]
+
+    feed(repl, "Defun {'name': 'f', 'arguments': (x)} x + 10")
+
+    # The cached results of h (which doesn't call f directly) are dropped too
+    assert feed(repl, "h(1)") == [23]
+
+def test_repl_redefinition_rollback():
+    repl = Repl()
+    feed(
+        repl,
+        "Defun {'name': 'f', 'arguments': (x)} x + 1",
+        "Defun {'name': 'g', 'arguments': (x)} f(x) * 2",
+    )
+
+    with pytest.raises(SemanticError):
+        feed(repl, "Defun {'name': 'f', 'arguments': (x, y)} x + y")
+
+    assert feed(repl, "g(1)", "f(1)") == [4, 2]
+
+def test_repl_recursive_redefinition():
+    repl = Repl()
+    feed(repl, "Defun {'name': 'fact', 'arguments': (n)} (n == 0) or n * fact(n - 1)")
+    assert feed(repl, "fact(5)") == [120]
+
+    feed(repl, "Defun {'name': 'fact', 'arguments': (n)} (n <= 1) or n * fact(n - 2)")
+    assert feed(repl, "fact(5)") == [15]
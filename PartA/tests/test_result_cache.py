@@ -0,0 +1,87 @@
+from src.interpreter.lexer import Lexer
+from src.interpreter.parser import Parser
+from src.interpreter.semantic_analyzer import SemanticAnalyzer
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.memo import MemoMode
+from src.interpreter.result_cache import RESULT_VERSION,ResultCache,function_hash
+from src.interpreter.ast import AST,FunctionDecl
+
+def get_ast(text:str)-> AST:
+    tree =  Parser(Lexer(text)).parse()
+    SemanticAnalyzer().visit(tree)
+    return tree
+
+FUNCTIONS = """
+Defun {'name': 'isDivisible', 'arguments': (a, b)}
+ (a % b) == 0
+Defun {'name': 'checkDivisibility', 'arguments': (n, divisor)}
+ (divisor == 1) or (!(isDivisible(n, divisor)) && checkDivisibility(n, divisor - 1))
+Defun {'name': 'isPrime', 'arguments': (n)}
+ (n > 1) && checkDivisibility(n, n - 1)
+"""
+
+def run(tree: AST, directory) -> tuple[list, Interpreter]:
+    result_cache = ResultCache(directory, min_cost=0)
+    interpreter = Interpreter(memo_mode=MemoMode.AUTO, result_cache=result_cache)
+
+    try:
+        return list(interpreter.interpret(tree)), interpreter
+    finally:
+        result_cache.close()
+
+def test_result_cache_across_runs(tmp_path):
+    tree = get_ast(FUNCTIONS + "isPrime(7919)\nisPrime(51)\nisDivisible(4, 2)")
+    is_prime = tree.statements[2].symbol
+
+    outputs, interpreter = run(tree, tmp_path)
+    assert outputs == [True, False, True]
+    assert interpreter.memo_caches[is_prime].misses == 2
+
+    # A new run (with a new analysis) gets the results from disk
+    tree = get_ast(FUNCTIONS + "isPrime(7919)\nisPrime(51)\nisDivisible(4, 2)")
+    outputs, interpreter = run(tree, tmp_path)
+
+    assert outputs == [True, False, True]
+    assert interpreter.memo_caches[tree.statements[2].symbol].hits == 2
+    # Nothing else was evaluated
+    assert tree.statements[1].symbol not in interpreter.memo_caches
+
+    result_cache = ResultCache(tmp_path)
+    stats = result_cache.stats()
+    result_cache.close()
+    # Only the calls of top-level statements are stored
+    assert (stats['entries'], stats['functions'], stats['hits'], stats['misses']) == (3, 2, 3, 3)
+
+def test_function_hash(monkeypatch):
+    def hash_of(text: str) -> str:
+        tree = get_ast(text)
+        functions = {statement.func_name: statement.symbol for statement in tree.statements if isinstance(statement, FunctionDecl)}
+        return function_hash(functions['isPrime'], functions.get)
+
+    expected_hash = hash_of(FUNCTIONS)
+
+    # Positions don't matter
+    assert hash_of("1 + 1\n\n" + FUNCTIONS) == expected_hash
+    # The functions it (transitively) calls do
+    assert hash_of(FUNCTIONS.replace('(a % b) == 0', '(a % b) == 1')) != expected_hash
+    # And so does the version of the evaluation semantics
+    monkeypatch.setattr('src.interpreter.result_cache.RESULT_VERSION', RESULT_VERSION + 1)
+    assert hash_of(FUNCTIONS) != expected_hash
+
+def test_result_cache_eviction(tmp_path):
+    result_cache = ResultCache(tmp_path, max_entries=10)
+
+    for n in range(20):
+        result_cache.put('f', (n,), n * n)
+
+    result_cache.put('f', (True,), 'not stored')
+    assert result_cache.get('f', (19,)) == 361
+    # The least recently used results are evicted
+    assert result_cache.get('f', (0,)) is None
+    assert result_cache.get('f', (1,), 'missing') == 'missing'
+    assert result_cache.get('f', (True,)) is None
+    assert result_cache.stats()['entries'] <= 10
+
+    result_cache.clear()
+    assert result_cache.stats()['entries'] == 0
+    result_cache.close()
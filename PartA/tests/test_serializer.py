@@ -0,0 +1,78 @@
+import pytest
+from pathlib import Path
+from src.interpreter.lexer import Lexer
+from src.interpreter.parser import Parser
+from src.interpreter.interpreter import Interpreter
+from src.interpreter.ast import AST,BinOp,FunctionCall
+from src.interpreter.errors import SerializationError
+from src.interpreter import serializer
+from src.interpreter.serializer import ProgramCache,dumps,loads,source_hash
+from tests.test_engines import EXAMPLES,get_ast
+
+def run(tree: AST) -> list:
+    return list(Interpreter().interpret(tree))
+
+@pytest.mark.parametrize('text', EXAMPLES)
+def test_round_trip_examples(text: str):
+    tree = get_ast(text)
+
+    assert run(loads(dumps(tree))) == run(tree)
+
+def test_round_trip_keeps_shared_symbols():
+    text = "Defun {'name': 'fact', 'arguments': (n,)} (n == 0) || (n * fact(n - 1))\nfact(5)"
+    tree = loads(dumps(get_ast(text)))
+
+    function = tree.statements[0]
+    recursive_call = function.expr_node.right.right
+
+    assert isinstance(recursive_call, FunctionCall)
+    assert recursive_call.symbol is function.symbol
+    assert run(tree) == [120]
+
+def test_deep_program():
+    # Only parsed: the serializer itself must not recurse, regardless of the depth of the tree
+    tree = Parser(Lexer(' + '.join(['1'] * 50000))).parse()
+    node = loads(dumps(tree)).statements[0]
+
+    depth = 0
+    while isinstance(node, BinOp):
+        node = node.right
+        depth += 1
+
+    assert depth == 49999
+
+def test_invalid_data():
+    with pytest.raises(SerializationError):
+        loads(b'not a compiled program')
+
+    with pytest.raises(SerializationError):
+        loads(dumps(get_ast('1 + 2'))[:-10])
+
+def test_version_mismatch(monkeypatch):
+    data = dumps(get_ast('1 + 2'))
+    monkeypatch.setattr(serializer, '__version__', '0.0.0')
+
+    with pytest.raises(SerializationError) as e:
+        loads(data)
+
+    assert 'expected 0.0.0' in e.value.message
+
+def test_program_cache(tmp_path: Path):
+    source = tmp_path / 'program.lambda'
+    source.write_text('1 + 2')
+    cache = ProgramCache(tmp_path / 'cache')
+    key = source_hash(source)
+
+    assert cache.get(key) is None
+
+    cache.put(key, get_ast(source.read_text()))
+    assert run(cache.get(key)) == [3]
+
+    source.write_text('1 + 3')
+    assert source_hash(source) != key
+
+def test_program_cache_ignores_corrupted_files(tmp_path: Path):
+    cache = ProgramCache(tmp_path)
+    cache.path('key').write_bytes(serializer.MAGIC + b'garbage')
+
+    assert cache.get('key') is None
@@ -0,0 +1,126 @@
+import functools
+import pytest
+from src.interpreter.interpreter import NodeVisitor,Interpreter,yields_children
+from src.interpreter.semantic_analyzer import SemanticAnalyzer
+from src.interpreter.lexer import Lexer
+from src.interpreter.parser import Parser
+from src.interpreter.ast import AST,Integer,BinOp
+
+class Evaluator(NodeVisitor):
+    def visit_Integer(self, node: Integer):
+        return node.value
+
+    @yields_children
+    def visit_BinOp(self, node: BinOp):
+        return (yield node.left) + (yield node.right)
+
+    def visit_Program(self, node):
+        return [self.visit(statement) for statement in node.statements]
+
+def test_visitor_dispatch_table():
+    tree = Parser(Lexer("1 + 2 + 3")).parse()
+
+    assert Evaluator().visit(tree) == [6]
+    # Method lookups are cached per visitor class
+    assert set(Evaluator._dispatch) >= {Integer, BinOp}
+    assert Evaluator._dispatch is not NodeVisitor._dispatch
+
+def test_visitor_dispatch_subclasses():
+    class Constant(Integer):
+        __slots__ = ()
+
+    class Node(AST):
+        pass
+
+    class ConstantEvaluator(Evaluator):
+        def visit_AST(self, node: AST):
+            return 'ast'
+
+    node = Parser(Lexer("7")).parse().statements[0]
+    node.__class__ = Constant
+
+    # Subclasses dispatch to the method of their nearest visited base class
+    assert Evaluator().visit(node) == 7
+    assert ConstantEvaluator().visit(Node()) == 'ast'
+
+    with pytest.raises(Exception):
+        Evaluator().visit(Node())
+
+def test_visitor_dispatch_callables():
+    class Scaled:
+        def __init__(self, factor: int) -> None:
+            self.factor = factor
+
+        def __call__(self, visitor, node: Integer):
+            return node.value * self.factor
+
+    class ScalingEvaluator(Evaluator):
+        def combine(self, node: BinOp, operator):
+            return operator((yield node.left), (yield node.right))
+
+        visit_Integer = Scaled(10)
+        visit_BinOp = yields_children(functools.partialmethod(combine, operator=lambda x, y: x * y))
+
+    tree = Parser(Lexer("1 + 2 + 3")).parse()
+
+    # Visits may be any callables, marked or not
+    assert ScalingEvaluator().visit(tree) == [6000]
+    assert ScalingEvaluator._dispatch[Integer][1] is False
+    assert ScalingEvaluator._dispatch[BinOp][1] is True
+
+def test_unmarked_generator_visits():
+    class Linter(NodeVisitor):
+        def visit_Program(self, node):
+            for statement in node.statements:
+                if isinstance(statement, Integer):
+                    yield f'constant statement: {statement.value}'
+
+    tree = Parser(Lexer("1 + 2\n3")).parse()
+
+    # Only visits marked with `yields_children` yield child nodes
+    assert list(Linter().visit(tree)) == ['constant statement: 3']
+
+def test_wrapped_visits():
+    calls = []
+
+    def counted(visit):
+        @functools.wraps(visit)
+        def wrapper(self, node):
+            calls.append(type(node).__name__)
+            return visit(self, node)
+
+        return wrapper
+
+    class CountingInterpreter(Interpreter):
+        visit_BinOp = counted(Interpreter.visit_BinOp)
+
+    tree = Parser(Lexer("1 + 2")).parse()
+    SemanticAnalyzer().visit(tree)
+
+    assert list(CountingInterpreter().interpret(tree)) == [3]
+    assert calls == ['BinOp']
+
+def test_pending_visits_are_closed_on_error():
+    closed = []
+
+    class Failing(Evaluator):
+        @yields_children
+        def visit_BinOp(self, node: BinOp):
+            try:
+                return (yield node.left) + (yield node.right)
+            finally:
+                closed.append(node)
+
+        def visit_Integer(self, node: Integer):
+            if node.value == 0:
+                raise ZeroDivisionError
+
+            return node.value
+
+    tree = Parser(Lexer("1 + (2 + 0)")).parse()
+
+    with pytest.raises(ZeroDivisionError):
+        Failing().visit(tree)
+
+    # Innermost first
+    assert closed == [tree.statements[0].right, tree.statements[0]]